@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sqlite3
+import subprocess  # nosec B404
+import sys
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from .suite import run_suite
+
+#
+# FUNCTIONS
+#
+
+
+def _get_commit() -> str:
+    try:
+        return subprocess.run(  # nosec B603 B607
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def _format_result(result: dict[str, Any]) -> str:
+    line = (
+        f"{result['name']:<28} {result['size']:>6} {result['seconds']:>9.3f}s"
+        f" {result['throughput']:>11.1f}/s"
+    )
+
+    if "latency_p50_ms" in result:
+        line += (
+            f"  p50 {result['latency_p50_ms']:.2f}ms"
+            f"  p95 {result['latency_p95_ms']:.2f}ms"
+        )
+
+    if "peak_memory_bytes" in result:
+        line += f"  peak {result['peak_memory_bytes'] / 1024 / 1024:.1f}MiB"
+
+    return line
+
+
+def compare(
+    baseline: list[dict[str, Any]],
+    results: list[dict[str, Any]],
+    threshold: float,
+) -> list[str]:
+    previous = {(result["name"], result["size"]): result for result in baseline}
+    regressions = []
+
+    print(f"\n{'benchmark':<28} {'size':>6} {'before':>10} {'after':>10} {'change':>8}")
+
+    for result in results:
+        before = previous.get((result["name"], result["size"]))
+
+        if not before or not before["seconds"]:
+            continue
+
+        change = result["seconds"] / before["seconds"] - 1
+        marker = ""
+
+        if change > threshold:
+            marker = "  REGRESSION"
+            regressions.append(f"{result['name']}@{result['size']}")
+
+        print(
+            f"{result['name']:<28} {result['size']:>6} {before['seconds']:>9.3f}s"
+            f" {result['seconds']:>9.3f}s {change:>+8.1%}{marker}"
+        )
+
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Benchmark grawsp's hot paths against a faked AWS",
+    )
+    parser.add_argument(
+        "--sizes",
+        default="100,1000,10000",
+        help="Comma separated numbers of accounts to benchmark with",
+    )
+    parser.add_argument(
+        "--latency-ms",
+        default=0.0,
+        type=float,
+        help="Latency added to every faked AWS call",
+    )
+    parser.add_argument(
+        "--only",
+        default="",
+        help="Comma separated prefixes of the benchmarks to run",
+    )
+    parser.add_argument(
+        "--no-memory",
+        action="store_true",
+        help="Do not trace peak memory, which slows everything down",
+    )
+    parser.add_argument("--output", default="", help="Write the results as JSON")
+    parser.add_argument(
+        "--compare",
+        default="",
+        help="Compare with the JSON results of an earlier run",
+    )
+    parser.add_argument(
+        "--threshold",
+        default=0.25,
+        type=float,
+        help="Slowdown that counts as a regression when comparing",
+    )
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    only = [name.strip() for name in args.only.split(",") if name.strip()]
+
+    def on_result(result: dict[str, Any]) -> None:
+        print(_format_result(result), flush=True)
+
+    with tempfile.TemporaryDirectory(prefix="grawsp-benchmarks-") as path:
+        results = run_suite(
+            path=Path(path),
+            sizes=sizes,
+            latency=args.latency_ms / 1000,
+            memory=not args.no_memory,
+            only=only,
+            on_result=on_result,
+        )
+
+    report = {
+        "meta": {
+            "commit": _get_commit(),
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "latency_ms": args.latency_ms,
+            "memory": not args.no_memory,
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+        },
+        "results": results,
+    }
+
+    if args.output:
+        output_path = Path(args.output)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(json.dumps(report, indent=2) + "\n")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        regressions = compare(baseline["results"], results, args.threshold)
+
+        if regressions:
+            print(f"\nRegressed: {', '.join(regressions)}")
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from threading import Lock
+from time import sleep, time
+from typing import Any
+
+from src.commands.grawsp.actions import aws
+from src.services.aws import sso
+
+#
+# CATALOG
+#
+
+
+def make_catalog(size: int) -> list[dict[str, Any]]:
+    return [
+        {
+            "account_id": f"{number:012d}",
+            "account_name": f"account-{number}",
+            "email": f"account-{number}@example.com",
+            "sso_roles": ["ReadOnly", f"Role{number % 10}"],
+        }
+        for number in range(size)
+    ]
+
+
+#
+# FAKE AWS
+#
+
+
+class FakeAws:
+    def __init__(self, catalog: list[dict[str, Any]], latency: float = 0.0) -> None:
+        self._catalog = {account["account_id"]: account for account in catalog}
+        self._lock = Lock()
+        self.calls: dict[str, int] = {}
+        self.latency = latency
+
+    def assume_sso_role(
+        self,
+        access_token: str,
+        account_id: str,
+        region: str,
+        role_name: str,
+    ) -> dict[str, Any]:
+        self._call("GetRoleCredentials")
+
+        return {
+            "access_key_id": f"ASIA{account_id}",
+            "expires_at": time() + 3600,
+            "secret_access_key": "secret",
+            "session_token": "token" * 100,
+        }
+
+    def get_signin_token(self, access_key_id: str, **kwargs: Any) -> str:
+        self._call("GetSigninToken")
+
+        return f"signin-{access_key_id}"
+
+    def list_sso_accounts(self, access_token: str, region: str) -> list[dict]:
+        self._call("ListAccounts")
+
+        return [
+            {
+                "account_id": account["account_id"],
+                "account_name": account["account_name"],
+                "email": account["email"],
+            }
+            for account in self._catalog.values()
+        ]
+
+    def list_sso_roles(
+        self,
+        access_token: str,
+        account_id: str,
+        region: str,
+    ) -> list[str]:
+        self._call("ListAccountRoles")
+
+        return list(self._catalog[account_id]["sso_roles"])
+
+    def _call(self, api: str) -> None:
+        with self._lock:
+            self.calls[api] = self.calls.get(api, 0) + 1
+
+        if self.latency:
+            sleep(self.latency)
+
+
+@contextmanager
+def fake_aws(fake: FakeAws) -> Iterator[FakeAws]:
+    # The service layer is replaced where grawsp looks it up, everything above
+    # it, including the discovery thread pool, runs for real.
+    patches = [
+        (aws, "assume_sso_role", fake.assume_sso_role),
+        (aws, "get_signin_token", fake.get_signin_token),
+        (sso, "list_sso_accounts", fake.list_sso_accounts),
+        (sso, "list_sso_roles", fake.list_sso_roles),
+    ]
+    originals = [(module, name, getattr(module, name)) for module, name, _ in patches]
+
+    for module, name, value in patches:
+        setattr(module, name, value)
+
+    try:
+        yield fake
+    finally:
+        for module, name, value in originals:
+            setattr(module, name, value)
@@ -0,0 +1,482 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import secrets
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock
+from time import sleep, time
+from typing import Any
+from urllib.parse import parse_qsl, urlsplit
+from xml.sax.saxutils import escape
+
+from .fakes import make_catalog
+
+CREDENTIAL_LIFETIME_IN_SECONDS: int = 60 * 60
+TOKEN_LIFETIME_IN_SECONDS: int = 8 * 60 * 60
+
+IAM_NAMESPACE = "https://iam.amazonaws.com/doc/2010-05-08/"
+STS_NAMESPACE = "https://sts.amazonaws.com/doc/2011-06-15/"
+
+ACCESS_KEY_PATTERN = re.compile(r"Credential=([^/]+)/")
+
+# Operations answered with JSON by path, the query protocol ones (STS and IAM)
+# are all posted to / and told apart by their action.
+JSON_OPERATIONS = {
+    ("GET", "/assignment/accounts"): "ListAccounts",
+    ("GET", "/assignment/roles"): "ListAccountRoles",
+    ("GET", "/federation"): "GetSigninToken",
+    ("GET", "/federation/credentials"): "GetRoleCredentials",
+    ("POST", "/client/register"): "RegisterClient",
+    ("POST", "/device_authorization"): "StartDeviceAuthorization",
+    ("POST", "/token"): "CreateToken",
+}
+
+QUERY_OPERATIONS = {
+    "AssumeRole": STS_NAMESPACE,
+    "GetRole": IAM_NAMESPACE,
+}
+
+
+class ServiceError(Exception):
+    def __init__(self, status: int, code: str, message: str) -> None:
+        super().__init__(message)
+        self.code = code
+        self.status = status
+
+
+#
+# FAKE AWS
+#
+
+
+class FakeAwsServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        catalog: list[dict[str, Any]],
+        latency: float = 0.0,
+        page_size: int = 20,
+        throttle_rate: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int | None = None,
+    ) -> None:
+        self._lock = Lock()
+        self._rng = random.Random(seed)  # nosec B311
+        self._sessions: dict[str, str] = {}
+        self.account_ids = [account["account_id"] for account in catalog]
+        self.accounts = {account["account_id"]: account for account in catalog}
+        self.calls: dict[str, int] = {}
+        self.error_rate = error_rate
+        self.latency = latency
+        self.page_size = page_size
+        self.throttle_rate = throttle_rate
+
+        super().__init__(address, _HttpHandler)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def handle_operation(
+        self,
+        operation: str,
+        params: dict[str, Any],
+        access_key_id: str = "",
+    ) -> dict[str, Any]:
+        with self._lock:
+            self.calls[operation] = self.calls.get(operation, 0) + 1
+            chance = self._rng.random()
+
+        if self.latency:
+            sleep(self.latency)
+
+        if chance < self.throttle_rate:
+            raise ServiceError(429, "TooManyRequestsException", "Rate exceeded")
+
+        if chance < self.throttle_rate + self.error_rate:
+            raise ServiceError(500, "ServiceUnavailable", "Injected failure")
+
+        handler = getattr(self, f"_{_to_snake_case(operation)}")
+
+        return handler(params, access_key_id)
+
+    #
+    # SSO-OIDC
+    #
+
+    def _register_client(self, params: dict[str, Any], _: str) -> dict[str, Any]:
+        now = int(time())
+
+        return {
+            "clientId": secrets.token_hex(16),
+            "clientIdIssuedAt": now,
+            "clientSecret": secrets.token_urlsafe(64),
+            "clientSecretExpiresAt": now + 90 * 24 * 60 * 60,
+        }
+
+    def _start_device_authorization(
+        self, params: dict[str, Any], _: str
+    ) -> dict[str, Any]:
+        user_code = secrets.token_hex(4).upper()
+
+        return {
+            "deviceCode": secrets.token_urlsafe(32),
+            "expiresIn": 600,
+            "interval": 1,
+            "userCode": user_code,
+            "verificationUri": f"{self.url}/device",
+            "verificationUriComplete": f"{self.url}/device?user_code={user_code}",
+        }
+
+    def _create_token(self, params: dict[str, Any], _: str) -> dict[str, Any]:
+        # Devices are approved right away, there is nobody to sign in.
+        if not params.get("deviceCode") and not params.get("refreshToken"):
+            raise ServiceError(400, "InvalidGrantException", "Missing grant")
+
+        return {
+            "accessToken": secrets.token_urlsafe(64),
+            "expiresIn": TOKEN_LIFETIME_IN_SECONDS,
+            "refreshToken": secrets.token_urlsafe(64),
+            "tokenType": "Bearer",
+        }
+
+    #
+    # SSO
+    #
+
+    def _list_accounts(self, params: dict[str, Any], _: str) -> dict[str, Any]:
+        page, next_token = self._paginate(self.account_ids, params)
+
+        response = {
+            "accountList": [
+                {
+                    "accountId": account_id,
+                    "accountName": self.accounts[account_id]["account_name"],
+                    "emailAddress": self.accounts[account_id]["email"],
+                }
+                for account_id in page
+            ]
+        }
+
+        if next_token:
+            response["nextToken"] = next_token
+
+        return response
+
+    def _list_account_roles(self, params: dict[str, Any], _: str) -> dict[str, Any]:
+        account = self._get_account(params.get("account_id", ""))
+        page, next_token = self._paginate(account["sso_roles"], params)
+
+        response = {
+            "roleList": [
+                {"accountId": account["account_id"], "roleName": role_name}
+                for role_name in page
+            ]
+        }
+
+        if next_token:
+            response["nextToken"] = next_token
+
+        return response
+
+    def _get_role_credentials(self, params: dict[str, Any], _: str) -> dict[str, Any]:
+        account = self._get_account(params.get("account_id", ""))
+
+        if params.get("role_name") not in account["sso_roles"]:
+            raise ServiceError(403, "ForbiddenException", "No access")
+
+        credential = self._issue_credential(account["account_id"])
+        credential["expiration"] = int(credential["expiration"] * 1000)
+
+        return {"roleCredentials": credential}
+
+    #
+    # STS AND IAM
+    #
+
+    def _assume_role(
+        self, params: dict[str, Any], access_key_id: str
+    ) -> dict[str, Any]:
+        self._get_caller_account_id(access_key_id)
+
+        role_arn = params.get("RoleArn", "")
+        account_id = role_arn.split(":")[4] if role_arn.count(":") >= 5 else ""
+        credential = self._issue_credential(self._get_account(account_id)["account_id"])
+
+        return {
+            "Credentials": {
+                "AccessKeyId": credential["accessKeyId"],
+                "Expiration": _format_timestamp(credential["expiration"]),
+                "SecretAccessKey": credential["secretAccessKey"],
+                "SessionToken": credential["sessionToken"],
+            },
+            "AssumedRoleUser": {
+                "Arn": f"{role_arn}/{params.get('RoleSessionName', '')}",
+                "AssumedRoleId": f"AROA{secrets.token_hex(8).upper()}",
+            },
+        }
+
+    def _get_role(self, params: dict[str, Any], access_key_id: str) -> dict[str, Any]:
+        account_id = self._get_caller_account_id(access_key_id)
+        role_name = params.get("RoleName", "")
+
+        # Every account has every role that is asked for.
+        return {
+            "Role": {
+                "Arn": f"arn:aws:iam::{account_id}:role/{role_name}",
+                "CreateDate": _format_timestamp(0),
+                "Path": "/",
+                "RoleId": f"AROA{secrets.token_hex(8).upper()}",
+                "RoleName": role_name,
+            }
+        }
+
+    #
+    # FEDERATION
+    #
+
+    def _get_signin_token(self, params: dict[str, Any], _: str) -> dict[str, Any]:
+        if params.get("Action") != "getSigninToken":
+            raise ServiceError(400, "InvalidAction", "Only getSigninToken is faked")
+
+        session = json.loads(params.get("Session") or "{}")
+        self._get_caller_account_id(session.get("sessionId", ""))
+
+        return {"SigninToken": secrets.token_urlsafe(256)}
+
+    #
+    # HELPERS
+    #
+
+    def _get_account(self, account_id: str) -> dict[str, Any]:
+        if account_id not in self.accounts:
+            raise ServiceError(404, "ResourceNotFoundException", "Account not found")
+
+        return self.accounts[account_id]
+
+    def _get_caller_account_id(self, access_key_id: str) -> str:
+        with self._lock:
+            account_id = self._sessions.get(access_key_id)
+
+        if not account_id:
+            raise ServiceError(403, "InvalidClientTokenId", "Unknown access key")
+
+        return account_id
+
+    def _issue_credential(self, account_id: str) -> dict[str, Any]:
+        access_key_id = f"ASIA{secrets.token_hex(8).upper()}"
+
+        with self._lock:
+            self._sessions[access_key_id] = account_id
+
+        return {
+            "accessKeyId": access_key_id,
+            "expiration": time() + CREDENTIAL_LIFETIME_IN_SECONDS,
+            "secretAccessKey": secrets.token_urlsafe(30),
+            "sessionToken": secrets.token_urlsafe(300),
+        }
+
+    def _paginate(
+        self, items: list[Any], params: dict[str, Any]
+    ) -> tuple[list[Any], str]:
+        offset = int(params.get("next_token") or 0)
+        size = min(int(params.get("max_result") or self.page_size), self.page_size)
+        page = items[offset : offset + size]
+
+        return page, str(offset + size) if offset + size < len(items) else ""
+
+
+#
+# HTTP
+#
+
+
+class _HttpHandler(BaseHTTPRequestHandler):
+    disable_nagle_algorithm = True
+    protocol_version = "HTTP/1.1"
+    server: FakeAwsServer
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+
+        if url.path == "/device":
+            self._reply(200, b"Device approved\n", "text/plain")
+            return
+
+        self._handle(url.path, dict(parse_qsl(url.query)))
+
+    def do_POST(self) -> None:
+        url = urlsplit(self.path)
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+        if self.headers.get("Content-Type", "").startswith(
+            "application/x-www-form-urlencoded"
+        ):
+            self._handle_query(dict(parse_qsl(body.decode())))
+            return
+
+        self._handle(url.path, json.loads(body or b"{}"))
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _handle(self, path: str, params: dict[str, Any]) -> None:
+        operation = JSON_OPERATIONS.get((self.command, path.rstrip("/")))
+
+        if not operation:
+            self._reply_json_error(ServiceError(404, "UnknownOperation", path))
+            return
+
+        try:
+            response = self.server.handle_operation(operation, params)
+        except ServiceError as e:
+            self._reply_json_error(e)
+            return
+
+        self._reply(200, json.dumps(response).encode(), "application/json")
+
+    def _handle_query(self, params: dict[str, Any]) -> None:
+        action = params.get("Action", "")
+        namespace = QUERY_OPERATIONS.get(action, STS_NAMESPACE)
+        match = ACCESS_KEY_PATTERN.search(self.headers.get("Authorization", ""))
+
+        try:
+            if action not in QUERY_OPERATIONS:
+                raise ServiceError(400, "InvalidAction", f"Unknown action {action}")
+
+            response = self.server.handle_operation(
+                action, params, match.group(1) if match else ""
+            )
+        except ServiceError as e:
+            # The query protocol throttles with a 400 and its own code.
+            code = "Throttling" if e.status == 429 else e.code
+            payload = (
+                f'<ErrorResponse xmlns="{namespace}"><Error>'
+                f"<Type>{'Receiver' if e.status >= 500 else 'Sender'}</Type>"
+                f"<Code>{code}</Code><Message>{escape(str(e))}</Message>"
+                f"</Error><RequestId>{secrets.token_hex(16)}</RequestId></ErrorResponse>"
+            )
+            self._reply(
+                400 if e.status == 429 else e.status, payload.encode(), "text/xml"
+            )
+            return
+
+        payload = (
+            f'<{action}Response xmlns="{namespace}">'
+            f"<{action}Result>{_to_xml(response)}</{action}Result>"
+            f"<ResponseMetadata><RequestId>{secrets.token_hex(16)}</RequestId>"
+            f"</ResponseMetadata></{action}Response>"
+        )
+        self._reply(200, payload.encode(), "text/xml")
+
+    def _reply(self, status: int, payload: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _reply_json_error(self, error: ServiceError) -> None:
+        payload = json.dumps({"__type": error.code, "message": str(error)})
+
+        self.send_response(error.status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("x-amzn-ErrorType", error.code)
+        self.end_headers()
+        self.wfile.write(payload.encode())
+
+
+#
+# FUNCTIONS
+#
+
+
+def _format_timestamp(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime(
+        "%Y-%m-%dT%H:%M:%SZ"
+    )
+
+
+def _to_snake_case(name: str) -> str:
+    return re.sub(r"(?<!^)(?=[A-Z])", "_", name).lower()
+
+
+def _to_xml(value: dict[str, Any]) -> str:
+    return "".join(
+        f"<{key}>{_to_xml(item) if isinstance(item, dict) else escape(str(item))}</{key}>"
+        for key, item in value.items()
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.server",
+        description="Serve a fake of the AWS APIs grawsp uses",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", default=4566, type=int)
+    parser.add_argument("--accounts", default=1000, type=int)
+    parser.add_argument(
+        "--latency-ms",
+        default=0.0,
+        type=float,
+        help="Latency added to every call",
+    )
+    parser.add_argument(
+        "--page-size",
+        default=20,
+        type=int,
+        help="Most accounts or roles returned per page",
+    )
+    parser.add_argument(
+        "--throttle-rate",
+        default=0.0,
+        type=float,
+        help="Fraction of the calls that are throttled",
+    )
+    parser.add_argument(
+        "--error-rate",
+        default=0.0,
+        type=float,
+        help="Fraction of the calls that fail with a server error",
+    )
+    parser.add_argument("--seed", default=None, type=int)
+    args = parser.parse_args(argv)
+
+    server = FakeAwsServer(
+        (args.host, args.port),
+        catalog=make_catalog(args.accounts),
+        latency=args.latency_ms / 1000,
+        page_size=args.page_size,
+        throttle_rate=args.throttle_rate,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+
+    print(
+        f"Serving fake AWS with {args.accounts} accounts on {server.url}\n"
+        f"Set endpoint_url = {server.url} in the [aws] section to use it",
+        flush=True,
+    )
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+        for operation, calls in sorted(server.calls.items()):
+            print(f"{operation}: {calls} calls")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+from __future__ import annotations
+
+import os
+import statistics
+import sys
+import tracemalloc
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from time import perf_counter
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+from src.commands.grawsp.actions.aws import create_credential, create_signin_token
+from src.commands.grawsp.app import GrawspApp
+from src.commands.grawsp.database.engine import create_database_engine
+from src.commands.grawsp.database.migrations import migrate
+from src.commands.grawsp.database.models import Authorization, Realm
+from src.commands.grawsp.database.repository import Repository
+
+from .fakes import FakeAws, fake_aws, make_catalog
+
+REALM_NAME = "landing-zone"
+REGION = "eu-central-1"
+
+#
+# WORKSPACE
+#
+
+
+@contextmanager
+def _quiet() -> Iterator[None]:
+    # Commands render to the terminal, which would be measured as well.
+    sys.stdout.flush()
+    sys.stderr.flush()
+
+    saved = [os.dup(1), os.dup(2)]
+    null = os.open(os.devnull, os.O_WRONLY)
+
+    try:
+        os.dup2(null, 1)
+        os.dup2(null, 2)
+        yield
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.dup2(saved[0], 1)
+        os.dup2(saved[1], 2)
+
+        for descriptor in (null, *saved):
+            os.close(descriptor)
+
+
+class Workspace:
+    def __init__(self, path: Path, size: int) -> None:
+        self.config_path = path / "grawsp.conf"
+        self.database_path = path / "grawsp.db"
+        self.path = path
+        self.size = size
+
+        self.config_path.write_text(
+            f"[aws]\ndefault_realm = {REALM_NAME}\ndefault_region = {REGION}\n"
+            f"[database]\npath = {self.database_path.as_posix()}\n"
+            f"[{REALM_NAME}]\ndefault_role = ReadOnly\n"
+            "start_url = https://example.awsapps.com/start/\n"
+        )
+
+        self.database_engine = create_database_engine(self.database_path)
+        migrate(self.database_engine)
+
+        with Session(self.database_engine) as session:
+            session.add(
+                Authorization(
+                    client_access_token="token",
+                    client_access_token_expires_at=4102444800.0,
+                    client_id="client-id",
+                    client_name="grawsp",
+                    client_secret="client-secret",
+                    client_secret_expires_at=4102444800.0,
+                    device_code="device-code",
+                    device_expires_at=4102444800.0,
+                    realm=Realm(name=REALM_NAME, url="https://example.awsapps.com/"),
+                    region=REGION,
+                )
+            )
+            session.commit()
+
+    def run(self, *argv: str) -> None:
+        with (
+            _quiet(),
+            GrawspApp(
+                argv=list(argv), config_files=[self.config_path.as_posix()]
+            ) as app,
+        ):
+            app.run()
+
+
+#
+# BENCHMARKS
+#
+
+# A benchmark returns how many operations it ran, or the latency of each one.
+Benchmark = Callable[[Workspace], "int | list[float]"]
+
+
+def _create_credentials(workspace: Workspace, force_refresh: bool) -> list[float]:
+    latencies = []
+
+    with Repository(workspace.database_engine) as repository:
+        for number in range(min(workspace.size, 500)):
+            started_at = perf_counter()
+            create_credential(
+                repository,
+                account_name=f"account-{number}",
+                realm_name=REALM_NAME,
+                region=REGION,
+                role_name="ReadOnly",
+                force_refresh=force_refresh,
+            )
+            latencies.append(perf_counter() - started_at)
+
+    return latencies
+
+
+def _create_signin_tokens(workspace: Workspace) -> list[float]:
+    latencies = []
+
+    with Repository(workspace.database_engine) as repository:
+        for number in range(min(workspace.size, 500)):
+            started_at = perf_counter()
+            credential = create_credential(
+                repository,
+                account_name=f"account-{number}",
+                realm_name=REALM_NAME,
+                region=REGION,
+                role_name="ReadOnly",
+            )
+            create_signin_token(repository, credential)
+            latencies.append(perf_counter() - started_at)
+
+    return latencies
+
+
+def _search(workspace: Workspace, pattern: str, rounds: int = 20) -> list[float]:
+    latencies = []
+
+    with Repository(workspace.database_engine) as repository:
+        for _ in range(rounds):
+            started_at = perf_counter()
+            repository.search_accounts(REALM_NAME, pattern)
+            latencies.append(perf_counter() - started_at)
+
+    return latencies
+
+
+def _command(*argv: str, operations: Callable[[int], int] = lambda size: 1):
+    def benchmark(workspace: Workspace) -> int:
+        workspace.run(*argv)
+        return operations(workspace.size)
+
+    return benchmark
+
+
+def _count_matches(prefix: str) -> Callable[[int], int]:
+    return lambda size: sum(
+        1 for number in range(size) if f"account-{number}".startswith(prefix)
+    )
+
+
+# They run in this order against the same workspace, every one relies on the
+# state the ones before it left behind.
+BENCHMARKS: list[tuple[str, Benchmark]] = [
+    ("sync.initial", _command("sync", operations=lambda size: size)),
+    ("sync.unchanged", _command("sync", operations=lambda size: size)),
+    ("search.prefix", lambda workspace: _search(workspace, "^account-1")),
+    ("search.regex", lambda workspace: _search(workspace, ".*-1$")),
+    # Before anything is minted, so that every size measures only misses.
+    (
+        "auth.regex",
+        _command(
+            "auth",
+            "--parallel",
+            "8",
+            "^account-2",
+            operations=_count_matches("account-2"),
+        ),
+    ),
+    ("create_credential.miss", lambda workspace: _create_credentials(workspace, True)),
+    ("create_credential.hit", lambda workspace: _create_credentials(workspace, False)),
+    ("signin_token.miss", _create_signin_tokens),
+    ("signin_token.hit", _create_signin_tokens),
+    ("list.accounts", _command("list", "accounts")),
+    ("list.creds", _command("list", "creds", "--sort", "expiry")),
+    (
+        "export.credentials",
+        _command("export", "--path", "credentials", operations=lambda size: 1),
+    ),
+    (
+        "export.credential_process",
+        _command(
+            "export",
+            "--credential-process",
+            "--config-path",
+            "config",
+            operations=lambda size: size * 2,
+        ),
+    ),
+]
+
+#
+# FUNCTIONS
+#
+
+
+def measure(
+    name: str,
+    benchmark: Benchmark,
+    workspace: Workspace,
+    memory: bool = True,
+) -> dict[str, Any]:
+    if memory:
+        tracemalloc.start()
+
+    started_at = perf_counter()
+    outcome = benchmark(workspace)
+    seconds = perf_counter() - started_at
+
+    result: dict[str, Any] = {
+        "name": name,
+        "size": workspace.size,
+        "seconds": seconds,
+    }
+
+    if memory:
+        result["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    if isinstance(outcome, list):
+        quantiles = statistics.quantiles(outcome, n=100, method="inclusive")
+        result["operations"] = len(outcome)
+        result["latency_p50_ms"] = quantiles[49] * 1000
+        result["latency_p95_ms"] = quantiles[94] * 1000
+    else:
+        result["operations"] = outcome
+
+    result["throughput"] = result["operations"] / seconds if seconds else 0.0
+
+    return result
+
+
+def run_suite(
+    path: Path,
+    sizes: list[int],
+    latency: float = 0.0,
+    memory: bool = True,
+    only: list[str] | None = None,
+    on_result: Callable[[dict[str, Any]], None] | None = None,
+) -> list[dict[str, Any]]:
+    results = []
+    cwd = Path.cwd()
+
+    for size in sizes:
+        workspace_path = path / f"{size}"
+        workspace_path.mkdir(parents=True, exist_ok=True)
+        workspace = Workspace(workspace_path, size)
+
+        # Exported files are written relative to the workspace.
+        os.chdir(workspace_path)
+
+        try:
+            with fake_aws(FakeAws(make_catalog(size), latency=latency)):
+                for name, benchmark in BENCHMARKS:
+                    if only and not any(name.startswith(prefix) for prefix in only):
+                        continue
+
+                    result = measure(name, benchmark, workspace, memory=memory)
+                    results.append(result)
+
+                    if on_result:
+                        on_result(result)
+        finally:
+            os.chdir(cwd)
+            workspace.database_engine.dispose()
+
+    return results
@@ -4,23 +4,41 @@ import re
 import webbrowser
 from datetime import datetime, timedelta
 from time import sleep
+from typing import Any
 
 from botocore.exceptions import ClientError
-from sqlalchemy import Engine
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, insert, select, tuple_, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
+from ....services.aws.iam import find_role_by_name
 from ....services.aws.sso import (
     assume_sso_role,
     authorize_device,
     create_access_token,
+    refresh_access_token,
     register_client,
 )
-from ....services.aws.sts import assume_role
+from ....services.aws.sts import (
+    SIGNIN_TOKEN_LIFETIME_IN_SECONDS,
+    assume_role,
+    build_role_arn,
+    get_signin_token,
+)
 from ..constants import APP_NAME
-from ..database.models import Account, Authorization, Credential, Realm, SsoRole
+from ..database.models import (
+    Account,
+    Authorization,
+    Credential,
+    Realm,
+    RoleArn,
+    SsoRole,
+)
+from ..database.repository import Repository
 from ..defaults import (
+    DEFAULT_CREDENTIAL_REFRESH_MARGIN_IN_SECONDS,
     DEFAULT_RETRY_AFTER_IN_SECONDS,
     DEFAULT_SESSION_DURATION_IN_SECONDS,
+    DEFAULT_SIGNIN_TOKEN_MARGIN_IN_SECONDS,
     DEFAULT_TIMEOUT_IN_SECONDS,
 )
 from ..exceptions import (
@@ -30,90 +48,202 @@ from ..exceptions import (
 )
 
 
+def _assume_role_by_arn(
+    repository: Repository,
+    account: Account,
+    intermediary_credential: Credential,
+    region: str,
+    role_name: str,
+    session_name: str,
+) -> dict[str, Any]:
+    credentials = {
+        "access_key_id": intermediary_credential.access_key_id,
+        "secret_access_key": intermediary_credential.secret_access_key,
+        "session_token": intermediary_credential.session_token,
+    }
+
+    # Most roles live at the root path, so their ARN is known without asking
+    # IAM. Only roles that turned out to live elsewhere are cached.
+    role_arn = repository.find_role_arn(account.id, role_name) or build_role_arn(
+        account.number, role_name
+    )
+
+    try:
+        return assume_role(
+            duration=DEFAULT_SESSION_DURATION_IN_SECONDS,
+            region=region,
+            role_arn=role_arn,
+            role_name=role_name,
+            session_name=session_name,
+            **credentials,
+        )
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "AccessDenied":
+            raise e
+
+        # Without a role at another path the original denial is what counts,
+        # also when the intermediary role is not allowed to look roles up.
+        try:
+            role = find_role_by_name(region=region, role_name=role_name, **credentials)
+        except ClientError as lookup_error:
+            raise e from lookup_error
+
+        if not role or role["role_arn"] == role_arn:
+            raise e
+
+    repository.session.execute(
+        sqlite_insert(RoleArn)
+        .values(account_id=account.id, arn=role["role_arn"], role_name=role_name)
+        .on_conflict_do_update(
+            index_elements=[RoleArn.account_id, RoleArn.role_name],
+            set_={"arn": role["role_arn"]},
+        )
+    )
+    repository.session.commit()
+
+    return assume_role(
+        duration=DEFAULT_SESSION_DURATION_IN_SECONDS,
+        region=region,
+        role_arn=role["role_arn"],
+        role_name=role_name,
+        session_name=session_name,
+        **credentials,
+    )
+
+
+def _set_access_token(
+    authorization: Authorization,
+    access_token_data: dict[str, Any],
+) -> None:
+    authorization.client_access_token = access_token_data["client_access_token"]
+    authorization.client_access_token_expires_at = access_token_data[
+        "client_access_token_expires_at"
+    ]
+    authorization.refresh_token = access_token_data["refresh_token"]
+
+
 def create_credential(
-    database_engine: Engine,
+    repository: Repository,
     account_name: str,
     realm_name: str,
     region: str,
     role_name: str,
     session_name: str = "",
     intermediary_role_name: str = "",
+    force_refresh: bool = False,
 ) -> Credential:
-    with Session(database_engine, expire_on_commit=False) as session:
-        credential = find_credential(
-            account_name, database_engine, realm_name, role_name
-        )
+    context = repository.find_credential_context(
+        realm_name, region, account_name, role_name
+    )
 
-        if credential:
-            if not credential.is_expired():
-                return credential
-            else:
-                session.delete(credential)
-                session.commit()
+    if not context:
+        raise NotFoundAppError(f"Account {account_name} was not found")
 
-        authorization = find_authorization(database_engine, realm_name, region)
+    account, authorization, credential = context
 
-        if not authorization:
-            raise NotFoundAppError("Authorization not found")
+    # The AWS SDKs refresh credentials that are about to expire on every call,
+    # so those are minted again instead of served from the cache.
+    if (
+        credential
+        and not credential.is_expired(DEFAULT_CREDENTIAL_REFRESH_MARGIN_IN_SECONDS)
+        and not force_refresh
+    ):
+        return credential
 
-        account = find_account_by_name(database_engine, realm_name, account_name)
+    if not authorization:
+        raise NotFoundAppError("Authorization not found")
 
-        if not account:
-            raise NotFoundAppError(f"Account {account_name} was not found")
+    is_sso = any(sso_role.name == role_name for sso_role in account.sso_roles)
 
-        is_sso = (
-            session.query(SsoRole)
-            .where(SsoRole.name == role_name, SsoRole.account_id == account.id)
-            .first()
-            is not None
+    if is_sso:
+        creds = assume_sso_role(
+            access_token=authorization.client_access_token,
+            account_id=account.number,
+            region=region,
+            role_name=role_name,
+        )
+    else:
+        if not intermediary_role_name:
+            raise RuntimeAppError("An intermediary role was not provided")
+
+        intermediary_creds = create_credential(
+            repository,
+            account_name,
+            realm_name,
+            region,
+            role_name=intermediary_role_name,
         )
 
-        if is_sso:
-            creds = assume_sso_role(
-                access_token=authorization.client_access_token,
-                account_id=account.number,
-                region=region,
-                role_name=role_name,
-            )
-        else:
-            if not intermediary_role_name:
-                raise RuntimeAppError("An intermediary role was not provided")
-
-            intermediary_creds = create_credential(
-                database_engine,
-                account_name,
-                realm_name,
-                region,
-                role_name=intermediary_role_name,
-            )
-
-            creds = assume_role(
-                access_key_id=intermediary_creds.access_key_id,
-                duration=DEFAULT_SESSION_DURATION_IN_SECONDS,
-                region=region,
-                role_name=role_name,
-                secret_access_key=intermediary_creds.secret_access_key,
-                session_name=session_name,
-                session_token=intermediary_creds.session_token,
-            )
-
-        credential = Credential(
-            access_key_id=creds["access_key_id"],
-            account_id=account.id,
-            expires_at=creds["expires_at"],
+        creds = _assume_role_by_arn(
+            repository=repository,
+            account=account,
+            intermediary_credential=intermediary_creds,
+            region=region,
             role_name=role_name,
-            secret_access_key=creds["secret_access_key"],
-            session_token=creds["session_token"],
+            session_name=session_name,
         )
 
-        session.add(credential)
-        session.commit()
+    # Concurrent commands may mint the same credential, the last one wins and
+    # there is always at most one row per account and role.
+    values = {
+        "access_key_id": creds["access_key_id"],
+        "expires_at": creds["expires_at"],
+        "issued_at": datetime.now().timestamp(),
+        "secret_access_key": creds["secret_access_key"],
+        "session_token": creds["session_token"],
+        # Sign-in tokens belong to the credential they were issued for.
+        "signin_token": None,
+        "signin_token_expires_at": None,
+    }
+
+    credential = repository.session.scalars(
+        sqlite_insert(Credential)
+        .values(account_id=account.id, role_name=role_name, **values)
+        .on_conflict_do_update(
+            index_elements=[Credential.account_id, Credential.role_name],
+            set_=values,
+        )
+        .returning(Credential),
+        execution_options={"populate_existing": True},
+    ).one()
+
+    repository.session.commit()
 
     return credential
 
 
+def create_signin_token(
+    repository: Repository,
+    credential: Credential,
+    timeout: int = DEFAULT_TIMEOUT_IN_SECONDS,
+) -> tuple[str, bool]:
+    now = datetime.now().timestamp()
+
+    # A token is only reused while there is still time left to sign in with it.
+    if (
+        credential.signin_token
+        and (credential.signin_token_expires_at or 0)
+        > now + DEFAULT_SIGNIN_TOKEN_MARGIN_IN_SECONDS
+    ):
+        return credential.signin_token, True
+
+    credential.signin_token = get_signin_token(
+        access_key_id=credential.access_key_id,
+        secret_access_key=credential.secret_access_key,
+        session_token=credential.session_token,
+        timeout=timeout,
+    )
+    credential.signin_token_expires_at = min(
+        now + SIGNIN_TOKEN_LIFETIME_IN_SECONDS, credential.expires_at
+    )
+
+    repository.session.commit()
+
+    return credential.signin_token, False
+
+
 def create_authorization(
-    database_engine: Engine,
+    repository: Repository,
     realm_name: str,
     region: str,
     start_url: str,
@@ -121,221 +251,291 @@ def create_authorization(
     retry_after: int = DEFAULT_RETRY_AFTER_IN_SECONDS,
     timeout: int = DEFAULT_TIMEOUT_IN_SECONDS,
 ) -> Authorization:
-    with Session(database_engine) as session:
-        realm = create_realm(
-            database_engine=database_engine,
-            realm_name=realm_name,
-            start_url=start_url,
+    realm = create_realm(
+        repository=repository,
+        realm_name=realm_name,
+        start_url=start_url,
+    )
+
+    authorization = repository.find_authorization(
+        realm_name=realm_name,
+        region=region,
+    )
+
+    if not authorization:
+        authorization = Authorization(
+            client_name=client_name,
+            realm=realm,
+            region=region,
         )
 
-        authorization = find_authorization(
-            database_engine=database_engine,
-            realm_name=realm_name,
+    if authorization.is_client_secret_expired():
+        client_registration_data = register_client(
+            name=client_name,
             region=region,
         )
 
-        if not authorization:
-            authorization = Authorization(
-                client_name=client_name,
-                realm=realm,
-                region=region,
-            )
-
-        if authorization.is_client_secret_expired():
-            client_registration_data = register_client(
-                name=client_name,
-                region=region,
-            )
+        authorization.client_secret = client_registration_data["client_secret"]
+        authorization.client_id = client_registration_data["client_id"]
+        authorization.client_secret_expires_at = client_registration_data[
+            "client_secret_expires_at"
+        ]
+        # Refresh tokens are bound to the client they were issued to.
+        authorization.refresh_token = None
 
-            authorization.client_secret = client_registration_data["client_secret"]
-            authorization.client_id = client_registration_data["client_id"]
-            authorization.client_secret_expires_at = client_registration_data[
-                "client_secret_expires_at"
-            ]
-
-        if (
-            authorization.is_device_expired()
-            and authorization.is_client_access_token_expired()
-        ):
-            device_authorization_data = authorize_device(
+    if authorization.is_client_access_token_expired() and authorization.refresh_token:
+        try:
+            access_token_data = refresh_access_token(
                 client_id=authorization.client_id,
                 client_secret=authorization.client_secret,
+                refresh_token=authorization.refresh_token,
                 region=authorization.region,
-                start_url=start_url,
             )
+        except ClientError:
+            # Expired or revoked, the user has to approve a new device.
+            authorization.refresh_token = None
+        else:
+            _set_access_token(authorization, access_token_data)
+
+    interval = retry_after
+
+    if (
+        authorization.is_device_expired()
+        and authorization.is_client_access_token_expired()
+    ):
+        device_authorization_data = authorize_device(
+            client_id=authorization.client_id,
+            client_secret=authorization.client_secret,
+            region=authorization.region,
+            start_url=start_url,
+        )
 
-            authorization.device_code = device_authorization_data["device_code"]
-            authorization.device_expires_at = device_authorization_data[
-                "device_expires_at"
-            ]
-            verfication_url = device_authorization_data["verfication_url"]
-
-            webbrowser.open_new_tab(verfication_url)
+        authorization.device_code = device_authorization_data["device_code"]
+        authorization.device_expires_at = device_authorization_data["device_expires_at"]
+        interval = device_authorization_data["interval"] or retry_after
+        verfication_url = device_authorization_data["verfication_url"]
+
+        webbrowser.open_new_tab(verfication_url)
+
+    if authorization.is_client_access_token_expired():
+        start_time = datetime.now()
+
+        while True:
+            try:
+                access_token_data = create_access_token(
+                    client_id=authorization.client_id,
+                    client_secret=authorization.client_secret,
+                    device_code=authorization.device_code,
+                    region=authorization.region,
+                )
+            except ClientError as e:
+                error_code = e.response["Error"]["Code"]
+
+                # As in RFC 8628, every slow down adds 5 seconds to the interval.
+                if error_code == "SlowDownException":
+                    interval += 5
+                elif error_code != "AuthorizationPendingException":
+                    raise e
+
+                elapsed_time = datetime.now() - start_time
+
+                if elapsed_time >= timedelta(seconds=timeout):
+                    raise TimeoutReachedAppError(
+                        "Authorization was not approved by the user"
+                    ) from e
+
+                sleep(interval)
+            else:
+                break
 
-        if authorization.is_client_access_token_expired():
-            start_time = datetime.now()
+        _set_access_token(authorization, access_token_data)
 
-            while True:
-                try:
-                    access_token_data = create_access_token(
-                        client_id=authorization.client_id,
-                        client_secret=authorization.client_secret,
-                        device_code=authorization.device_code,
-                        region=authorization.region,
-                    )
-                except ClientError as e:
-                    if e.response["Error"]["Code"] != "AuthorizationPendingException":
-                        raise e
+    repository.session.add(authorization)
+    repository.session.commit()
 
-                    elapsed_time = datetime.now() - start_time
+    return authorization
 
-                    if elapsed_time >= timedelta(seconds=timeout):
-                        raise TimeoutReachedAppError(
-                            "Authorization was not approved by the user"
-                        ) from e
 
-                    sleep(retry_after)
-                else:
-                    break
+def create_realm(
+    repository: Repository,
+    realm_name: str,
+    start_url: str,
+) -> Realm:
+    realm = repository.find_realm(realm_name)
 
-            authorization.client_access_token = access_token_data["client_access_token"]
-            authorization.client_access_token_expires_at = access_token_data[
-                "client_access_token_expires_at"
-            ]
+    if not realm:
+        realm = Realm(name=realm_name, url=start_url)
+        repository.session.add(realm)
+    else:
+        realm.url = start_url
 
-        session.add(authorization)
-        session.commit()
+    repository.session.commit()
 
-        return authorization
+    return realm
 
 
-def create_realm(
-    database_engine: Engine,
+def find_accounts(
+    repository: Repository,
     realm_name: str,
-    start_url: str,
-) -> Realm:
-    with Session(database_engine) as session:
-        realm = find_realm(database_engine, realm_name)
-
-        if not realm:
-            realm = Realm(name=realm_name, url=start_url)
-            session.add(realm)
-            session.commit()
-            realm = session.query(Realm).filter_by(name=realm_name).first()
-        else:
-            realm.url = start_url
-            session.commit()
+    identifier: str,
+) -> list[Account]:
+    if identifier.isdigit():
+        account = repository.find_account_by_number(realm_name, identifier)
 
-        return realm
+        return [account] if account else []
 
+    if re.match(r"^[a-z0-9\-]+$", identifier):
+        account = repository.find_account_by_name(realm_name, identifier)
 
-def find_account_by_name(
-    database_engine: Engine,
-    realm_name: str,
-    account_name: str,
-) -> Account | None:
-    realm = find_realm(database_engine, realm_name)
+        return [account] if account else []
 
-    if not realm:
-        return None
+    return repository.search_accounts(realm_name, pattern=identifier)
 
-    with Session(database_engine) as session:
-        account = (
-            session.query(Account)
-            .where(Account.name == account_name, Account.realm_id == realm.id)
-            .first()
-        )
-        return account
 
+def sync_accounts(
+    repository: Repository,
+    authorization_id: int,
+    realm_id: int,
+    accounts_data: list[dict],
+) -> dict[str, int]:
+    session = repository.session
 
-def find_account_by_number(
-    database_engine: Engine,
-    realm_name: str,
-    account_number: str,
-) -> Account | None:
-    realm = find_realm(database_engine, realm_name)
+    stored_accounts = {
+        account.number: account
+        for account in session.execute(
+            select(
+                Account.id,
+                Account.authorization_id,
+                Account.email,
+                Account.name,
+                Account.number,
+            ).where(Account.realm_id == realm_id)
+        )
+    }
 
-    if not realm:
-        return None
+    stored_sso_roles: dict[int, dict[str, int]] = {}
 
-    with Session(database_engine) as session:
-        account = (
-            session.query(Account)
-            .where(Account.realm == realm, Account.number == account_number)
-            .first()
+    for sso_role in session.execute(
+        select(SsoRole.id, SsoRole.account_id, SsoRole.name)
+        .join(Account, Account.id == SsoRole.account_id)
+        .where(Account.realm_id == realm_id)
+    ):
+        stored_sso_roles.setdefault(sso_role.account_id, {})[sso_role.name] = (
+            sso_role.id
         )
-        return account
 
+    synced_numbers = {account_data["account_id"] for account_data in accounts_data}
+    removed_account_ids = [
+        account.id
+        for number, account in stored_accounts.items()
+        if number not in synced_numbers
+    ]
 
-def find_authorization(
-    database_engine: Engine,
-    realm_name: str,
-    region: str,
-) -> Authorization | None:
-    with Session(database_engine) as session:
-        realm = find_realm(database_engine, realm_name)
+    added_accounts = []
+    updated_accounts = []
+    added_sso_roles = []
+    removed_sso_role_ids = []
+    removed_credentials = []
+    changed = 0
 
-        if not realm:
-            return None
+    for account_data in accounts_data:
+        account = stored_accounts.get(account_data["account_id"])
 
-        authorization = (
-            session.query(Authorization)
-            .where(Authorization.realm == realm, Authorization.region == region)
-            .first()
+        if not account:
+            added_accounts.append(account_data)
+            continue
+
+        sso_roles = stored_sso_roles.get(account.id, {})
+        synced_sso_roles = set(account_data["sso_roles"])
+        is_changed = (
+            account.name != account_data["account_name"]
+            or account.email != account_data["email"]
+            or set(sso_roles) != synced_sso_roles
         )
 
-        return authorization
+        if is_changed or account.authorization_id != authorization_id:
+            updated_accounts.append(
+                {
+                    "id": account.id,
+                    "authorization_id": authorization_id,
+                    "email": account_data["email"],
+                    "name": account_data["account_name"],
+                }
+            )
 
+        if not is_changed:
+            continue
 
-def find_credential(
-    account_name: str,
-    database_engine: Engine,
-    realm_name: str,
-    role_name: str,
-) -> Credential | None:
-    account = find_account_by_name(database_engine, realm_name, account_name)
+        changed += 1
 
-    if not account:
-        raise NotFoundAppError(f"Account {account_name} was not found")
+        for name, sso_role_id in sso_roles.items():
+            if name not in synced_sso_roles:
+                removed_sso_role_ids.append(sso_role_id)
+                removed_credentials.append((account.id, name))
 
-    with Session(database_engine) as session:
-        credential = (
-            session.query(Credential)
-            .where(Credential.account == account, Credential.role_name == role_name)
-            .first()
+        added_sso_roles.extend(
+            {"account_id": account.id, "name": name}
+            for name in synced_sso_roles
+            if name not in sso_roles
         )
 
-        return credential
-
-
-def find_realm(
-    database_engine: Engine,
-    realm_name: str,
-) -> Realm | None:
-    with Session(database_engine) as session:
-        realm = session.query(Realm).where(Realm.name == realm_name).first()
-
-        return realm
+    if removed_account_ids:
+        session.execute(
+            delete(Credential).where(Credential.account_id.in_(removed_account_ids))
+        )
+        session.execute(
+            delete(RoleArn).where(RoleArn.account_id.in_(removed_account_ids))
+        )
+        session.execute(
+            delete(SsoRole).where(SsoRole.account_id.in_(removed_account_ids))
+        )
+        session.execute(delete(Account).where(Account.id.in_(removed_account_ids)))
 
+    if removed_sso_role_ids:
+        session.execute(delete(SsoRole).where(SsoRole.id.in_(removed_sso_role_ids)))
 
-def search_accounts(
-    database_engine: Engine,
-    realm_name: str,
-    pattern: str,
-) -> list[Account]:
-    realm = find_realm(database_engine, realm_name)
+    if removed_credentials:
+        session.execute(
+            delete(Credential).where(
+                tuple_(Credential.account_id, Credential.role_name).in_(
+                    removed_credentials
+                )
+            )
+        )
 
-    if not realm:
-        return []
+    if updated_accounts:
+        session.execute(update(Account), updated_accounts)
+
+    if added_accounts:
+        account_ids = session.scalars(
+            insert(Account).returning(Account.id, sort_by_parameter_order=True),
+            [
+                {
+                    "authorization_id": authorization_id,
+                    "email": account_data["email"],
+                    "name": account_data["account_name"],
+                    "number": account_data["account_id"],
+                    "realm_id": realm_id,
+                }
+                for account_data in added_accounts
+            ],
+        ).all()
+
+        added_sso_roles.extend(
+            {"account_id": account_id, "name": sso_role}
+            for account_id, account_data in zip(
+                account_ids, added_accounts, strict=True
+            )
+            for sso_role in account_data["sso_roles"]
+        )
 
-    accounts = []
+    if added_sso_roles:
+        session.execute(insert(SsoRole), added_sso_roles)
 
-    with Session(database_engine) as session:
-        all_accounts = session.query(Account).where(Account.realm == realm).all()
-        accounts = [
-            account
-            for account in all_accounts
-            if re.match(pattern, account.number) or re.match(pattern, account.name)
-        ]
+    session.commit()
 
-    return accounts
+    return {
+        "added": len(added_accounts),
+        "changed": changed,
+        "removed": len(removed_account_ids),
+    }
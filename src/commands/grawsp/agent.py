@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import hmac
+import json
+import socketserver
+from collections.abc import Callable
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock
+from time import time
+from typing import Any
+from urllib.parse import unquote, urlsplit
+
+from .credential_process import format_credential
+from .defaults import DEFAULT_CREDENTIAL_REFRESH_MARGIN_IN_SECONDS
+
+CredentialKey = tuple[str, str, str]
+
+#
+# CACHE
+#
+
+
+class CredentialCache:
+    def __init__(
+        self,
+        mint: Callable[[str, str, str], dict[str, Any]],
+        clock: Callable[[], float] = time,
+        margin: float = DEFAULT_CREDENTIAL_REFRESH_MARGIN_IN_SECONDS,
+    ) -> None:
+        self._clock = clock
+        self._credentials: dict[CredentialKey, dict[str, Any]] = {}
+        self._key_locks: dict[CredentialKey, Lock] = {}
+        self._lock = Lock()
+        self._margin = margin
+        self._mint = mint
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, realm_name: str, identifier: str, role_name: str) -> dict[str, Any]:
+        key = (realm_name, identifier, role_name)
+        credential = self._credentials.get(key)
+
+        if self._is_fresh(credential):
+            self.hits += 1
+            return credential
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, Lock())
+
+        # Concurrent misses for the same key wait for a single mint.
+        with key_lock:
+            credential = self._credentials.get(key)
+
+            if self._is_fresh(credential):
+                self.hits += 1
+                return credential
+
+            self.misses += 1
+            credential = self._mint(realm_name, identifier, role_name)
+            self._credentials[key] = credential
+
+            return credential
+
+    def put(
+        self,
+        realm_name: str,
+        identifier: str,
+        role_name: str,
+        credential: dict[str, Any],
+    ) -> None:
+        self._credentials[(realm_name, identifier, role_name)] = credential
+
+    # The SDKs refresh credentials inside the margin on every call, so those
+    # count as misses.
+    def _is_fresh(self, credential: dict[str, Any] | None) -> bool:
+        return bool(
+            credential and credential["expires_at"] > self._clock() + self._margin
+        )
+
+
+#
+# HTTP
+#
+
+
+class _HttpHandler(BaseHTTPRequestHandler):
+    # Headers and body go out in separate writes, without this every response
+    # on a kept alive connection waits for a delayed ACK.
+    disable_nagle_algorithm = True
+    protocol_version = "HTTP/1.1"
+    server: CredentialHttpServer
+
+    def do_GET(self) -> None:
+        token = self.server.authorization_token
+
+        if token and not hmac.compare_digest(
+            self.headers.get("Authorization", ""), token
+        ):
+            self._reply(401, {"message": "Unauthorized"})
+            return
+
+        parts = [unquote(part) for part in urlsplit(self.path).path.split("/") if part]
+
+        if len(parts) == 2:
+            parts.insert(0, self.server.default_realm_name)
+
+        if len(parts) != 3:
+            self._reply(404, {"message": "Use /[realm/]account/role"})
+            return
+
+        try:
+            credential = self.server.cache.get(*parts)
+        except Exception as e:
+            self._reply(500, {"message": str(e)})
+            return
+
+        self._reply(
+            200,
+            {
+                "AccessKeyId": credential["access_key_id"],
+                "Expiration": datetime.fromtimestamp(
+                    credential["expires_at"], tz=timezone.utc
+                ).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "SecretAccessKey": credential["secret_access_key"],
+                "Token": credential["session_token"],
+            },
+        )
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _reply(self, status: int, body: dict[str, Any]) -> None:
+        payload = json.dumps(body).encode()
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class CredentialHttpServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        cache: CredentialCache,
+        default_realm_name: str,
+        authorization_token: str = "",
+    ) -> None:
+        self.authorization_token = authorization_token
+        self.cache = cache
+        self.default_realm_name = default_realm_name
+
+        super().__init__(address, _HttpHandler)
+
+
+#
+# UNIX SOCKET
+#
+
+
+class _SocketHandler(socketserver.StreamRequestHandler):
+    server: CredentialSocketServer
+
+    def handle(self) -> None:
+        # One JSON request per line, answered by one credential_process JSON
+        # document per line, for as long as the client keeps the connection.
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                credential = self.server.cache.get(
+                    request.get("realm") or self.server.default_realm_name,
+                    request["account"],
+                    request.get("role", ""),
+                )
+            except Exception as e:
+                response = json.dumps({"Error": str(e)})
+            else:
+                response = format_credential(
+                    access_key_id=credential["access_key_id"],
+                    expires_at=credential["expires_at"],
+                    secret_access_key=credential["secret_access_key"],
+                    session_token=credential["session_token"],
+                )
+
+            self.wfile.write(f"{response}\n".encode())
+
+
+class CredentialSocketServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        path: str,
+        cache: CredentialCache,
+        default_realm_name: str,
+    ) -> None:
+        self.cache = cache
+        self.default_realm_name = default_realm_name
+
+        super().__init__(path, _SocketHandler)
@@ -1,18 +1,27 @@
+from __future__ import annotations
+
 import traceback
+from functools import cached_property
+from typing import TYPE_CHECKING
 
 from cement import App
 
 from .config import DEFAULT_CONFIG
 from .constants import APP_NAME
 from .controllers.about import AboutController
+from .controllers.agent import AgentController
 from .controllers.auth import AuthController
 from .controllers.base import BaseController
+from .controllers.credential_process import CredentialProcessController
 from .controllers.export import ExportController
 from .controllers.list import ListController
 from .controllers.open_console import OpenConsoleController
 from .controllers.sync import SyncController
 from .exceptions import AppError
-from .hooks import database_hook
+from .hooks import aws_clients_hook
+
+if TYPE_CHECKING:
+    from sqlalchemy import Engine
 
 #
 # APP
@@ -38,7 +47,9 @@ class GrawspApp(App):
         handlers = [
             BaseController,
             AboutController,
+            AgentController,
             AuthController,
+            CredentialProcessController,
             ExportController,
             ListController,
             OpenConsoleController,
@@ -46,9 +57,17 @@ class GrawspApp(App):
         ]
 
         hooks = [
-            ("post_setup", database_hook),
+            ("post_setup", aws_clients_hook),
         ]
 
+    # SQLAlchemy is only loaded, and the database only opened and migrated, by
+    # the commands that use it.
+    @cached_property
+    def database_engine(self) -> Engine:
+        from .database.engine import open_database_engine
+
+        return open_database_engine(self.config)
+
 
 #
 # START
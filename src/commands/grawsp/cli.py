@@ -0,0 +1,16 @@
+import sys
+
+from .credential_process import run_fast_path
+
+
+def run() -> None:
+    if run_fast_path(sys.argv[1:]):
+        return
+
+    from .app import run as run_app
+
+    run_app()
+
+
+if __name__ == "__main__":
+    run()
@@ -4,36 +4,72 @@ from cement import init_defaults
 
 from .constants import APP_NAME
 from .defaults import (
+    DEFAULT_AGENT_HOST,
+    DEFAULT_AGENT_PORT,
     DEFAULT_AWS_REGION,
+    DEFAULT_DATABASE_BUSY_TIMEOUT_IN_SECONDS,
+    DEFAULT_DATABASE_POOL_SIZE,
+    DEFAULT_MAX_POOL_CONNECTIONS,
+    DEFAULT_REFRESH_FRACTION,
+    DEFAULT_REFRESH_JITTER,
+    DEFAULT_REQUEST_BURST,
+    DEFAULT_REQUEST_RATE,
     DEFAULT_RETRY_AFTER_IN_SECONDS,
+    DEFAULT_SYNC_CONCURRENCY,
     DEFAULT_TIMEOUT_IN_SECONDS,
 )
 
 DEFAULT_CONFIG = init_defaults(
+    "agent",
     "aws",
     "database",
     "general",
     "user",
 )
 
+#
+# AGENT
+#
+
+DEFAULT_CONFIG["agent"]["host"] = DEFAULT_AGENT_HOST
+DEFAULT_CONFIG["agent"]["port"] = DEFAULT_AGENT_PORT
+DEFAULT_CONFIG["agent"]["refresh_fraction"] = DEFAULT_REFRESH_FRACTION
+DEFAULT_CONFIG["agent"]["refresh_jitter"] = DEFAULT_REFRESH_JITTER
+DEFAULT_CONFIG["agent"]["socket_path"] = (
+    Path(f"~/.local/share/{APP_NAME}/agent.sock").expanduser().absolute().as_posix()
+)
+DEFAULT_CONFIG["agent"]["token"] = ""
+DEFAULT_CONFIG["agent"]["watch"] = ""
+
 #
 # AWS
 #
 
+DEFAULT_CONFIG["aws"]["config_path"] = (
+    Path("~/.aws/config").expanduser().absolute().as_posix()
+)
 DEFAULT_CONFIG["aws"]["credentials_path"] = (
     Path("~/.aws/credentials").expanduser().absolute().as_posix()
 )
 DEFAULT_CONFIG["aws"]["default_realm"] = ""
 DEFAULT_CONFIG["aws"]["default_region"] = DEFAULT_AWS_REGION
+DEFAULT_CONFIG["aws"]["endpoint_url"] = ""
+DEFAULT_CONFIG["aws"]["max_pool_connections"] = DEFAULT_MAX_POOL_CONNECTIONS
+DEFAULT_CONFIG["aws"]["request_burst"] = DEFAULT_REQUEST_BURST
+DEFAULT_CONFIG["aws"]["request_rate"] = DEFAULT_REQUEST_RATE
+DEFAULT_CONFIG["aws"]["sync_concurrency"] = DEFAULT_SYNC_CONCURRENCY
+DEFAULT_CONFIG["aws"]["tcp_keepalive"] = True
 
 
 #
 # DATABASE
 #
 
+DEFAULT_CONFIG["database"]["busy_timeout"] = DEFAULT_DATABASE_BUSY_TIMEOUT_IN_SECONDS
 DEFAULT_CONFIG["database"]["path"] = (
     Path(f"~/.local/share/{APP_NAME}/{APP_NAME}.db").expanduser().absolute().as_posix()
 )
+DEFAULT_CONFIG["database"]["pool_size"] = DEFAULT_DATABASE_POOL_SIZE
 
 #
 # GENERAL
@@ -1,6 +1,4 @@
 from cement import Controller
-from prompt_toolkit import HTML, print_formatted_text
-from prompt_toolkit.styles import Style
 
 
 class AboutController(Controller):
@@ -10,6 +8,9 @@ class AboutController(Controller):
         stacked_type = "nested"
 
     def _default(self) -> None:
+        from prompt_toolkit import HTML, print_formatted_text
+        from prompt_toolkit.styles import Style
+
         print_formatted_text(
             HTML("Developed by <bullet>\\</bullet> <message>Schuberg Philis</message>"),
             style=Style.from_dict(
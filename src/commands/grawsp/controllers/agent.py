@@ -0,0 +1,200 @@
+import re
+import secrets
+from pathlib import Path
+from threading import Thread
+from typing import Any
+
+from cement import Controller
+from inflection import transliterate
+
+from ..constants import APP_NAME
+from ..exceptions import NotFoundAppError
+from ..helpers import get_realm_regions, resolve_role_names
+
+
+class AgentController(Controller):
+    class Meta:
+        label = "agent"
+        stacked_on = "base"
+        stacked_type = "nested"
+
+        arguments = [
+            (
+                ["--port"],
+                {
+                    "default": "",
+                    "help": "The local port of the container credentials endpoint.",
+                    "dest": "port",
+                },
+            ),
+            (
+                ["--watch"],
+                {
+                    "action": "append",
+                    "default": [],
+                    "help": "An account/role pair to keep refreshed, can be repeated.",
+                    "dest": "watch",
+                },
+            ),
+            (
+                ["--socket"],
+                {
+                    "default": "",
+                    "help": "The path of the unix socket to serve credentials on.",
+                    "dest": "socket_path",
+                },
+            ),
+        ]
+
+    def _default(self) -> None:
+        from ..actions.aws import create_credential, find_accounts
+        from ..agent import (
+            CredentialCache,
+            CredentialHttpServer,
+            CredentialSocketServer,
+        )
+        from ..database.repository import Repository
+        from ..refresh import RefreshScheduler
+
+        database_engine = self.app.database_engine
+        host = self.app.config.get("agent", "host")
+        port = int(self.app.pargs.port or self.app.config.get("agent", "port"))
+        realm_name = self.app.pargs.realm or self.app.config.get("aws", "default_realm")
+        socket_path = Path(
+            self.app.pargs.socket_path or self.app.config.get("agent", "socket_path")
+        ).expanduser()
+        token = self.app.config.get("agent", "token") or secrets.token_urlsafe(32)
+        user_name = transliterate(
+            re.sub(
+                r"\s+",
+                "",
+                self.app.config.get("user", "name"),
+                flags=re.UNICODE,
+            ),
+        )
+
+        watched_pairs = [
+            pair.strip()
+            for pair in [
+                *self.app.config.get("agent", "watch").split(","),
+                *self.app.pargs.watch,
+            ]
+            if pair.strip()
+        ]
+
+        def mint(
+            realm_name: str,
+            identifier: str,
+            role_name: str,
+            force_refresh: bool = False,
+        ) -> dict[str, Any]:
+            with Repository(database_engine) as repository:
+                accounts = find_accounts(repository, realm_name, identifier)
+
+                if len(accounts) != 1:
+                    raise NotFoundAppError(
+                        f"Identifier matched {len(accounts)} accounts"
+                    )
+
+                account = accounts[0]
+                role_name, intermediary_role_name = resolve_role_names(
+                    config=self.app.config,
+                    realm_name=realm_name,
+                    account_name=account.name,
+                    sso_roles=[sso_role.name for sso_role in account.sso_roles],
+                    role_name=role_name,
+                )
+
+                credential = create_credential(
+                    repository=repository,
+                    account_name=account.name,
+                    realm_name=realm_name,
+                    region=get_realm_regions(self.app.config, realm_name)[0],
+                    role_name=role_name,
+                    session_name=f"{APP_NAME}-{user_name}",
+                    intermediary_role_name=intermediary_role_name,
+                    force_refresh=force_refresh,
+                )
+
+                self.app.log.info(
+                    f"Minted credentials for {account.name} account as {role_name} role"
+                )
+
+                return {
+                    "access_key_id": credential.access_key_id,
+                    "expires_at": credential.expires_at,
+                    "issued_at": credential.issued_at,
+                    "secret_access_key": credential.secret_access_key,
+                    "session_token": credential.session_token,
+                }
+
+        cache = CredentialCache(mint)
+
+        def refresh(key: tuple[str, str, str]) -> dict[str, Any]:
+            credential = cache.get(*key)
+
+            if scheduler.is_stale(credential):
+                credential = mint(*key, force_refresh=True)
+                cache.put(*key, credential)
+
+            return credential
+
+        scheduler = RefreshScheduler(
+            refresh,
+            refresh_fraction=float(self.app.config.get("agent", "refresh_fraction")),
+            jitter=float(self.app.config.get("agent", "refresh_jitter")),
+        )
+
+        for pair in watched_pairs:
+            parts = pair.split("/")
+
+            if len(parts) == 2:
+                parts.insert(0, realm_name)
+
+            if len(parts) != 3:
+                self.app.log.warning(
+                    f"Ignoring invalid watch {pair}, use [realm/]account/role"
+                )
+                continue
+
+            scheduler.watch(tuple(parts))
+            self.app.log.info(f"Keeping {pair} refreshed")
+
+        socket_path.parent.mkdir(parents=True, exist_ok=True)
+        socket_path.unlink(missing_ok=True)
+
+        http_server = CredentialHttpServer(
+            (host, port),
+            cache=cache,
+            default_realm_name=realm_name,
+            authorization_token=token,
+        )
+        socket_server = CredentialSocketServer(
+            socket_path.as_posix(),
+            cache=cache,
+            default_realm_name=realm_name,
+        )
+        socket_path.chmod(0o600)
+
+        Thread(target=socket_server.serve_forever, daemon=True).start()
+        Thread(target=scheduler.run, daemon=True).start()
+
+        self.app.log.info(f"Serving credentials on unix socket {socket_path}")
+        self.app.log.info(
+            f"Serving container credentials on http://{host}:{http_server.server_port}"
+        )
+        print(
+            f"export AWS_CONTAINER_CREDENTIALS_FULL_URI=http://{host}:{http_server.server_port}/<account>/<role>\n"
+            f"export AWS_CONTAINER_AUTHORIZATION_TOKEN={token}"
+        )
+
+        try:
+            http_server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            scheduler.stop()
+            http_server.server_close()
+            socket_server.shutdown()
+            socket_server.server_close()
+            socket_path.unlink(missing_ok=True)
@@ -1,20 +1,19 @@
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
+from time import perf_counter
 
 from cement import Controller
 from inflection import transliterate
-from sqlalchemy.orm import Session
-
-from ....util.terminal.spinner import Spinner
-from ..actions.aws import (
-    create_authorization,
-    create_credential,
-    find_account_by_name,
-    find_account_by_number,
-    search_accounts,
-)
+
 from ..constants import APP_NAME
-from ..database.models import SsoRole
 from ..exceptions import RuntimeAppError
+from ..helpers import (
+    get_realm_regions,
+    report_scheduler_stats,
+    resolve_realm_names,
+    resolve_role_names,
+)
 
 
 class AuthController(Controller):
@@ -24,6 +23,15 @@ class AuthController(Controller):
         stacked_type = "nested"
 
         arguments = [
+            (
+                ["--all-realms"],
+                {
+                    "action": "store_true",
+                    "default": False,
+                    "help": "Authorize to every configured realm at the same time.",
+                    "dest": "all_realms",
+                },
+            ),
             (
                 ["--from-role"],
                 {
@@ -33,6 +41,15 @@ class AuthController(Controller):
                     "type": str,
                 },
             ),
+            (
+                ["--parallel"],
+                {
+                    "default": 1,
+                    "help": "How many credentials to request at the same time.",
+                    "dest": "parallel",
+                    "type": int,
+                },
+            ),
             (
                 ["--retry-after"],
                 {
@@ -68,11 +85,19 @@ class AuthController(Controller):
         ]
 
     def _default(self) -> None:
+        from ....util.terminal.spinner import Spinner
+        from ..actions.aws import (
+            create_authorization,
+            create_credential,
+            find_accounts,
+        )
+        from ..database.models import Account
+        from ..database.repository import Repository
+
         database_engine = self.app.database_engine
         from_role_name = self.app.pargs.from_role_name
-        intermediary_role_name = ""
-        realm_name = self.app.pargs.realm or self.app.config.get("aws", "default_realm")
-        region = self.app.config.get("aws", "default_region")
+        identifier = self.app.pargs.identifier
+        parallel = self.app.pargs.parallel
         role_name = self.app.pargs.role_name
 
         retry_after = int(
@@ -92,133 +117,173 @@ class AuthController(Controller):
             ),
         )
 
-        with Spinner("Accessing AWS Account") as spinner:
-            if not realm_name:
-                spinner.error("No AWS realm provided")
-                raise RuntimeAppError()
-
-            if not self.app.config.has_section(realm_name):
-                spinner.error("No AWS realm configuration found")
-                raise RuntimeAppError()
-
-            start_url = self.app.config.get(realm_name, "start_url")
-
-            if not start_url:
-                spinner.error("No SSO start url was found")
-                raise RuntimeAppError()
-
-            client_name = APP_NAME
-            spinner.info(f"Using {realm_name} realm")
+        client_name = APP_NAME
+        session_name = f"{client_name}-{user_name}"
 
+        with Spinner("Accessing AWS Account") as spinner:
             try:
-                _ = create_authorization(
-                    client_name=client_name,
-                    database_engine=database_engine,
-                    realm_name=realm_name,
-                    region=region,
-                    retry_after=retry_after,
-                    start_url=start_url,
-                    timeout=timeout,
+                realm_names = resolve_realm_names(
+                    config=self.app.config,
+                    realm_name=self.app.pargs.realm,
+                    all_realms=self.app.pargs.all_realms,
                 )
-            except Exception as e:
-                spinner.error("Could not authorize to AWS", submessage=str(e))
-                raise RuntimeAppError("Could not authorize to AWS") from e
-            else:
-                spinner.success("Authorized to AWS")
-
-            identifier = self.app.pargs.identifier
+            except RuntimeAppError as e:
+                spinner.error(str(e))
+                raise e
+
+            def authorize_realm(realm_name: str) -> int:
+                if not self.app.config.has_section(realm_name):
+                    raise RuntimeAppError("No AWS realm configuration found")
+
+                start_url = self.app.config.get(realm_name, "start_url")
+
+                if not start_url:
+                    raise RuntimeAppError("No SSO start url was found")
+
+                regions = get_realm_regions(self.app.config, realm_name)
+
+                spinner.info(f"Using {realm_name} realm")
+
+                # Sessions can not be shared between threads, so every realm
+                # gets its own repository. Waiting for the approval of a device
+                # in one realm does not hold back the others.
+                with Repository(database_engine) as repository:
+                    for region in regions:
+                        try:
+                            _ = create_authorization(
+                                client_name=client_name,
+                                repository=repository,
+                                realm_name=realm_name,
+                                region=region,
+                                retry_after=retry_after,
+                                start_url=start_url,
+                                timeout=timeout,
+                            )
+                        except Exception as e:
+                            raise RuntimeAppError(
+                                f"Could not authorize to AWS in {region} region, reason: {e}"
+                            ) from e
+
+                        spinner.info(
+                            f"Authorized to {realm_name} realm in {region} region"
+                        )
 
-            if not identifier:
-                return
+                    if not identifier:
+                        return 0
 
-            accounts = []
+                    return authorize_accounts(repository, realm_name, regions[0])
 
-            if identifier.isdigit():
-                account = find_account_by_number(
-                    database_engine, realm_name, account_number=identifier
-                )
+            def authorize_accounts(
+                repository: Repository, realm_name: str, region: str
+            ) -> int:
+                accounts = find_accounts(repository, realm_name, identifier)
 
-                if account:
-                    accounts.append(account)
-            elif re.match(r"^[a-z0-9\-]+$", identifier):
-                account = find_account_by_name(
-                    database_engine, realm_name, account_name=identifier
+                spinner.info(
+                    f"Identifier matched {len(accounts)} accounts in {realm_name} realm"
                 )
 
-                if account:
-                    accounts.append(account)
-            else:
-                accounts = search_accounts(
-                    database_engine, realm_name, pattern=identifier
-                )
+                started_at = perf_counter()
+                failures = 0
+                jobs = []
+
+                for account in accounts:
+                    try:
+                        account_role_name, intermediary_role_name = resolve_role_names(
+                            config=self.app.config,
+                            realm_name=realm_name,
+                            account_name=account.name,
+                            sso_roles=[sso_role.name for sso_role in account.sso_roles],
+                            role_name=role_name,
+                            from_role_name=from_role_name,
+                        )
+                    except RuntimeAppError as e:
+                        failures += 1
+                        spinner.error(
+                            f"Could not authorize to {account.name} account",
+                            submessage=str(e),
+                        )
+                        continue
 
-            spinner.info(f"Identifier matched {len(accounts)} accounts")
+                    if intermediary_role_name:
+                        spinner.info(
+                            f"Using {intermediary_role_name} as an intermediary role for {account.name}"
+                        )
 
-            session_name = f"{client_name}-{user_name}"
+                    jobs.append((account, account_role_name, intermediary_role_name))
+
+                def authorize(job: tuple[Account, str, str]) -> None:
+                    account, role_name, intermediary_role_name = job
+
+                    # Sessions can not be shared between threads, so every
+                    # parallel job gets its own repository.
+                    with (
+                        Repository(database_engine)
+                        if parallel > 1
+                        else nullcontext(repository)
+                    ) as job_repository:
+                        _ = create_credential(
+                            repository=job_repository,
+                            account_name=account.name,
+                            realm_name=realm_name,
+                            region=region,
+                            role_name=role_name,
+                            session_name=session_name,
+                            intermediary_role_name=intermediary_role_name,
+                        )
 
-            for account in accounts:
-                if not role_name and self.app.config.has_option(
-                    account.name, "default_role"
-                ):
-                    role_name = self.app.config.get(account.name, "default_role")
+                with ThreadPoolExecutor(max_workers=max(1, parallel)) as executor:
+                    futures = {executor.submit(authorize, job): job for job in jobs}
+
+                    for future in as_completed(futures):
+                        account, job_role_name, _ = futures[future]
+
+                        try:
+                            future.result()
+                        except Exception as e:
+                            failures += 1
+                            spinner.error(
+                                f"Could not authorize to {account.name} account as {job_role_name} role",
+                                submessage=str(e),
+                            )
+                        else:
+                            spinner.info(
+                                f"Authorized to {account.name} account as {job_role_name} role"
+                            )
 
-                if not role_name and self.app.config.has_option(
-                    realm_name, "default_role"
-                ):
-                    role_name = self.app.config.get(realm_name, "default_role")
+                spinner.info(
+                    f"{len(accounts) - failures} succeeded, {failures} failed"
+                    f" in {realm_name} realm in {perf_counter() - started_at:.1f}s"
+                )
 
-                if not role_name:
-                    spinner.error("AWS role could not be determined")
-                    raise RuntimeAppError()
+                return failures
 
-                spinner.info(f"Using {role_name} role")
+            failed_realms = 0
+            failures = 0
 
-                intermediary_role_name = ""
+            with ThreadPoolExecutor(max_workers=len(realm_names)) as executor:
+                futures = {
+                    executor.submit(authorize_realm, realm_name): realm_name
+                    for realm_name in realm_names
+                }
 
-                with Session(database_engine) as session:
-                    sso_roles = [
-                        role.name
-                        for role in session.query(SsoRole)
-                        .where(SsoRole.account_id == account.id)
-                        .all()
-                    ]
+                for future in as_completed(futures):
+                    realm_name = futures[future]
 
-                if role_name not in sso_roles:
-                    if self.app.config.has_option(account.name, "default_role"):
-                        intermediary_role_name = self.app.config.get(
-                            account.name, "default_role"
+                    try:
+                        failures += future.result()
+                    except Exception as e:
+                        failed_realms += 1
+                        spinner.error(
+                            f"Could not authorize to {realm_name} realm",
+                            submessage=str(e),
                         )
 
-                    if self.app.config.has_option(realm_name, "default_role"):
-                        intermediary_role_name = self.app.config.get(
-                            realm_name, "default_role"
-                        )
+            report_scheduler_stats(self.app.log, spinner)
 
-                    if from_role_name:
-                        intermediary_role_name = from_role_name
-
-                    if not intermediary_role_name:
-                        spinner.error("Intermediary role could not be determined")
-                        raise RuntimeAppError()
-
-                    spinner.info(
-                        f"Using {intermediary_role_name} as an intermediary role"
-                    )
-
-                try:
-                    _ = create_credential(
-                        database_engine=database_engine,
-                        account_name=account.name,
-                        realm_name=realm_name,
-                        region=region,
-                        role_name=role_name,
-                        session_name=session_name,
-                        intermediary_role_name=intermediary_role_name,
-                    )
-                except RuntimeError as e:
-                    spinner.error(f"{e}")
-                    raise RuntimeAppError() from e
+            if failed_realms:
+                raise RuntimeAppError(f"Could not authorize to {failed_realms} realms")
 
-                spinner.info(
-                    f"Authorized to {account.name} account as {role_name} role"
-                )
+            if failures:
+                raise RuntimeAppError(f"Could not authorize to {failures} accounts")
+
+            spinner.success("Authorized to AWS")
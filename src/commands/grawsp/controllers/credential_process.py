@@ -0,0 +1,111 @@
+import re
+
+from cement import Controller
+from inflection import transliterate
+
+from ..constants import APP_NAME
+from ..credential_process import format_credential
+from ..exceptions import NotFoundAppError, RuntimeAppError
+from ..helpers import get_realm_regions, resolve_role_names
+
+
+class CredentialProcessController(Controller):
+    class Meta:
+        label = "credential-process"
+        stacked_on = "base"
+        stacked_type = "nested"
+
+        arguments = [
+            (
+                ["--from-role"],
+                {
+                    "default": "",
+                    "help": "The name of the intermediary role to be assumed before.",
+                    "dest": "from_role_name",
+                    "type": str,
+                },
+            ),
+            (
+                ["--role"],
+                {
+                    "default": "",
+                    "help": "The name of the role you want to assume.",
+                    "dest": "role_name",
+                    "type": str,
+                },
+            ),
+            (
+                ["identifier"],
+                {
+                    "help": "The ID or name identifying the account.",
+                },
+            ),
+        ]
+
+    def _default(self) -> None:
+        from ..actions.aws import create_credential, find_accounts
+        from ..database.repository import Repository
+
+        database_engine = self.app.database_engine
+        from_role_name = self.app.pargs.from_role_name
+        identifier = self.app.pargs.identifier
+        realm_name = self.app.pargs.realm or self.app.config.get("aws", "default_realm")
+        region = get_realm_regions(self.app.config, realm_name)[0]
+        role_name = self.app.pargs.role_name
+        user_name = transliterate(
+            re.sub(
+                r"\s+",
+                "",
+                self.app.config.get("user", "name"),
+                flags=re.UNICODE,
+            ),
+        )
+
+        # The standard output is read by the AWS SDKs, so everything else goes
+        # to the log.
+        with Repository(database_engine) as repository:
+            accounts = find_accounts(repository, realm_name, identifier)
+
+            if len(accounts) != 1:
+                self.app.log.error(f"Identifier matched {len(accounts)} accounts")
+                raise NotFoundAppError()
+
+            account = accounts[0]
+
+            try:
+                role_name, intermediary_role_name = resolve_role_names(
+                    config=self.app.config,
+                    realm_name=realm_name,
+                    account_name=account.name,
+                    sso_roles=[sso_role.name for sso_role in account.sso_roles],
+                    role_name=role_name,
+                    from_role_name=from_role_name,
+                )
+            except RuntimeAppError as e:
+                self.app.log.error(str(e))
+                raise e
+
+            try:
+                credential = create_credential(
+                    repository=repository,
+                    account_name=account.name,
+                    realm_name=realm_name,
+                    region=region,
+                    role_name=role_name,
+                    session_name=f"{APP_NAME}-{user_name}",
+                    intermediary_role_name=intermediary_role_name,
+                )
+            except Exception as e:
+                self.app.log.error(
+                    f"Could not get credentials for {account.name} account as {role_name} role: {e}"
+                )
+                raise RuntimeAppError() from e
+
+        print(
+            format_credential(
+                access_key_id=credential.access_key_id,
+                expires_at=credential.expires_at,
+                secret_access_key=credential.secret_access_key,
+                session_token=credential.session_token,
+            )
+        )
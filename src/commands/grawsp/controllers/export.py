@@ -1,13 +1,11 @@
-import configparser
-from datetime import datetime
+import shlex
+import shutil
 from pathlib import Path
 
 from cement import Controller
 from inflection import dasherize
-from sqlalchemy.orm import Session
 
-from ....util.terminal.spinner import Spinner
-from ..database.models import Credential
+from ..constants import APP_NAME
 
 
 class ExportController(Controller):
@@ -17,6 +15,24 @@ class ExportController(Controller):
         stacked_type = "nested"
 
         arguments = [
+            (
+                ["--config-path"],
+                {
+                    "default": "",
+                    "help": "The path of the AWS cli config file.",
+                    "dest": "config_file_path",
+                    "type": str,
+                },
+            ),
+            (
+                ["--credential-process"],
+                {
+                    "action": "store_true",
+                    "default": False,
+                    "help": "Export profiles that request credentials from grawsp when used.",
+                    "dest": "credential_process",
+                },
+            ),
             (
                 ["--default-account"],
                 {
@@ -47,65 +63,134 @@ class ExportController(Controller):
         ]
 
     def _default(self) -> None:
+        if self.app.pargs.credential_process:
+            self._export_credential_process()
+        else:
+            self._export_credentials()
+
+    def _export_credential_process(self) -> None:
+        from ....util.files import merge_ini_sections
+        from ....util.terminal.spinner import Spinner
+        from ..database.repository import Repository
+
+        config_file_path = Path(
+            self.app.pargs.config_file_path or self.app.config.get("aws", "config_path")
+        ).expanduser()
+
+        database_engine = self.app.database_engine
+        default_account = self.app.pargs.default_account
+        default_role = self.app.pargs.default_role
+        executable = shutil.which(APP_NAME) or APP_NAME
+        region = self.app.config.get("aws", "default_region")
+
+        with Spinner("Configuring AWS config file") as spinner:
+            config_file_path.parent.mkdir(exist_ok=True, parents=True)
+
+            spinner.info(f"Using config file at {config_file_path.as_posix()}")
+
+            with Repository(database_engine) as repository:
+                sso_roles = repository.find_sso_roles()
+
+            if len(sso_roles) <= 0:
+                spinner.warning("No accounts found, did you run sync?")
+                return
+
+            profiles = {}
+
+            for realm_name, account_name, account_number, role_name in sso_roles:
+                command = shlex.join(
+                    [
+                        executable,
+                        "--realm",
+                        realm_name,
+                        "credential-process",
+                        "--role",
+                        role_name,
+                        account_number,
+                    ]
+                )
+                profile = {
+                    "credential_process": command,
+                    "region": region,
+                }
+
+                profile_name = dasherize(f"{account_name}-{role_name}").lower()
+                profiles[f"profile {profile_name}"] = profile
+
+                if default_account == account_name and default_role == role_name:
+                    profiles["default"] = profile
+
+            changed = merge_ini_sections(config_file_path, profiles)
+
+            if not changed:
+                spinner.success("Config file is up to date")
+                return
+
+            spinner.success(
+                f"Config file was configured, {len(changed)} of {len(profiles)} profiles updated"
+            )
+
+    def _export_credentials(self) -> None:
+        from ....util.files import merge_ini_sections
+        from ....util.terminal.spinner import Spinner
+        from ..database.repository import Repository
+
         credentials_file_path = Path(
             self.app.pargs.credentials_file_path
             or self.app.config.get("aws", "credentials_path")
         ).expanduser()
 
-        credentials_parser = configparser.ConfigParser()
         database_engine = self.app.database_engine
         default_account = self.app.pargs.default_account
         default_role = self.app.pargs.default_role
 
         with Spinner("Configuring AWS credentials file") as spinner:
             credentials_file_path.parent.mkdir(exist_ok=True, parents=True)
-            credentials_file_path.touch()
 
             spinner.info(
                 f"Using credentials file at {credentials_file_path.as_posix()}"
             )
 
-            with Session(database_engine) as session:
-                credentials = (
-                    session.query(Credential)
-                    .where(Credential.expires_at > datetime.now().timestamp())
-                    .all()
-                )
+            with Repository(database_engine) as repository:
+                credentials = repository.find_valid_credentials()
 
-                if len(credentials) <= 0:
-                    spinner.warning("No valid credentials found")
-                    return
+            if len(credentials) <= 0:
+                spinner.warning("No valid credentials found")
+                return
 
-                for credential in credentials:
-                    profile_name = dasherize(
-                        f"{credential.account.name}-{credential.role_name}"
-                    ).lower()
+            profiles = {}
 
-                    credentials_parser[profile_name] = {
-                        "aws_access_key_id": credential.access_key_id,
-                        "aws_secret_access_key": credential.secret_access_key,
-                        "aws_session_token": credential.session_token,
-                    }
+            for credential in credentials:
+                profile = {
+                    "aws_access_key_id": credential.access_key_id,
+                    "aws_secret_access_key": credential.secret_access_key,
+                    "aws_session_token": credential.session_token,
+                }
+
+                profile_name = dasherize(
+                    f"{credential.account.name}-{credential.role_name}"
+                ).lower()
+                profiles[profile_name] = profile
+
+                if (
+                    default_account == credential.account.name
+                    and default_role == credential.role_name
+                ):
+                    profiles["default"] = profile
 
                     spinner.info(
-                        f"Adding credentials for {credential.account.name} as {credential.role_name} role"
+                        f"Default profile set to {credential.account.name} account and {credential.role_name} role"
                     )
 
-                    if (
-                        default_account == credential.account.name
-                        and default_role == credential.role_name
-                    ):
-                        credentials_parser["default"] = {
-                            "aws_access_key_id": credential.access_key_id,
-                            "aws_secret_access_key": credential.secret_access_key,
-                            "aws_session_token": credential.session_token,
-                        }
+            changed = merge_ini_sections(credentials_file_path, profiles)
 
-                        spinner.info(
-                            f"Default profile set to {credential.account.name} account and {credential.role_name} role"
-                        )
+            for profile_name in changed:
+                spinner.info(f"Updated {profile_name} profile")
 
-            with open(credentials_file_path.as_posix(), "w") as fd:
-                credentials_parser.write(fd)
+            if not changed:
+                spinner.success("Credentials file is up to date")
+                return
 
-            spinner.success("Credentials file was configured")
+            spinner.success(
+                f"Credentials file was configured, {len(changed)} profiles updated"
+            )
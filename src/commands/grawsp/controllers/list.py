@@ -1,11 +1,6 @@
-import re
 from datetime import datetime
 
 from cement import Controller, ex
-from humanize import naturaltime
-from sqlalchemy.orm import Session
-
-from ..database.models import Account, Authorization, Credential, Realm, SsoRole
 
 
 class ListController(Controller):
@@ -17,6 +12,24 @@ class ListController(Controller):
     @ex(
         help="List all the accounts of a realm",
         arguments=[
+            (
+                ["--limit"],
+                {
+                    "default": 0,
+                    "help": "The maximum number of accounts to show, 0 shows all of them.",
+                    "dest": "limit",
+                    "type": int,
+                },
+            ),
+            (
+                ["--offset"],
+                {
+                    "default": 0,
+                    "help": "The number of accounts to skip, to page through the list.",
+                    "dest": "offset",
+                    "type": int,
+                },
+            ),
             (
                 ["--pattern"],
                 {
@@ -29,49 +42,66 @@ class ListController(Controller):
         ],
     )
     def accounts(self) -> None:
+        from sqlalchemy import func, select
+        from sqlalchemy.orm import Session
+
+        from ..database.functions import pattern_matches
+        from ..database.models import Account, Realm, SsoRole
+
         database_engine = self.app.database_engine
+        limit = self.app.pargs.limit
+        offset = self.app.pargs.offset
         pattern = self.app.pargs.pattern
 
-        with Session(database_engine) as session:
-            accounts_with_realms = (
-                session.query(Account, Realm)
-                .join(Realm, Realm.id == Account.realm_id)
-                .all()
+        # Role names may contain commas, so they are aggregated with a unit
+        # separator and joined for display afterwards.
+        query = (
+            select(
+                Account.number,
+                Account.name,
+                Realm.name,
+                func.group_concat(SsoRole.name, "\x1f"),
+                Account.email,
             )
+            .join(Realm, Realm.id == Account.realm_id)
+            .outerjoin(SsoRole, SsoRole.account_id == Account.id)
+            .where(pattern_matches(Account.name, pattern))
+            .group_by(Account.id)
+            .order_by(Realm.name, Account.name)
+            .offset(offset)
+        )
 
-            if not accounts_with_realms or len(accounts_with_realms) <= 0:
-                self.app.log.warning("No accounts found.")
-                return
+        if limit > 0:
+            query = query.limit(limit)
 
-            table_data = []
-            regex = re.compile(pattern)
-
-            for account, realm in accounts_with_realms:
-                if regex.match(account.name):
-                    sso_roles = session.query(SsoRole).where(
-                        SsoRole.account_id == account.id
-                    )
-
-                    table_data.append(
-                        [
-                            account.number,
-                            account.name,
-                            realm.name,
-                            ", ".join([role.name for role in sso_roles]),
-                            account.email,
-                        ]
-                    )
-
-            self.app.render(
-                table_data,
-                headers=[
-                    "ID",
-                    "Name",
-                    "Realm",
-                    "SSO Roles",
-                    "E-mail",
-                ],
-            )
+        with Session(database_engine) as session:
+            table_data = [
+                [
+                    number,
+                    name,
+                    realm_name,
+                    ", ".join(sorted(sso_roles.split("\x1f"))) if sso_roles else "",
+                    email,
+                ]
+                for number, name, realm_name, sso_roles, email in session.execute(
+                    query.execution_options(yield_per=1000)
+                )
+            ]
+
+        if len(table_data) <= 0:
+            self.app.log.warning("No accounts found.")
+            return
+
+        self.app.render(
+            table_data,
+            headers=[
+                "ID",
+                "Name",
+                "Realm",
+                "SSO Roles",
+                "E-mail",
+            ],
+        )
 
     @ex(
         help="Display information about the AWS authorization",
@@ -88,6 +118,11 @@ class ListController(Controller):
         ],
     )
     def authorization(self) -> None:
+        from humanize import naturaltime
+        from sqlalchemy.orm import Session
+
+        from ..database.models import Authorization, Realm
+
         database_engine = self.app.database_engine
         show_expired = self.app.pargs.show_expired
         table_data = []
@@ -141,41 +176,80 @@ class ListController(Controller):
                     "help": "Include expired credentials in the output",
                 },
             ),
+            (
+                ["--limit"],
+                {
+                    "default": 0,
+                    "help": "The maximum number of credentials to show, 0 shows all of them.",
+                    "dest": "limit",
+                    "type": int,
+                },
+            ),
+            (
+                ["--sort"],
+                {
+                    "choices": ["account", "expiry"],
+                    "default": "account",
+                    "help": "Sort by account name or by the soonest expiry.",
+                    "dest": "sort",
+                    "type": str,
+                },
+            ),
         ],
     )
     def creds(self) -> None:
+        from humanize import naturaltime
+        from sqlalchemy import select
+        from sqlalchemy.orm import Session
+
+        from ..database.models import Account, Credential
+
         database_engine = self.app.database_engine
+        limit = self.app.pargs.limit
         show_expired = self.app.pargs.expired
-        table_data = []
+        sort = self.app.pargs.sort
 
-        with Session(database_engine) as session:
-            credentials = session.query(Credential).all()
+        query = select(
+            Account.name,
+            Credential.role_name,
+            Credential.access_key_id,
+            Credential.expires_at,
+        ).join(Account, Account.id == Credential.account_id)
 
-            for credential in credentials:
-                if credential.is_expired() and not show_expired:
-                    continue
+        if not show_expired:
+            query = query.where(Credential.expires_at > datetime.now().timestamp())
 
-                table_data.append(
-                    [
-                        credential.account.name,
-                        credential.role_name,
-                        credential.access_key_id,
-                        naturaltime(
-                            datetime.fromtimestamp(credential.expires_at),
-                        ),
-                    ],
-                )
+        if sort == "expiry":
+            query = query.order_by(Credential.expires_at, Account.name)
+        else:
+            query = query.order_by(Account.name, Credential.role_name)
 
-            if len(table_data) <= 0:
-                self.app.log.warning("No credentials found.")
-                return
+        if limit > 0:
+            query = query.limit(limit)
 
-            self.app.render(
-                table_data,
-                headers=[
-                    "Account Name",
-                    "Role",
-                    "Access Key ID",
-                    "Expires In",
-                ],
-            )
+        with Session(database_engine) as session:
+            table_data = [
+                [
+                    account_name,
+                    role_name,
+                    access_key_id,
+                    naturaltime(datetime.fromtimestamp(expires_at or 0)),
+                ]
+                for account_name, role_name, access_key_id, expires_at in (
+                    session.execute(query)
+                )
+            ]
+
+        if len(table_data) <= 0:
+            self.app.log.warning("No credentials found.")
+            return
+
+        self.app.render(
+            table_data,
+            headers=[
+                "Account Name",
+                "Role",
+                "Access Key ID",
+                "Expires In",
+            ],
+        )
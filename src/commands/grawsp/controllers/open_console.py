@@ -1,23 +1,17 @@
 import re
+import shutil
+import subprocess  # nosec B404
 import urllib
-import webbrowser
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 
 from cement import Controller
 from inflection import transliterate
-from sqlalchemy.orm import Session
-
-from ....services.aws.sts import get_console_url
-from ....util.terminal.spinner import Spinner
-from ..actions.aws import (
-    create_credential,
-    find_account_by_name,
-    find_account_by_number,
-    search_accounts,
-)
+
 from ..constants import APP_NAME
-from ..database.models import SsoRole
-from ..defaults import DEFAULT_TIMEOUT_IN_SECONDS
+from ..defaults import DEFAULT_OPEN_CONSOLE_CONCURRENCY, DEFAULT_TIMEOUT_IN_SECONDS
 from ..exceptions import RuntimeAppError
+from ..helpers import get_realm_regions, resolve_role_names
 
 
 class OpenConsoleController(Controller):
@@ -27,6 +21,15 @@ class OpenConsoleController(Controller):
         stacked_type = "nested"
 
         arguments = [
+            (
+                ["--parallel"],
+                {
+                    "default": DEFAULT_OPEN_CONSOLE_CONCURRENCY,
+                    "help": "How many console URLs to generate at the same time.",
+                    "dest": "parallel",
+                    "type": int,
+                },
+            ),
             (
                 ["--region"],
                 {
@@ -54,12 +57,25 @@ class OpenConsoleController(Controller):
         ]
 
     def _default(self) -> None:
-        browser_name = "firefox-custom"
+        from ....services.aws.sts import build_console_url
+        from ....util.terminal.spinner import Spinner
+        from ..actions.aws import (
+            create_credential,
+            create_signin_token,
+            find_accounts,
+        )
+        from ..database.models import Account
+        from ..database.repository import Repository
+
         database_engine = self.app.database_engine
         firefox_path = self.app.config.get("general", "firefox_path")
         identifier = self.app.pargs.identifier
+        parallel = self.app.pargs.parallel
         realm_name = self.app.pargs.realm or self.app.config.get("aws", "default_realm")
         region = self.app.pargs.region or self.app.config.get("aws", "default_region")
+        # Credentials are minted where the realm is authorized, the console is
+        # opened in whatever region was asked for.
+        sso_region = get_realm_regions(self.app.config, realm_name)[0]
         role_name = self.app.pargs.role_name
         user_name = transliterate(
             re.sub(
@@ -70,113 +86,116 @@ class OpenConsoleController(Controller):
             ),
         )
 
-        with Spinner("Opening AWS console(s)") as spinner:
-            accounts = []
-
-            if identifier.isdigit():
-                account = find_account_by_number(
-                    database_engine, realm_name, account_number=identifier
-                )
-
-                if account:
-                    accounts.append(account)
-            elif re.match(r"^[a-z0-9\-]+$", identifier):
-                account = find_account_by_name(
-                    database_engine, realm_name, account_name=identifier
-                )
-
-                if account:
-                    accounts.append(account)
-            else:
-                accounts = search_accounts(
-                    database_engine, realm_name, pattern=identifier
-                )
+        with (
+            Spinner("Opening AWS console(s)") as spinner,
+            Repository(database_engine) as repository,
+        ):
+            accounts = find_accounts(repository, realm_name, identifier)
 
             if len(accounts) <= 0:
                 spinner.warning("Identifier matched no accounts")
                 return
 
-            webbrowser.register(
-                browser_name, None, webbrowser.GenericBrowser([firefox_path, "%s"])
-            )
+            jobs = []
 
             for account in accounts:
-                if not role_name and self.app.config.has_option(
-                    account.name, "default_role"
-                ):
-                    role_name = self.app.config.get(account.name, "default_role")
-
-                if not role_name and self.app.config.has_option(
-                    realm_name, "default_role"
-                ):
-                    role_name = self.app.config.get(realm_name, "default_role")
-
-                if not role_name:
-                    spinner.error("AWS role could not be determined")
-                    raise RuntimeAppError()
-
-                spinner.info(f"Using {role_name} role")
-
-                intermediary_role_name = ""
-
-                with Session(database_engine) as session:
-                    sso_roles = [
-                        role.name
-                        for role in session.query(SsoRole)
-                        .where(SsoRole.account_id == account.id)
-                        .all()
-                    ]
-
-                if role_name not in sso_roles:
-                    if self.app.config.has_option(account.name, "default_role"):
-                        intermediary_role_name = self.app.config.get(
-                            account.name, "default_role"
-                        )
-
-                    if self.app.config.has_option(realm_name, "default_role"):
-                        intermediary_role_name = self.app.config.get(
-                            realm_name, "default_role"
-                        )
-
-                    if not intermediary_role_name:
-                        spinner.error("Intermediary role could not be determined")
-                        raise RuntimeAppError()
+                try:
+                    account_role_name, intermediary_role_name = resolve_role_names(
+                        config=self.app.config,
+                        realm_name=realm_name,
+                        account_name=account.name,
+                        sso_roles=[sso_role.name for sso_role in account.sso_roles],
+                        role_name=role_name,
+                    )
+                except RuntimeAppError as e:
+                    spinner.error(str(e))
+                    raise e
 
+                if intermediary_role_name:
                     spinner.info(
-                        f"Using {intermediary_role_name} as an intermediary role"
+                        f"Using {intermediary_role_name} as an intermediary role for {account.name}"
+                    )
+
+                jobs.append((account, account_role_name, intermediary_role_name))
+
+            def generate_console_url(job: tuple[Account, str, str]) -> str:
+                account, role_name, intermediary_role_name = job
+
+                # Sessions can not be shared between threads, so every parallel
+                # job gets its own repository.
+                with (
+                    Repository(database_engine)
+                    if parallel > 1
+                    else nullcontext(repository)
+                ) as job_repository:
+                    credential = create_credential(
+                        repository=job_repository,
+                        account_name=account.name,
+                        realm_name=realm_name,
+                        region=sso_region,
+                        role_name=role_name,
+                        session_name=f"{APP_NAME}-{user_name}-{role_name}",
+                        intermediary_role_name=intermediary_role_name,
                     )
 
-                session_name = f"{APP_NAME}-{user_name}-{role_name}"
+                    signin_token, is_cached = create_signin_token(
+                        repository=job_repository,
+                        credential=credential,
+                        timeout=DEFAULT_TIMEOUT_IN_SECONDS,
+                    )
 
-                credential = create_credential(
-                    database_engine=database_engine,
-                    account_name=account.name,
-                    realm_name=realm_name,
-                    region=region,
-                    role_name=role_name,
-                    session_name=session_name,
-                    intermediary_role_name=intermediary_role_name,
+                self.app.log.debug(
+                    f"Sign-in token cache {'hit' if is_cached else 'miss'}"
+                    f" for {account.name} account as {role_name} role"
                 )
 
+                return build_console_url(signin_token, region)
+
+            with ThreadPoolExecutor(max_workers=max(1, parallel)) as executor:
+                futures = [executor.submit(generate_console_url, job) for job in jobs]
+
+            failures = 0
+            urls = []
+            tab_color = "blue"
+
+            # Tabs open in the order the accounts matched, not in the order
+            # their URLs were generated.
+            for (account, role_name, _), future in zip(jobs, futures, strict=True):
                 try:
-                    console_url = get_console_url(
-                        access_key_id=credential.access_key_id,
-                        secret_access_key=credential.secret_access_key,
-                        session_token=credential.session_token,
-                        region=region,
-                        timeout=DEFAULT_TIMEOUT_IN_SECONDS,
-                    )
+                    console_url = future.result()
                 except Exception as e:
-                    spinner.error("Could not generate console URL", submessage=str(e))
-                    raise RuntimeAppError() from e
+                    failures += 1
+                    spinner.error(
+                        f"Could not generate console URL for {account.name} account as {role_name} role",
+                        submessage=str(e),
+                    )
+                    continue
 
                 encoded_console_url = urllib.parse.quote(console_url)
-                tab_color = "blue"
 
-                webbrowser.get(browser_name).open_new_tab(
+                urls.append(
                     f"ext+container:name={account.name}&color={tab_color}&url={encoded_console_url}"
                 )
 
-                spinner.info(f"AWS console opened to {account.name}")
+            if urls:
+                browser_path = firefox_path or shutil.which("firefox") or "firefox"
+
+                # A single invocation opens every tab, instead of starting a
+                # browser process per account.
+                try:
+                    subprocess.Popen(  # nosec B603
+                        [browser_path, *urls],
+                        start_new_session=True,
+                        stderr=subprocess.DEVNULL,
+                        stdout=subprocess.DEVNULL,
+                    )
+                except OSError as e:
+                    spinner.error("Could not start the browser", submessage=str(e))
+                    raise RuntimeAppError() from e
+
+                spinner.info(f"AWS console opened to {len(urls)} accounts")
+
+            if failures:
+                raise RuntimeAppError(f"Could not open {failures} consoles")
 
             spinner.success("All done")
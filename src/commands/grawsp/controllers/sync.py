@@ -1,12 +1,9 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 from cement import Controller
-from sqlalchemy import delete
-from sqlalchemy.orm import Session
 
-from ....services.aws.sso import list_sso_accounts_with_roles
-from ....util.terminal.spinner import Spinner
-from ..actions.aws import find_authorization, find_realm
-from ..database.models import Account, SsoRole
-from ..exceptions import RuntimeAppError
+from ..exceptions import NotFoundAppError, RuntimeAppError
+from ..helpers import get_realm_regions, report_scheduler_stats, resolve_realm_names
 
 
 class SyncController(Controller):
@@ -15,89 +12,141 @@ class SyncController(Controller):
         stacked_on = "base"
         stacked_type = "nested"
 
+        arguments = [
+            (
+                ["--all-realms"],
+                {
+                    "action": "store_true",
+                    "default": False,
+                    "help": "Synchronize every configured realm at the same time",
+                    "dest": "all_realms",
+                },
+            ),
+            (
+                ["--concurrency"],
+                {
+                    "help": "How many accounts to discover roles for at the same time",
+                    "default": "",
+                    "dest": "concurrency",
+                },
+            ),
+        ]
+
     def _default(self) -> None:
+        from ....services.aws.sso import list_sso_accounts_with_roles
+        from ....util.terminal.spinner import Spinner
+        from ..actions.aws import sync_accounts
+        from ..database.repository import Repository
+
         database_engine = self.app.database_engine
+        concurrency = int(
+            self.app.pargs.concurrency or self.app.config.get("aws", "sync_concurrency")
+        )
 
         with Spinner("Synchronizing accounts database") as spinner:
-            realm_name = self.app.pargs.realm or self.app.config.get(
-                "aws", "default_realm"
-            )
+            try:
+                realm_names = resolve_realm_names(
+                    config=self.app.config,
+                    realm_name=self.app.pargs.realm,
+                    all_realms=self.app.pargs.all_realms,
+                )
+            except RuntimeAppError as e:
+                spinner.error(str(e))
+                raise e
+
+            progress = {}
+
+            def sync_realm(realm_name: str) -> tuple[int, dict[str, int]]:
+                # Sessions can not be shared between threads, so every realm
+                # gets its own repository.
+                with Repository(database_engine) as repository:
+                    realm = repository.find_realm(realm_name)
+
+                    if not realm:
+                        raise NotFoundAppError(f"Could not find realm {realm_name}")
+
+                    accounts = {}
+                    authorization_id = None
+
+                    # Every region of a realm may expose different accounts or
+                    # roles, the realm holds all of them.
+                    for region in get_realm_regions(self.app.config, realm_name):
+                        authorization = repository.find_authorization(
+                            realm_name=realm_name,
+                            region=region,
+                        )
 
-            if not realm_name:
-                spinner.error("No AWS realm provided")
-                raise RuntimeAppError()
+                        if not authorization:
+                            raise RuntimeAppError(
+                                f"You are not authorized to realm {realm_name} in {region} region"
+                            )
 
-            realm = find_realm(
-                database_engine=database_engine,
-                realm_name=realm_name,
-            )
+                        spinner.info(f"Using {realm_name} realm in region {region}")
 
-            if not realm:
-                spinner.error(f"Could not find realm {realm_name}")
-                raise RuntimeAppError()
+                        def on_progress(completed: int, total: int) -> None:
+                            progress[realm_name] = f"{completed}/{total}"
+                            spinner.message = "Discovering roles of " + ", ".join(
+                                f"{name} {progress[name]}" for name in sorted(progress)
+                            )
 
-            region = self.app.config.get("aws", "default_region")
+                        for account in list_sso_accounts_with_roles(
+                            access_token=authorization.client_access_token,
+                            region=region,
+                            concurrency=concurrency,
+                            on_progress=on_progress,
+                        ):
+                            stored_account = accounts.setdefault(
+                                account["account_id"], account
+                            )
 
-            spinner.info(f"Using {realm.name} realm in region {region}")
+                            if stored_account is not account:
+                                stored_account["sso_roles"] = list(
+                                    dict.fromkeys(
+                                        stored_account["sso_roles"]
+                                        + account["sso_roles"]
+                                    )
+                                )
 
-            authorization = find_authorization(
-                database_engine=database_engine,
-                realm_name=realm_name,
-                region=region,
-            )
+                        authorization_id = authorization_id or authorization.id
 
-            if not authorization:
-                spinner.error(
-                    f"You are not authorized to realm {realm_name} in {region} region"
-                )
-                raise RuntimeAppError()
+                    changes = sync_accounts(
+                        repository=repository,
+                        authorization_id=authorization_id,
+                        realm_id=realm.id,
+                        accounts_data=list(accounts.values()),
+                    )
 
-            spinner.info("Authorized to AWS")
+                    return len(accounts), changes
 
-            with Session(database_engine) as session:
-                try:
-                    accounts = list_sso_accounts_with_roles(
-                        access_token=authorization.client_access_token,
-                        region=region,
-                    )
-                except Exception as e:
-                    spinner.error("Could not synchronize accounts", submessage=str(e))
-                    raise RuntimeAppError() from e
-                else:
-                    session.execute(
-                        delete(Account).where(Account.authorization == authorization)
-                    )
-                    session.commit()
-
-                    for account_data in accounts:
-                        account = Account(
-                            authorization_id=authorization.id,
-                            email=account_data["email"],
-                            name=account_data["account_name"],
-                            number=account_data["account_id"],
-                            realm_id=realm.id,
-                        )
+            failures = 0
 
-                        session.add(account)
-                        session.commit()
+            with ThreadPoolExecutor(max_workers=len(realm_names)) as executor:
+                futures = {
+                    executor.submit(sync_realm, realm_name): realm_name
+                    for realm_name in realm_names
+                }
 
-                        account = (
-                            session.query(Account)
-                            .where(Account.number == account_data["account_id"])
-                            .first()
-                        )
+                for future in as_completed(futures):
+                    realm_name = futures[future]
 
-                        session.execute(
-                            delete(SsoRole).where(SsoRole.account_id == account.id)
+                    try:
+                        total, changes = future.result()
+                    except Exception as e:
+                        failures += 1
+                        spinner.error(
+                            f"Could not synchronize {realm_name} realm",
+                            submessage=str(e),
+                        )
+                    else:
+                        spinner.info(
+                            f"Synchronized {total} accounts of {realm_name} realm"
+                            f" ({changes['added']} added, {changes['removed']} removed,"
+                            f" {changes['changed']} changed)"
                         )
 
-                        for sso_role in account_data["sso_roles"]:
-                            session.add(
-                                SsoRole(
-                                    account_id=account.id,
-                                    name=sso_role,
-                                )
-                            )
+            report_scheduler_stats(self.app.log, spinner)
+
+            if failures:
+                raise RuntimeAppError(f"Could not synchronize {failures} realms")
 
-                    session.commit()
-                    spinner.success("All done")
+            spinner.success(f"Synchronized {len(realm_names)} realms")
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import argparse
+import configparser
+import json
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+from time import time
+
+from .constants import APP_NAME
+from .defaults import DEFAULT_CREDENTIAL_REFRESH_MARGIN_IN_SECONDS
+
+COMMAND: str = "credential-process"
+CONFIG_PATH: str = f"~/.config/{APP_NAME}/{APP_NAME}.conf"
+DATABASE_PATH: str = f"~/.local/share/{APP_NAME}/{APP_NAME}.db"
+
+
+def format_credential(
+    access_key_id: str,
+    expires_at: float,
+    secret_access_key: str,
+    session_token: str,
+) -> str:
+    return json.dumps(
+        {
+            "Version": 1,
+            "AccessKeyId": access_key_id,
+            "SecretAccessKey": secret_access_key,
+            "SessionToken": session_token,
+            "Expiration": datetime.fromtimestamp(expires_at, tz=timezone.utc).strftime(
+                "%Y-%m-%dT%H:%M:%SZ"
+            ),
+        }
+    )
+
+
+def find_cached_credential(
+    config: configparser.ConfigParser,
+    identifier: str,
+    realm_name: str,
+    role_name: str,
+) -> str | None:
+    database_path = Path(
+        config.get("database", "path", fallback=DATABASE_PATH)
+    ).expanduser()
+
+    if not database_path.is_file():
+        return None
+
+    connection = sqlite3.connect(f"file:{database_path.as_posix()}?mode=ro", uri=True)
+
+    try:
+        account = connection.execute(
+            "SELECT account.id, account.name FROM account"
+            " JOIN realm ON realm.id = account.realm_id"
+            " WHERE realm.name = ? AND (account.name = ? OR account.number = ?)",
+            (realm_name, identifier, identifier),
+        ).fetchone()
+
+        if not account:
+            return None
+
+        account_id, account_name = account
+
+        role_name = (
+            role_name
+            or config.get(account_name, "default_role", fallback="")
+            or config.get(realm_name, "default_role", fallback="")
+        )
+
+        # Credentials the SDKs would refresh right away fall through, so that
+        # they are minted again.
+        row = connection.execute(
+            "SELECT access_key_id, expires_at, secret_access_key, session_token"
+            " FROM credential"
+            " WHERE account_id = ? AND role_name = ? AND expires_at > ?",
+            (
+                account_id,
+                role_name,
+                time() + DEFAULT_CREDENTIAL_REFRESH_MARGIN_IN_SECONDS,
+            ),
+        ).fetchone()
+    finally:
+        connection.close()
+
+    if not row:
+        return None
+
+    return format_credential(*row)
+
+
+# The AWS SDKs spawn a credential process every time they need credentials, so
+# cache hits are served with the standard library only, before the application
+# and its dependencies are imported. Everything else falls through to the
+# credential-process command.
+def run_fast_path(argv: list[str]) -> bool:
+    if COMMAND not in argv:
+        return False
+
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--from-role", default="")
+    parser.add_argument("--realm", default="")
+    parser.add_argument("--role", default="", dest="role_name")
+    parser.add_argument("identifier", nargs="?", default="")
+
+    arguments, unknown = parser.parse_known_args(
+        [argument for argument in argv if argument != COMMAND]
+    )
+
+    if unknown or not arguments.identifier:
+        return False
+
+    config = configparser.ConfigParser()
+    config.read(Path(CONFIG_PATH).expanduser())
+
+    realm_name = arguments.realm or config.get("aws", "default_realm", fallback="")
+
+    try:
+        output = find_cached_credential(
+            config=config,
+            identifier=arguments.identifier,
+            realm_name=realm_name,
+            role_name=arguments.role_name,
+        )
+    except sqlite3.Error:
+        return False
+
+    if not output:
+        return False
+
+    print(output)
+
+    return True
@@ -0,0 +1,61 @@
+from pathlib import Path
+
+from cement.core.config import ConfigHandler
+from sqlalchemy import Engine, create_engine, event
+
+from ..defaults import (
+    DEFAULT_DATABASE_BUSY_TIMEOUT_IN_SECONDS,
+    DEFAULT_DATABASE_POOL_SIZE,
+)
+from .functions import re_match
+from .migrations import migrate
+
+
+def create_database_engine(
+    path: Path,
+    busy_timeout: int = DEFAULT_DATABASE_BUSY_TIMEOUT_IN_SECONDS,
+    pool_size: int = DEFAULT_DATABASE_POOL_SIZE,
+) -> Engine:
+    engine = create_engine(
+        f"sqlite:///{path.as_posix()}",
+        connect_args={
+            "check_same_thread": False,
+            "timeout": busy_timeout,
+        },
+        # Every thread of `auth --parallel` or a burst of agent requests holds
+        # a connection while it waits on AWS, so the pool only caps how many
+        # are kept open and never makes one of them wait for another.
+        max_overflow=-1,
+        pool_size=pool_size,
+    )
+
+    @event.listens_for(engine, "connect")
+    def configure_connection(dbapi_connection, connection_record) -> None:
+        # The busy timeout goes first, switching the journal mode needs a lock
+        # that another process may be holding.
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA busy_timeout = {busy_timeout * 1000:d}")
+        cursor.execute("PRAGMA journal_mode = WAL")
+        cursor.execute("PRAGMA synchronous = NORMAL")
+        cursor.close()
+
+        dbapi_connection.create_function("re_match", 2, re_match, deterministic=True)
+
+    return engine
+
+
+def open_database_engine(config: ConfigHandler) -> Engine:
+    path = Path(config.get("database", "path"))
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.touch(exist_ok=True)
+
+    engine = create_database_engine(
+        path=path,
+        busy_timeout=int(config.get("database", "busy_timeout")),
+        pool_size=int(config.get("database", "pool_size")),
+    )
+
+    migrate(engine)
+
+    return engine
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+
+from sqlalchemy import Boolean, ColumnElement, and_, func
+
+REGEX_METACHARACTERS: str = ".^$*+?{}[]\\|()"
+REGEX_QUANTIFIERS: str = "*+?{"
+
+#
+# FUNCTIONS
+#
+
+
+@lru_cache(maxsize=256)
+def compile_pattern(pattern: str) -> re.Pattern[str]:
+    return re.compile(pattern)
+
+
+def literal_prefix(pattern: str) -> str:
+    # Alternations can match anything and inline flags like (?i) change how the
+    # rest is matched, neither has a usable prefix.
+    if "|" in pattern or "(?" in pattern:
+        return ""
+
+    prefix = []
+
+    for character in pattern.removeprefix("^"):
+        if character in REGEX_QUANTIFIERS:
+            # The quantifier applies to the last literal, which may not be there.
+            prefix = prefix[:-1]
+            break
+
+        if character in REGEX_METACHARACTERS:
+            break
+
+        prefix.append(character)
+
+    return "".join(prefix)
+
+
+def pattern_matches(column: ColumnElement[str], pattern: str) -> ColumnElement[bool]:
+    # Fails early on invalid patterns instead of inside the database.
+    compile_pattern(pattern)
+
+    condition = func.re_match(pattern, column, type_=Boolean)
+    prefix = literal_prefix(pattern)
+
+    if not prefix:
+        return condition
+
+    # re.match is anchored at the start, so a literal prefix turns into a range
+    # the column index can answer before the pattern runs on what is left.
+    upper_bound = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+    return and_(column >= prefix, column < upper_bound, condition)
+
+
+def re_match(pattern: str | None, value: str | None) -> bool:
+    if pattern is None or value is None:
+        return False
+
+    return compile_pattern(pattern).match(value) is not None
@@ -0,0 +1,99 @@
+from collections.abc import Callable
+
+from sqlalchemy import Connection, Engine, inspect
+
+from .models import Base
+
+#
+# MIGRATIONS
+#
+
+
+def _add_column(
+    connection: Connection,
+    table_name: str,
+    column_name: str,
+    column_type: str,
+) -> None:
+    columns = {column["name"] for column in inspect(connection).get_columns(table_name)}
+
+    if column_name not in columns:
+        connection.exec_driver_sql(
+            f'ALTER TABLE "{table_name}" ADD COLUMN {column_name} {column_type}'
+        )
+
+
+def _create_indexes(connection: Connection) -> None:
+    # Unique indexes can only be created once duplicated and orphaned rows, left
+    # behind by older versions, are gone.
+    for statement in (
+        "DELETE FROM sso_role WHERE account_id NOT IN (SELECT id FROM account)",
+        "DELETE FROM credential WHERE account_id NOT IN (SELECT id FROM account)",
+        "DELETE FROM account WHERE id NOT IN "
+        "(SELECT MAX(id) FROM account GROUP BY realm_id, number)",
+        "DELETE FROM sso_role WHERE account_id NOT IN (SELECT id FROM account)",
+        "DELETE FROM credential WHERE account_id NOT IN (SELECT id FROM account)",
+        "DELETE FROM sso_role WHERE id NOT IN "
+        "(SELECT MIN(id) FROM sso_role GROUP BY account_id, name)",
+        "DELETE FROM credential WHERE id NOT IN "
+        "(SELECT MAX(id) FROM credential GROUP BY account_id, role_name)",
+    ):
+        connection.exec_driver_sql(statement)
+
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
+
+def _add_credential_issued_at(connection: Connection) -> None:
+    _add_column(connection, "credential", "issued_at", "FLOAT")
+
+
+def _add_credential_signin_token(connection: Connection) -> None:
+    _add_column(connection, "credential", "signin_token", "VARCHAR(4096)")
+    _add_column(connection, "credential", "signin_token_expires_at", "FLOAT")
+
+
+def _add_authorization_refresh_token(connection: Connection) -> None:
+    _add_column(connection, "authorization", "refresh_token", "VARCHAR(2048)")
+
+    # Clients registered before could not get refresh tokens, expiring them
+    # makes the next authorization register a client that can.
+    connection.exec_driver_sql(
+        'UPDATE "authorization" SET client_secret_expires_at = 0'
+    )
+
+
+MIGRATIONS: list[Callable[[Connection], None]] = [
+    _create_indexes,
+    _add_credential_issued_at,
+    _add_credential_signin_token,
+    _add_authorization_refresh_token,
+]
+
+#
+# FUNCTIONS
+#
+
+
+def get_schema_version(connection: Connection) -> int:
+    return connection.exec_driver_sql("PRAGMA user_version").scalar()
+
+
+def migrate(database_engine: Engine) -> int:
+    with database_engine.begin() as connection:
+        is_new = not inspect(connection).has_table("account")
+        version = get_schema_version(connection)
+
+        Base.metadata.create_all(connection)
+
+        if is_new:
+            version = len(MIGRATIONS)
+
+        for migration in MIGRATIONS[version:]:
+            migration(connection)
+            version += 1
+
+        connection.exec_driver_sql(f"PRAGMA user_version = {version:d}")
+
+    return version
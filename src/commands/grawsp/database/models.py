@@ -1,8 +1,8 @@
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import datetime, timedelta
 
-from sqlalchemy import ForeignKey, String
+from sqlalchemy import ForeignKey, Index, String
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
@@ -12,6 +12,10 @@ class Base(DeclarativeBase):
 
 class Account(Base):
     __tablename__ = "account"
+    __table_args__ = (
+        Index("ix_account_realm_id_name", "realm_id", "name"),
+        Index("ix_account_realm_id_number", "realm_id", "number", unique=True),
+    )
 
     authorization_id = mapped_column(ForeignKey("authorization.id"))
     authorization: Mapped[Authorization] = relationship(back_populates="accounts")
@@ -27,6 +31,11 @@ class Account(Base):
         cascade="all, delete-orphan",
     )
 
+    role_arns: Mapped[list[RoleArn]] = relationship(
+        back_populates="account",
+        cascade="all, delete-orphan",
+    )
+
     sso_roles: Mapped[list[SsoRole]] = relationship(
         back_populates="account",
         cascade="all, delete-orphan",
@@ -38,6 +47,7 @@ class Account(Base):
 
 class Authorization(Base):
     __tablename__ = "authorization"
+    __table_args__ = (Index("ix_authorization_realm_id_region", "realm_id", "region"),)
 
     client_access_token_expires_at: Mapped[float]
     client_access_token: Mapped[str] = mapped_column(String(256))
@@ -50,6 +60,7 @@ class Authorization(Base):
     id: Mapped[int] = mapped_column(primary_key=True)
     realm_id: Mapped[int] = mapped_column(ForeignKey("realm.id"))
     realm: Mapped[Realm] = relationship(back_populates="authorizations")
+    refresh_token: Mapped[str | None] = mapped_column(String(2048))
     region: Mapped[str] = mapped_column(String(32))
 
     accounts: Mapped[list[Account]] = relationship(
@@ -81,23 +92,32 @@ class Authorization(Base):
 
 class Credential(Base):
     __tablename__ = "credential"
+    __table_args__ = (
+        Index(
+            "ix_credential_account_id_role_name", "account_id", "role_name", unique=True
+        ),
+        Index("ix_credential_expires_at", "expires_at"),
+    )
 
     access_key_id: Mapped[str] = mapped_column(String(32))
     account: Mapped[Account] = relationship(back_populates="credentials")
     account_id: Mapped[int] = mapped_column(ForeignKey("account.id"))
     expires_at: Mapped[float]
     id: Mapped[int] = mapped_column(primary_key=True)
+    issued_at: Mapped[float | None]
     role_name: Mapped[str] = mapped_column(String(256))
     secret_access_key: Mapped[str] = mapped_column(String(64))
     session_token: Mapped[str] = mapped_column(String(1024))
+    signin_token: Mapped[str | None] = mapped_column(String(4096))
+    signin_token_expires_at: Mapped[float | None]
 
     def __repr__(self) -> str:
         return f"Credential(id={self.id!r}, account_id={self.account_id!r}, role_name={self.role_name!r})"
 
-    def is_expired(self) -> bool:
-        return not self.expires_at or datetime.now() >= datetime.fromtimestamp(
-            self.expires_at
-        )
+    def is_expired(self, margin: int = 0) -> bool:
+        return not self.expires_at or datetime.now() + timedelta(
+            seconds=margin
+        ) >= datetime.fromtimestamp(self.expires_at)
 
 
 class Realm(Base):
@@ -121,8 +141,31 @@ class Realm(Base):
         return f"Realm(id={self.id!r}, name={self.name!r}, url={self.url!r})"
 
 
+class RoleArn(Base):
+    __tablename__ = "role_arn"
+    __table_args__ = (
+        Index(
+            "ix_role_arn_account_id_role_name", "account_id", "role_name", unique=True
+        ),
+    )
+
+    account: Mapped[Account] = relationship(back_populates="role_arns")
+    account_id: Mapped[int] = mapped_column(ForeignKey("account.id"))
+    arn: Mapped[str] = mapped_column(String(2048))
+    id: Mapped[int] = mapped_column(primary_key=True)
+    role_name: Mapped[str] = mapped_column(String(256))
+
+    def __repr__(self) -> str:
+        return (
+            f"RoleArn(id={self.id!r}, account_id={self.account_id!r}, arn={self.arn!r})"
+        )
+
+
 class SsoRole(Base):
     __tablename__ = "sso_role"
+    __table_args__ = (
+        Index("ix_sso_role_account_id_name", "account_id", "name", unique=True),
+    )
 
     account: Mapped[Account] = relationship(back_populates="sso_roles")
     account_id: Mapped[int] = mapped_column(ForeignKey("account.id"))
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import Engine, and_, or_, select
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from .functions import pattern_matches
+from .models import Account, Authorization, Credential, Realm, RoleArn, SsoRole
+
+
+class Repository:
+    def __init__(self, database_engine: Engine) -> None:
+        self.session = Session(database_engine, expire_on_commit=False)
+
+    def __enter__(self) -> Repository:
+        return self
+
+    def __exit__(self, type, value, traceback) -> None:
+        self.session.close()
+
+    def find_account_by_name(
+        self,
+        realm_name: str,
+        account_name: str,
+    ) -> Account | None:
+        return self.session.scalars(
+            select(Account)
+            .join(Realm, Realm.id == Account.realm_id)
+            .options(selectinload(Account.sso_roles))
+            .where(Realm.name == realm_name, Account.name == account_name)
+        ).first()
+
+    def find_account_by_number(
+        self,
+        realm_name: str,
+        account_number: str,
+    ) -> Account | None:
+        return self.session.scalars(
+            select(Account)
+            .join(Realm, Realm.id == Account.realm_id)
+            .options(selectinload(Account.sso_roles))
+            .where(Realm.name == realm_name, Account.number == account_number)
+        ).first()
+
+    def find_authorization(
+        self,
+        realm_name: str,
+        region: str,
+    ) -> Authorization | None:
+        return self.session.scalars(
+            select(Authorization)
+            .join(Realm, Realm.id == Authorization.realm_id)
+            .where(Realm.name == realm_name, Authorization.region == region)
+        ).first()
+
+    def find_credential_context(
+        self,
+        realm_name: str,
+        region: str,
+        account_name: str,
+        role_name: str,
+    ) -> tuple[Account, Authorization | None, Credential | None] | None:
+        row = (
+            self.session.execute(
+                select(Account, Authorization, Credential)
+                .join(Realm, Realm.id == Account.realm_id)
+                .outerjoin(
+                    Authorization,
+                    and_(
+                        Authorization.realm_id == Realm.id,
+                        Authorization.region == region,
+                    ),
+                )
+                .outerjoin(
+                    Credential,
+                    and_(
+                        Credential.account_id == Account.id,
+                        Credential.role_name == role_name,
+                    ),
+                )
+                .options(joinedload(Account.sso_roles))
+                .where(Realm.name == realm_name, Account.name == account_name)
+            )
+            .unique()
+            .first()
+        )
+
+        if not row:
+            return None
+
+        account, authorization, credential = row
+
+        return account, authorization, credential
+
+    def find_realm(self, realm_name: str) -> Realm | None:
+        return self.session.scalars(
+            select(Realm).where(Realm.name == realm_name)
+        ).first()
+
+    def find_role_arn(self, account_id: int, role_name: str) -> str | None:
+        return self.session.scalars(
+            select(RoleArn.arn).where(
+                RoleArn.account_id == account_id,
+                RoleArn.role_name == role_name,
+            )
+        ).first()
+
+    def find_sso_roles(self) -> list[tuple[str, str, str, str]]:
+        # Plain rows instead of entities, exporting every role of a large
+        # organization should not build an object graph.
+        return list(
+            self.session.execute(
+                select(Realm.name, Account.name, Account.number, SsoRole.name)
+                .join(Account, Account.realm_id == Realm.id)
+                .join(SsoRole, SsoRole.account_id == Account.id)
+                .order_by(Realm.name, Account.name, SsoRole.name)
+            ).tuples()
+        )
+
+    def find_valid_credentials(self) -> list[Credential]:
+        return list(
+            self.session.scalars(
+                select(Credential)
+                .options(joinedload(Credential.account))
+                .where(Credential.expires_at > datetime.now().timestamp())
+            )
+        )
+
+    def search_accounts(self, realm_name: str, pattern: str) -> list[Account]:
+        return list(
+            self.session.scalars(
+                select(Account)
+                .join(Realm, Realm.id == Account.realm_id)
+                .options(selectinload(Account.sso_roles))
+                .where(
+                    Realm.name == realm_name,
+                    or_(
+                        pattern_matches(Account.number, pattern),
+                        pattern_matches(Account.name, pattern),
+                    ),
+                )
+            )
+        )
@@ -1,4 +1,18 @@
+DEFAULT_AGENT_HOST: str = "127.0.0.1"
+DEFAULT_AGENT_PORT: int = 9911
 DEFAULT_AWS_REGION: str = "eu-central-1"
+DEFAULT_CREDENTIAL_REFRESH_MARGIN_IN_SECONDS: int = 15 * 60
+DEFAULT_DATABASE_BUSY_TIMEOUT_IN_SECONDS: int = 30
+DEFAULT_DATABASE_POOL_SIZE: int = 8
+DEFAULT_MAX_POOL_CONNECTIONS: int = 32
+DEFAULT_OPEN_CONSOLE_CONCURRENCY: int = 8
+DEFAULT_REFRESH_FRACTION: float = 0.8
+DEFAULT_REFRESH_JITTER: float = 0.1
+DEFAULT_REFRESH_RETRY_IN_SECONDS: int = 30
+DEFAULT_REQUEST_BURST: int = 10
+DEFAULT_REQUEST_RATE: float = 10.0
 DEFAULT_RETRY_AFTER_IN_SECONDS: int = 5
 DEFAULT_TIMEOUT_IN_SECONDS: int = 60
 DEFAULT_SESSION_DURATION_IN_SECONDS: int = 3600
+DEFAULT_SIGNIN_TOKEN_MARGIN_IN_SECONDS: int = 60
+DEFAULT_SYNC_CONCURRENCY: int = 8
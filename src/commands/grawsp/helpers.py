@@ -0,0 +1,106 @@
+from typing import TYPE_CHECKING, Any
+
+from cement.core.config import ConfigHandler
+
+from .exceptions import RuntimeAppError
+
+if TYPE_CHECKING:
+    from ...util.terminal.spinner import Spinner
+
+
+def to_bool(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+
+    return str(value).strip().lower() in ("1", "on", "true", "yes")
+
+
+def resolve_role_names(
+    config: ConfigHandler,
+    realm_name: str,
+    account_name: str,
+    sso_roles: list[str],
+    role_name: str = "",
+    from_role_name: str = "",
+) -> tuple[str, str]:
+    default_role_name = ""
+
+    if config.has_option(account_name, "default_role"):
+        default_role_name = config.get(account_name, "default_role")
+    elif config.has_option(realm_name, "default_role"):
+        default_role_name = config.get(realm_name, "default_role")
+
+    role_name = role_name or default_role_name
+
+    if not role_name:
+        raise RuntimeAppError("AWS role could not be determined")
+
+    if role_name in sso_roles:
+        return role_name, ""
+
+    intermediary_role_name = from_role_name or default_role_name
+
+    if not intermediary_role_name:
+        raise RuntimeAppError("Intermediary role could not be determined")
+
+    return role_name, intermediary_role_name
+
+
+def find_realm_names(config: ConfigHandler) -> list[str]:
+    return sorted(
+        section
+        for section in config.get_sections()
+        if config.has_option(section, "start_url")
+    )
+
+
+def get_realm_regions(config: ConfigHandler, realm_name: str) -> list[str]:
+    regions = ""
+
+    if config.has_option(realm_name, "regions"):
+        regions = config.get(realm_name, "regions")
+
+    return [region.strip() for region in regions.split(",") if region.strip()] or [
+        config.get("aws", "default_region")
+    ]
+
+
+def resolve_realm_names(
+    config: ConfigHandler,
+    realm_name: str = "",
+    all_realms: bool = False,
+) -> list[str]:
+    if all_realms:
+        realm_names = find_realm_names(config)
+
+        if not realm_names:
+            raise RuntimeAppError("No AWS realm configuration found")
+
+        return realm_names
+
+    realm_name = realm_name or config.get("aws", "default_realm")
+
+    if not realm_name:
+        raise RuntimeAppError("No AWS realm provided")
+
+    return [realm_name]
+
+
+def report_scheduler_stats(log: Any, spinner: "Spinner") -> None:
+    from ...services.aws.scheduler import get_scheduler
+
+    scheduler = get_scheduler()
+
+    for api, stats in scheduler.stats().items():
+        log.debug(
+            f"{api}: {stats['calls']:.0f} calls, {stats['throttles']:.0f}"
+            f" throttled, {stats['waited']:.1f}s waiting"
+        )
+
+    throttling = scheduler.summary()
+
+    if throttling["throttles"]:
+        spinner.warning(
+            f"AWS throttled {throttling['throttles']:.0f} of {throttling['calls']:.0f}"
+            f" calls, {throttling['waited']:.1f}s spent waiting"
+        )
@@ -1,19 +1,17 @@
-from pathlib import Path
-
 from cement import App
-from sqlalchemy import create_engine
-
-from .database.models import Base
-
-
-def database_hook(app: App) -> None:
-    path = Path(app.config.get("database", "path"))
 
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.touch(exist_ok=True)
+from ...services.aws.clients import configure_clients
+from ...services.aws.scheduler import configure_scheduler
+from .helpers import to_bool
 
-    uri = f"sqlite:///{path.as_posix()}"
-    engine = create_engine(uri)
 
-    Base.metadata.create_all(engine)
-    app.extend("database_engine", engine)
+def aws_clients_hook(app: App) -> None:
+    configure_clients(
+        endpoint_url=app.config.get("aws", "endpoint_url"),
+        max_pool_connections=int(app.config.get("aws", "max_pool_connections")),
+        tcp_keepalive=to_bool(app.config.get("aws", "tcp_keepalive")),
+    )
+    configure_scheduler(
+        burst=int(app.config.get("aws", "request_burst")),
+        rate=float(app.config.get("aws", "request_rate")),
+    )
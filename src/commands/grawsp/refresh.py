@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import random
+from collections.abc import Callable, Hashable
+from threading import Event, Lock
+from time import time
+from typing import Any
+
+from .defaults import (
+    DEFAULT_CREDENTIAL_REFRESH_MARGIN_IN_SECONDS,
+    DEFAULT_REFRESH_FRACTION,
+    DEFAULT_REFRESH_JITTER,
+    DEFAULT_REFRESH_RETRY_IN_SECONDS,
+    DEFAULT_SESSION_DURATION_IN_SECONDS,
+)
+
+
+class RefreshScheduler:
+    def __init__(
+        self,
+        refresh: Callable[[Hashable], dict[str, Any]],
+        clock: Callable[[], float] = time,
+        refresh_fraction: float = DEFAULT_REFRESH_FRACTION,
+        jitter: float = DEFAULT_REFRESH_JITTER,
+        retry_after: float = DEFAULT_REFRESH_RETRY_IN_SECONDS,
+        margin: float = DEFAULT_CREDENTIAL_REFRESH_MARGIN_IN_SECONDS,
+        rng: random.Random | None = None,
+    ) -> None:
+        self._clock = clock
+        self._lock = Lock()
+        self._refresh = refresh
+        self._rng = rng or random.Random()  # nosec B311
+        self._schedule: dict[Hashable, float] = {}
+        self._stopped = False
+        self._wakeup = Event()
+        self.failures = 0
+        self.jitter = jitter
+        self.margin = margin
+        self.refresh_fraction = refresh_fraction
+        self.refreshes = 0
+        self.retry_after = retry_after
+
+    @property
+    def watched(self) -> dict[Hashable, float]:
+        with self._lock:
+            return dict(self._schedule)
+
+    def is_stale(self, credential: dict[str, Any]) -> bool:
+        issued_at, usable_until = self._lifetime(credential)
+        fraction = self.refresh_fraction - self.jitter
+
+        return self._clock() >= issued_at + (usable_until - issued_at) * fraction
+
+    def next_refresh_at(self, credential: dict[str, Any] | None) -> float:
+        if not credential:
+            return self._clock()
+
+        issued_at, usable_until = self._lifetime(credential)
+
+        # Jitter only ever brings a refresh forward, so that pairs minted
+        # together spread out without getting closer to their expiry.
+        fraction = self.refresh_fraction - self._rng.uniform(0, self.jitter)
+
+        return issued_at + (usable_until - issued_at) * max(fraction, 0)
+
+    def run_pending(self) -> int:
+        now = self._clock()
+
+        with self._lock:
+            due = [
+                key for key, refresh_at in self._schedule.items() if refresh_at <= now
+            ]
+
+        for key in due:
+            try:
+                credential = self._refresh(key)
+            except Exception:
+                self.failures += 1
+                refresh_at = self._clock() + self.retry_after
+            else:
+                self.refreshes += 1
+                refresh_at = self.next_refresh_at(credential)
+
+            with self._lock:
+                if key in self._schedule:
+                    self._schedule[key] = refresh_at
+
+        return len(due)
+
+    def run(self, sleep: Callable[[float], Any] | None = None) -> None:
+        while not self._stopped:
+            self.run_pending()
+
+            with self._lock:
+                next_refresh_at = min(self._schedule.values(), default=None)
+
+            delay = (
+                self.retry_after
+                if next_refresh_at is None
+                else max(next_refresh_at - self._clock(), 0)
+            )
+
+            if sleep:
+                sleep(delay)
+            else:
+                self._wakeup.wait(delay)
+                self._wakeup.clear()
+
+    def stop(self) -> None:
+        self._stopped = True
+        self._wakeup.set()
+
+    def unwatch(self, key: Hashable) -> None:
+        with self._lock:
+            self._schedule.pop(key, None)
+
+    def watch(self, key: Hashable, credential: dict[str, Any] | None = None) -> None:
+        refresh_at = self.next_refresh_at(credential)
+
+        with self._lock:
+            self._schedule[key] = refresh_at
+
+        self._wakeup.set()
+
+    def _lifetime(self, credential: dict[str, Any]) -> tuple[float, float]:
+        expires_at = credential["expires_at"]
+        issued_at = credential.get("issued_at") or (
+            expires_at - DEFAULT_SESSION_DURATION_IN_SECONDS
+        )
+
+        # Callers already re-mint once less than the margin is left, so the
+        # fraction is taken of the time before that instead of the expiry.
+        return issued_at, max(expires_at - self.margin, issued_at)
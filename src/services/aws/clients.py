@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import hashlib
+from collections import OrderedDict
+from threading import Lock
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    import boto3
+
+DEFAULT_MAX_CACHED_CLIENTS: int = 256
+DEFAULT_MAX_POOL_CONNECTIONS: int = 32
+
+_clients: OrderedDict[tuple[str, str, str], Any] = OrderedDict()
+_lock = Lock()
+_options: dict[str, Any] = {
+    "endpoint_url": "",
+    "max_cached_clients": DEFAULT_MAX_CACHED_CLIENTS,
+    "max_pool_connections": DEFAULT_MAX_POOL_CONNECTIONS,
+    "tcp_keepalive": True,
+}
+_session: boto3.Session | None = None
+
+#
+# FUNCTIONS
+#
+
+
+def clear_clients() -> None:
+    with _lock:
+        _clients.clear()
+
+
+def configure_clients(
+    endpoint_url: str = "",
+    max_cached_clients: int = DEFAULT_MAX_CACHED_CLIENTS,
+    max_pool_connections: int = DEFAULT_MAX_POOL_CONNECTIONS,
+    tcp_keepalive: bool = True,
+) -> None:
+    with _lock:
+        _options["endpoint_url"] = endpoint_url
+        _options["max_cached_clients"] = max_cached_clients
+        _options["max_pool_connections"] = max_pool_connections
+        _options["tcp_keepalive"] = tcp_keepalive
+        _clients.clear()
+
+
+def get_endpoint_url() -> str:
+    return _options["endpoint_url"]
+
+
+def get_client(
+    service_name: str,
+    region: str,
+    access_key_id: str = "",
+    secret_access_key: str = "",
+    session_token: str = "",
+) -> Any:
+    global _session
+
+    # boto3 is only imported once a client is needed, it is the most expensive
+    # dependency to load.
+    import boto3
+    from botocore.config import Config
+
+    identity = ""
+
+    if access_key_id:
+        identity = hashlib.sha256(
+            f"{access_key_id}:{secret_access_key}:{session_token}".encode()
+        ).hexdigest()
+
+    key = (service_name, region, identity)
+
+    with _lock:
+        if key in _clients:
+            _clients.move_to_end(key)
+            return _clients[key]
+
+        # boto3 sessions are not thread safe, but a single one shares the loaded
+        # service models and endpoint data between all the clients it creates.
+        if _session is None:
+            _session = boto3.Session()
+
+        options = {
+            # Retries are left to the request scheduler, which also slows down
+            # when the calls are throttled.
+            "config": Config(
+                max_pool_connections=_options["max_pool_connections"],
+                retries={"mode": "standard", "total_max_attempts": 1},
+                tcp_keepalive=_options["tcp_keepalive"],
+            ),
+            "region_name": region,
+        }
+
+        # Every service is sent to the same endpoint, like a local fake of AWS.
+        if _options["endpoint_url"]:
+            options["endpoint_url"] = _options["endpoint_url"]
+
+        if access_key_id:
+            options["aws_access_key_id"] = access_key_id
+            options["aws_secret_access_key"] = secret_access_key
+            options["aws_session_token"] = session_token
+
+        client = _session.client(service_name, **options)
+        _clients[key] = client
+
+        while len(_clients) > _options["max_cached_clients"]:
+            _clients.popitem(last=False)
+
+        return client
@@ -1,8 +1,10 @@
 from typing import Any
 
-import boto3
 from botocore.exceptions import ClientError
 
+from .clients import get_client
+from .scheduler import call
+
 
 def find_role_by_name(
     access_key_id: str,
@@ -10,17 +12,11 @@ def find_role_by_name(
     role_name: str,
     secret_access_key: str,
     session_token: str,
-) -> dict[str, Any]:
-    session = boto3.Session(
-        aws_access_key_id=access_key_id,
-        aws_secret_access_key=secret_access_key,
-        aws_session_token=session_token,
-    )
-
-    iam = session.client("iam", region_name=region)
+) -> dict[str, Any] | None:
+    iam = get_client("iam", region, access_key_id, secret_access_key, session_token)
 
     try:
-        response = iam.get_role(RoleName=role_name)
+        response = call("iam", iam.get_role, RoleName=role_name)
 
         return {
             "role_arn": response["Role"]["Arn"],
@@ -31,5 +27,7 @@ def find_role_by_name(
     except ClientError as e:
         if e.response["Error"]["Code"] == "NoSuchEntity":
             return None
+
+        raise e
     except KeyError as e:
         raise RuntimeError(f"Could not find role '{role_name}', reason: {e}") from e
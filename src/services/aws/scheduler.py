@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import random
+from collections.abc import Callable
+from threading import Lock
+from time import monotonic, sleep
+from typing import Any
+
+BULK: int = 1
+INTERACTIVE: int = 0
+
+DEFAULT_BURST: int = 10
+DEFAULT_MAX_ATTEMPTS: int = 8
+DEFAULT_MAX_DELAY_IN_SECONDS: float = 20.0
+DEFAULT_MIN_RATE: float = 0.5
+DEFAULT_RATE: float = 10.0
+
+THROTTLING_ERROR_CODES = (
+    "RequestLimitExceeded",
+    "Throttling",
+    "ThrottlingException",
+    "TooManyRequestsException",
+)
+
+TRANSIENT_ERROR_CODES = (
+    "InternalFailure",
+    "InternalServerException",
+    "RequestTimeout",
+    "RequestTimeoutException",
+    "ServiceUnavailable",
+)
+
+#
+# TOKEN BUCKET
+#
+
+
+class TokenBucket:
+    def __init__(
+        self,
+        rate: float = DEFAULT_RATE,
+        burst: int = DEFAULT_BURST,
+        min_rate: float = DEFAULT_MIN_RATE,
+        clock: Callable[[], float] = monotonic,
+    ) -> None:
+        self._clock = clock
+        self._interactive_waiting = 0
+        self._lock = Lock()
+        self._updated_at = clock()
+        self.burst = burst
+        self.max_rate = rate
+        self.min_rate = min_rate
+        self.rate = rate
+        self.tokens = float(burst)
+
+    def try_acquire(self, priority: int) -> float:
+        with self._lock:
+            now = self._clock()
+            self.tokens = min(
+                self.burst, self.tokens + (now - self._updated_at) * self.rate
+            )
+            self._updated_at = now
+
+            # Bulk requests leave the tokens to interactive ones waiting for
+            # the same API.
+            if self.tokens >= 1 and (
+                priority == INTERACTIVE or self._interactive_waiting == 0
+            ):
+                self.tokens -= 1
+                return 0.0
+
+            return max(1 - self.tokens, 0.1) / self.rate
+
+    def wait(self, priority: int, sleep: Callable[[float], Any]) -> float:
+        waited = 0.0
+
+        if priority == INTERACTIVE:
+            with self._lock:
+                self._interactive_waiting += 1
+
+        try:
+            while delay := self.try_acquire(priority):
+                sleep(delay)
+                waited += delay
+        finally:
+            if priority == INTERACTIVE:
+                with self._lock:
+                    self._interactive_waiting -= 1
+
+        return waited
+
+    # Additive increase and multiplicative decrease, the rate settles just
+    # under what the API accepts.
+    def on_success(self) -> None:
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+    def on_throttle(self) -> None:
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = min(self.tokens, 0)
+
+
+#
+# SCHEDULER
+#
+
+
+class RequestScheduler:
+    def __init__(
+        self,
+        rate: float = DEFAULT_RATE,
+        burst: int = DEFAULT_BURST,
+        rates: dict[str, float] | None = None,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        max_delay: float = DEFAULT_MAX_DELAY_IN_SECONDS,
+        clock: Callable[[], float] = monotonic,
+        sleep: Callable[[float], Any] = sleep,
+        rng: random.Random | None = None,
+    ) -> None:
+        self._buckets: dict[str, TokenBucket] = {}
+        self._clock = clock
+        self._lock = Lock()
+        self._rng = rng or random.Random()  # nosec B311
+        self._sleep = sleep
+        self._stats: dict[str, dict[str, float]] = {}
+        self.burst = burst
+        self.max_attempts = max_attempts
+        self.max_delay = max_delay
+        self.rate = rate
+        self.rates = rates or {}
+
+    def call(
+        self,
+        service_name: str,
+        operation: Callable[..., dict[str, Any]],
+        priority: int = INTERACTIVE,
+        **kwargs: Any,
+    ) -> dict[str, Any]:
+        # botocore is only imported once a call is made, the scheduler is
+        # configured on start-up by every command.
+        from botocore.exceptions import ClientError, ConnectionError, HTTPClientError
+        from requests.exceptions import ConnectionError as RequestsConnectionError
+        from requests.exceptions import Timeout
+
+        api = f"{service_name}:{getattr(operation, '__name__', 'call')}"
+        bucket, stats = self._get_bucket(service_name, api)
+        attempt = 0
+
+        while True:
+            waited = bucket.wait(priority, self._sleep)
+
+            with self._lock:
+                stats["calls"] += 1
+                stats["waited"] += waited
+
+            try:
+                response = operation(**kwargs)
+            except (
+                ClientError,
+                ConnectionError,
+                HTTPClientError,
+                RequestsConnectionError,
+                Timeout,
+            ) as e:
+                # botocore does not retry, so connection errors and server side
+                # failures are retried here as well.
+                if isinstance(e, ClientError):
+                    error_code = e.response.get("Error", {}).get("Code", "")
+                    status_code = e.response.get("ResponseMetadata", {}).get(
+                        "HTTPStatusCode", 0
+                    )
+
+                    if error_code in THROTTLING_ERROR_CODES:
+                        bucket.on_throttle()
+
+                        with self._lock:
+                            stats["throttles"] += 1
+                    elif error_code not in TRANSIENT_ERROR_CODES and status_code < 500:
+                        raise e
+
+                attempt += 1
+
+                if attempt >= self.max_attempts:
+                    raise e
+
+                delay = self._rng.uniform(0, min(self.max_delay, 0.5 * 2**attempt))
+                self._sleep(delay)
+
+                with self._lock:
+                    stats["waited"] += delay
+            else:
+                bucket.on_success()
+                return response
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        with self._lock:
+            return {api: dict(stats) for api, stats in self._stats.items()}
+
+    def summary(self) -> dict[str, float]:
+        summary = {"calls": 0, "throttles": 0, "waited": 0.0}
+
+        for stats in self.stats().values():
+            for name in summary:
+                summary[name] += stats[name]
+
+        return summary
+
+    def _get_bucket(
+        self, service_name: str, api: str
+    ) -> tuple[TokenBucket, dict[str, float]]:
+        with self._lock:
+            # All the APIs of a service share a bucket, so interactive calls go
+            # before the bulk ones of the same service.
+            if service_name not in self._buckets:
+                self._buckets[service_name] = TokenBucket(
+                    rate=self.rates.get(service_name, self.rate),
+                    burst=self.burst,
+                    clock=self._clock,
+                )
+
+            if api not in self._stats:
+                self._stats[api] = {"calls": 0, "throttles": 0, "waited": 0.0}
+
+            return self._buckets[service_name], self._stats[api]
+
+
+_scheduler = RequestScheduler()
+
+#
+# FUNCTIONS
+#
+
+
+def call(
+    service_name: str,
+    operation: Callable[..., dict[str, Any]],
+    priority: int = INTERACTIVE,
+    **kwargs: Any,
+) -> dict[str, Any]:
+    return _scheduler.call(service_name, operation, priority, **kwargs)
+
+
+def configure_scheduler(
+    rate: float = DEFAULT_RATE,
+    burst: int = DEFAULT_BURST,
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+) -> None:
+    global _scheduler
+
+    _scheduler = RequestScheduler(rate=rate, burst=burst, max_attempts=max_attempts)
+
+
+def get_scheduler() -> RequestScheduler:
+    return _scheduler
@@ -1,9 +1,16 @@
 from __future__ import annotations
 
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from typing import Any
 
-import boto3
+from .clients import get_client
+from .scheduler import BULK, call
+
+DEVICE_CODE_GRANT_TYPE = "urn:ietf:params:oauth:grant-type:device_code"
+REFRESH_TOKEN_GRANT_TYPE = "refresh_token"
+SSO_SCOPES = ["sso:account:access"]
 
 #
 # FUNCTIONS
@@ -16,10 +23,11 @@ def authorize_device(
     region: str,
     start_url: str,
 ) -> dict[str, Any]:
-    session = boto3.Session()
-    sso_oidc = session.client("sso-oidc", region_name=region)
+    sso_oidc = get_client("sso-oidc", region)
 
-    response = sso_oidc.start_device_authorization(
+    response = call(
+        "sso-oidc",
+        sso_oidc.start_device_authorization,
         clientId=client_id,
         clientSecret=client_secret,
         startUrl=start_url,
@@ -31,6 +39,7 @@ def authorize_device(
             "device_expires_at": (
                 datetime.now() + timedelta(seconds=response["expiresIn"])
             ).timestamp(),
+            "interval": response.get("interval"),
             "verfication_url": response["verificationUriComplete"],
         }
     except KeyError as e:
@@ -43,13 +52,14 @@ def create_access_token(
     device_code: str,
     region: str,
 ) -> dict[str, Any]:
-    session = boto3.Session()
-    sso_oidc = session.client("sso-oidc", region_name=region)
+    sso_oidc = get_client("sso-oidc", region)
 
-    response = sso_oidc.create_token(
+    response = call(
+        "sso-oidc",
+        sso_oidc.create_token,
         clientId=client_id,
         clientSecret=client_secret,
-        grantType="urn:ietf:params:oauth:grant-type:device_code",
+        grantType=DEVICE_CODE_GRANT_TYPE,
         deviceCode=device_code,
     )
 
@@ -59,6 +69,7 @@ def create_access_token(
             "client_access_token_expires_at": (
                 datetime.now() + timedelta(seconds=response["expiresIn"])
             ).timestamp(),
+            "refresh_token": response.get("refreshToken"),
         }
     except KeyError as e:
         raise RuntimeError(f"Could not create token, reason: {e}") from e
@@ -68,8 +79,7 @@ def list_sso_accounts(
     access_token: str,
     region: str,
 ) -> list[dict[str, Any]]:
-    session = boto3.Session()
-    sso = session.client("sso", region_name=region)
+    sso = get_client("sso", region)
     accounts = []
     next_token = None
 
@@ -81,7 +91,7 @@ def list_sso_accounts(
         if next_token:
             options["nextToken"] = next_token
 
-        response = sso.list_accounts(**options)
+        response = call("sso", sso.list_accounts, BULK, **options)
 
         if "accountList" in response:
             for account in response["accountList"]:
@@ -110,14 +120,36 @@ def list_sso_accounts(
 def list_sso_accounts_with_roles(
     access_token: str,
     region: str,
+    concurrency: int = 1,
+    on_progress: Callable[[int, int], None] | None = None,
 ) -> list[dict[str, Any]]:
-    accounts = []
+    accounts = list_sso_accounts(access_token, region)
+    total = len(accounts)
+
+    if concurrency <= 1:
+        for completed, account in enumerate(accounts, start=1):
+            account["sso_roles"] = list_sso_roles(
+                access_token, account["account_id"], region
+            )
+
+            if on_progress:
+                on_progress(completed, total)
+
+        return accounts
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {
+            executor.submit(
+                list_sso_roles, access_token, account["account_id"], region
+            ): account
+            for account in accounts
+        }
 
-    for account in list_sso_accounts(access_token, region):
-        sso_roles = list_sso_roles(access_token, account["account_id"], region)
-        account["sso_roles"] = sso_roles
+        for completed, future in enumerate(as_completed(futures), start=1):
+            futures[future]["sso_roles"] = future.result()
 
-        accounts.append(account)
+            if on_progress:
+                on_progress(completed, total)
 
     return accounts
 
@@ -127,8 +159,7 @@ def list_sso_roles(
     account_id: str,
     region: str,
 ) -> list[str]:
-    session = boto3.Session()
-    sso = session.client("sso", region_name=region)
+    sso = get_client("sso", region)
 
     next_token = None
     roles = []
@@ -142,7 +173,7 @@ def list_sso_roles(
         if next_token:
             options["nextToken"] = next_token
 
-        response = sso.list_account_roles(**options)
+        response = call("sso", sso.list_account_roles, BULK, **options)
 
         if "roleList" not in response:
             break
@@ -161,13 +192,48 @@ def list_sso_roles(
     return roles
 
 
+def refresh_access_token(
+    client_id: str,
+    client_secret: str,
+    refresh_token: str,
+    region: str,
+) -> dict[str, Any]:
+    sso_oidc = get_client("sso-oidc", region)
+
+    response = call(
+        "sso-oidc",
+        sso_oidc.create_token,
+        clientId=client_id,
+        clientSecret=client_secret,
+        grantType=REFRESH_TOKEN_GRANT_TYPE,
+        refreshToken=refresh_token,
+    )
+
+    try:
+        return {
+            "client_access_token": response["accessToken"],
+            "client_access_token_expires_at": (
+                datetime.now() + timedelta(seconds=response["expiresIn"])
+            ).timestamp(),
+            # The refresh token may be rotated, otherwise the old one stays valid.
+            "refresh_token": response.get("refreshToken") or refresh_token,
+        }
+    except KeyError as e:
+        raise RuntimeError(f"Could not refresh token, reason: {e}") from e
+
+
 def register_client(name: str, region: str) -> dict[str, Any]:
-    session = boto3.Session()
-    sso_oidc = session.client("sso-oidc", region_name=region)
+    sso_oidc = get_client("sso-oidc", region)
 
-    response = sso_oidc.register_client(
+    # Refresh tokens are only issued to clients registered for that grant and
+    # with the scope to access accounts.
+    response = call(
+        "sso-oidc",
+        sso_oidc.register_client,
         clientName=name,
         clientType="public",
+        grantTypes=[DEVICE_CODE_GRANT_TYPE, REFRESH_TOKEN_GRANT_TYPE],
+        scopes=SSO_SCOPES,
     )
 
     try:
@@ -186,10 +252,11 @@ def assume_sso_role(
     region: str,
     role_name: str,
 ) -> dict[str, Any]:
-    session = boto3.Session()
-    sso = session.client("sso", region_name=region)
+    sso = get_client("sso", region)
 
-    response = sso.get_role_credentials(
+    response = call(
+        "sso",
+        sso.get_role_credentials,
         roleName=role_name,
         accountId=account_id,
         accessToken=access_token,
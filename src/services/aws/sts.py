@@ -2,39 +2,66 @@ from __future__ import annotations
 
 import json
 import urllib
+from threading import Lock
 from typing import Any
 
-import boto3
 import requests
+from requests.adapters import HTTPAdapter
 
-from .iam import find_role_by_name
+from .clients import DEFAULT_MAX_POOL_CONNECTIONS, get_client, get_endpoint_url
+from .scheduler import call
+
+FEDERATION_URL: str = "https://signin.aws.amazon.com/federation"
+SIGNIN_TOKEN_LIFETIME_IN_SECONDS: int = 15 * 60
+
+_http_session: requests.Session | None = None
+_http_session_lock = Lock()
+
+
+def _get_http_session() -> requests.Session:
+    global _http_session
+
+    # A single session keeps the TLS connections to the federation endpoint
+    # alive, and is safe to share between threads for plain GET requests.
+    with _http_session_lock:
+        if _http_session is None:
+            adapter = HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=DEFAULT_MAX_POOL_CONNECTIONS,
+            )
+
+            _http_session = requests.Session()
+            _http_session.mount("http://", adapter)
+            _http_session.mount("https://", adapter)
+
+        return _http_session
+
+
+def _get_federation_url() -> str:
+    endpoint_url = get_endpoint_url()
+
+    if endpoint_url:
+        return f"{endpoint_url.rstrip('/')}/federation"
+
+    return FEDERATION_URL
 
 
 def assume_role(
     access_key_id: str,
     duration: int,
     region: str,
+    role_arn: str,
     role_name: str,
     secret_access_key: str,
     session_name: str,
     session_token: str,
 ) -> dict[str, Any]:
-    session = boto3.Session(
-        aws_access_key_id=access_key_id,
-        aws_secret_access_key=secret_access_key,
-        aws_session_token=session_token,
-    )
+    sts = get_client("sts", region, access_key_id, secret_access_key, session_token)
 
-    sts = session.client("sts", region_name=region)
-    role = find_role_by_name(
-        access_key_id, region, role_name, secret_access_key, session_token
-    )
-
-    if not role:
-        raise RuntimeError(f"Role '{role_name}' not found")
-
-    response = sts.assume_role(
-        RoleArn=role["role_arn"],
+    response = call(
+        "sts",
+        sts.assume_role,
+        RoleArn=role_arn,
         RoleSessionName=session_name,
         DurationSeconds=duration,
     )
@@ -50,11 +77,32 @@ def assume_role(
         raise RuntimeError(f"Could not assume role '{role_name}', reason: {e}") from e
 
 
-def get_console_url(
+def build_console_url(signin_token: str, region: str = "") -> str:
+    destination_url = "https://console.aws.amazon.com/"
+
+    if region:
+        destination_url = f"{destination_url}?region={region}#"
+
+    query_string = urllib.parse.urlencode(
+        {
+            "Action": "login",
+            "Issuer": "amazon.com",
+            "Destination": destination_url,
+            "SigninToken": signin_token,
+        }
+    )
+
+    return f"{_get_federation_url()}?{query_string}"
+
+
+def build_role_arn(account_number: str, role_name: str, path: str = "/") -> str:
+    return f"arn:aws:iam::{account_number}:role{path}{role_name}"
+
+
+def get_signin_token(
     access_key_id: str,
     secret_access_key: str,
     session_token: str,
-    region: str = "",
     timeout: int = 10,
 ) -> str:
     session_data = {
@@ -63,10 +111,10 @@ def get_console_url(
         "sessionToken": session_token,
     }
 
-    federated_signin_endpoint = "https://signin.aws.amazon.com/federation"
-
-    response = requests.get(
-        federated_signin_endpoint,
+    response = call(
+        "signin",
+        _get_http_session().get,
+        url=_get_federation_url(),
         timeout=timeout,
         params={
             "Action": "getSigninToken",
@@ -74,21 +122,6 @@ def get_console_url(
         },
     )
 
-    signin_token = json.loads(response.text)
-    destination_url = "https://console.aws.amazon.com/"
-
-    if region:
-        destination_url = f"{destination_url}?region={region}#"
-
-    query_string = urllib.parse.urlencode(
-        {
-            "Action": "login",
-            "Issuer": "amazon.com",
-            "Destination": destination_url,
-            "SigninToken": signin_token["SigninToken"],
-        }
-    )
-
-    federated_url = f"{federated_signin_endpoint}?{query_string}"
+    response.raise_for_status()
 
-    return federated_url
+    return json.loads(response.text)["SigninToken"]
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import configparser
+import fcntl
+import os
+import re
+import tempfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+SECTION_PATTERN = re.compile(r"^\s*\[(?P<name>[^\]]+)\]")
+
+
+def atomic_write(path: Path, content: str, mode: int = 0o600) -> None:
+    # Readers either see the old or the new file, never a partially written one.
+    if path.exists():
+        mode = path.stat().st_mode & 0o777
+
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+
+    try:
+        with os.fdopen(fd, "w") as temp_file:
+            temp_file.write(content)
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+    except BaseException:
+        Path(temp_path).unlink(missing_ok=True)
+        raise
+
+
+@contextmanager
+def locked(path: Path) -> Iterator[None]:
+    # The lock lives next to the file, the file itself is replaced on every write.
+    lock_path = path.with_name(f".{path.name}.lock")
+
+    with open(lock_path, "a") as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def merge_ini_sections(path: Path, sections: dict[str, dict[str, str]]) -> list[str]:
+    # Only the merged sections are rewritten, every other line of the file,
+    # comments included, is kept as it is. The file is only rewritten when one
+    # of the merged sections changed.
+    with locked(path):
+        content = path.read_text() if path.exists() else ""
+
+        # Hand edited files may repeat sections and options, the last one wins
+        # like it does for the SDK. Without a default section every section is
+        # compared with its own options only.
+        parser = configparser.ConfigParser(
+            default_section="", interpolation=None, strict=False
+        )
+        parser.read_string(content)
+
+        changed = [
+            name
+            for name, values in sections.items()
+            if not parser.has_section(name) or dict(parser[name]) != values
+        ]
+
+        if changed:
+            atomic_write(
+                path,
+                _replace_ini_sections(
+                    content, {name: sections[name] for name in changed}
+                ),
+            )
+
+    return changed
+
+
+def _replace_ini_sections(content: str, sections: dict[str, dict[str, str]]) -> str:
+    lines = []
+    pending = dict(sections)
+    section_name = None
+
+    for line in content.splitlines():
+        line = f"{line}\n"
+        match = SECTION_PATTERN.match(line)
+
+        if match:
+            section_name = match.group("name").strip()
+            lines.append(line)
+
+            if section_name in pending:
+                lines.extend(_format_ini_options(pending.pop(section_name)))
+
+            continue
+
+        # The options of a replaced section are dropped, its comments and
+        # blank lines stay.
+        stripped = line.strip()
+
+        if (
+            section_name in sections
+            and stripped
+            and not stripped.startswith(("#", ";"))
+        ):
+            continue
+
+        lines.append(line)
+
+    for name, values in pending.items():
+        if lines and lines[-1].strip():
+            lines.append("\n")
+
+        lines.append(f"[{name}]\n")
+        lines.extend(_format_ini_options(values))
+
+    return "".join(lines)
+
+
+def _format_ini_options(values: dict[str, str]) -> list[str]:
+    return [f"{key} = {value}\n" for key, value in values.items()]
@@ -1,12 +1,16 @@
 from __future__ import annotations
 
+from threading import RLock
+
 from prompt_toolkit import HTML, print_formatted_text
+from prompt_toolkit.formatted_text.html import html_escape
 from prompt_toolkit.styles import Style
 from yaspin import yaspin
 
 
 class Spinner:
     def __init__(self, message: str) -> None:
+        self._lock = RLock()
         self._spinner = yaspin(
             text=message,
             color="cyan",
@@ -28,11 +32,15 @@ class Spinner:
         self._spinner.text = value
 
     def info(self, message: str, submessage: str = "") -> None:
-        with self._spinner.hidden():
+        with self._lock, self._spinner.hidden():
             print_formatted_text(
                 HTML(
-                    f"<bullet>\\</bullet> <message>{message}</message>"
-                    + (f" <submessage>{submessage}</submessage>" if submessage else ""),
+                    f"<bullet>\\</bullet> <message>{html_escape(message)}</message>"
+                    + (
+                        f" <submessage>{html_escape(submessage)}</submessage>"
+                        if submessage
+                        else ""
+                    ),
                 ),
                 style=Style.from_dict(
                     {
@@ -44,11 +52,15 @@ class Spinner:
             )
 
     def warning(self, message: str, submessage: str = "") -> None:
-        with self._spinner.hidden():
+        with self._lock, self._spinner.hidden():
             print_formatted_text(
                 HTML(
-                    f"<bullet>\\</bullet> <message>{message}</message>"
-                    + (f" <submessage>{submessage}</submessage>" if submessage else ""),
+                    f"<bullet>\\</bullet> <message>{html_escape(message)}</message>"
+                    + (
+                        f" <submessage>{html_escape(submessage)}</submessage>"
+                        if submessage
+                        else ""
+                    ),
                 ),
                 style=Style.from_dict(
                     {
@@ -60,11 +72,15 @@ class Spinner:
             )
 
     def error(self, message: str, submessage: str = "") -> None:
-        with self._spinner.hidden():
+        with self._lock, self._spinner.hidden():
             print_formatted_text(
                 HTML(
-                    f"<bullet>\\</bullet> <message>{message}</message>"
-                    + (f" <submessage>{submessage}</submessage>" if submessage else ""),
+                    f"<bullet>\\</bullet> <message>{html_escape(message)}</message>"
+                    + (
+                        f" <submessage>{html_escape(submessage)}</submessage>"
+                        if submessage
+                        else ""
+                    ),
                 ),
                 style=Style.from_dict(
                     {
@@ -0,0 +1,70 @@
+import pytest
+from sqlalchemy.orm import Session
+
+from src.commands.grawsp.actions.aws import sync_accounts
+from src.commands.grawsp.database.engine import create_database_engine
+from src.commands.grawsp.database.migrations import migrate
+from src.commands.grawsp.database.models import Authorization, Realm
+from src.commands.grawsp.database.repository import Repository
+
+
+@pytest.fixture
+def database_engine(tmp_path):
+    engine = create_database_engine(tmp_path / "grawsp.db")
+    migrate(engine)
+
+    yield engine
+
+    engine.dispose()
+
+
+@pytest.fixture
+def authorization(database_engine):
+    with Session(database_engine, expire_on_commit=False) as session:
+        realm = Realm(name="landing-zone", url="https://example.awsapps.com/start/")
+        authorization = Authorization(
+            client_access_token="token",
+            client_access_token_expires_at=4102444800.0,
+            client_id="client-id",
+            client_name="grawsp",
+            client_secret="client-secret",
+            client_secret_expires_at=4102444800.0,
+            device_code="device-code",
+            device_expires_at=4102444800.0,
+            realm=realm,
+            region="eu-central-1",
+        )
+
+        session.add(authorization)
+        session.commit()
+
+        return authorization
+
+
+def make_accounts_data(size: int) -> list[dict]:
+    return [
+        {
+            "email": f"account-{i}@example.com",
+            "account_id": f"{i:012d}",
+            "account_name": f"account-{i}",
+            "sso_roles": ["ReadOnly", f"Role{i}"],
+        }
+        for i in range(size)
+    ]
+
+
+@pytest.fixture
+def synced_accounts(database_engine, authorization):
+    def sync(accounts: int | list[dict]) -> dict[str, int]:
+        if isinstance(accounts, int):
+            accounts = make_accounts_data(accounts)
+
+        with Repository(database_engine) as repository:
+            return sync_accounts(
+                repository,
+                authorization_id=authorization.id,
+                realm_id=authorization.realm_id,
+                accounts_data=accounts,
+            )
+
+    return sync
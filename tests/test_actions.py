@@ -0,0 +1,402 @@
+from time import time
+
+import pytest
+from botocore.exceptions import ClientError
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from src.commands.grawsp.actions import aws
+from src.commands.grawsp.actions.aws import create_credential
+from src.commands.grawsp.database.functions import literal_prefix
+from src.commands.grawsp.database.models import (
+    Account,
+    Authorization,
+    Credential,
+    SsoRole,
+)
+from src.commands.grawsp.database.repository import Repository
+
+from .conftest import make_accounts_data
+
+
+def test_sync_accounts_only_applies_the_difference(database_engine, synced_accounts):
+    assert synced_accounts(20) == {
+        "added": 20,
+        "changed": 0,
+        "removed": 0,
+    }
+
+    with Session(database_engine) as session:
+        for number in ("000000000003", "000000000007", "000000000015"):
+            account = session.scalars(
+                select(Account).where(Account.number == number)
+            ).one()
+
+            for role_name in ("ReadOnly", f"Role{int(number)}"):
+                session.add(
+                    Credential(
+                        access_key_id="ASIA",
+                        account_id=account.id,
+                        expires_at=4102444800.0,
+                        role_name=role_name,
+                        secret_access_key="secret",
+                        session_token="token",
+                    )
+                )
+
+        session.commit()
+
+    accounts_data = make_accounts_data(22)[5:]
+    accounts_data[2]["account_name"] = "renamed"
+    accounts_data[10]["sso_roles"] = ["ReadOnly"]
+
+    assert synced_accounts(accounts_data) == {
+        "added": 2,
+        "changed": 2,
+        "removed": 5,
+    }
+
+    with Session(database_engine) as session:
+        account = session.scalars(
+            select(Account).where(Account.number == "000000000007")
+        ).one()
+
+        assert account.name == "renamed"
+        assert sorted(role.name for role in account.sso_roles) == ["ReadOnly", "Role7"]
+        assert len(account.credentials) == 2
+        assert session.scalar(select(func.count(Account.id))) == 17
+        assert session.scalar(select(func.count(SsoRole.id))) == 33
+        assert sorted(
+            session.execute(
+                select(Account.number, Credential.role_name).join(Credential.account)
+            ).all()
+        ) == [
+            ("000000000007", "ReadOnly"),
+            ("000000000007", "Role7"),
+            ("000000000015", "ReadOnly"),
+        ]
+
+
+def test_create_credential_mints_once_and_then_hits_the_cache(
+    database_engine, synced_accounts, monkeypatch
+):
+    synced_accounts(3)
+    calls = []
+
+    def assume_sso_role(access_token, account_id, region, role_name):
+        calls.append((account_id, role_name))
+
+        return {
+            "access_key_id": f"ASIA{len(calls)}",
+            "expires_at": 4102444800.0,
+            "secret_access_key": "secret",
+            "session_token": "token",
+        }
+
+    monkeypatch.setattr(aws, "assume_sso_role", assume_sso_role)
+
+    for _ in range(3):
+        with Repository(database_engine) as repository:
+            credential = create_credential(
+                repository,
+                account_name="account-1",
+                realm_name="landing-zone",
+                region="eu-central-1",
+                role_name="Role1",
+            )
+
+    assert credential.access_key_id == "ASIA1"
+    assert calls == [("000000000001", "Role1")]
+
+
+def test_find_accounts_searches_inside_the_database(database_engine, synced_accounts):
+    synced_accounts(30)
+
+    with Repository(database_engine) as repository:
+        assert [
+            account.name
+            for account in aws.find_accounts(repository, "landing-zone", "^account-1.$")
+        ] == [f"account-{number}" for number in range(10, 20)]
+        assert [
+            account.number
+            for account in aws.find_accounts(repository, "landing-zone", "0+2[0-9]")
+        ] == [f"{number:012d}" for number in range(20, 30)]
+        assert (
+            aws.find_accounts(repository, "landing-zone", "(?i)ACCOUNT-29$")[0].name
+            == "account-29"
+        )
+        assert aws.find_accounts(repository, "other-realm", "account-.*") == []
+
+
+def test_literal_prefix():
+    assert literal_prefix("^account-1.$") == "account-1"
+    assert literal_prefix("account-dev") == "account-dev"
+    assert literal_prefix("accounts?") == "account"
+    assert literal_prefix("^.*$") == ""
+    assert literal_prefix("dev|prod") == ""
+    assert literal_prefix("(?i)dev") == ""
+
+
+def test_create_signin_token_is_cached_until_the_credential_changes(
+    database_engine, synced_accounts, monkeypatch
+):
+    synced_accounts(1)
+    calls = []
+
+    def assume_sso_role(access_token, account_id, region, role_name):
+        return {
+            "access_key_id": f"ASIA{len(calls)}",
+            "expires_at": 4102444800.0,
+            "secret_access_key": "secret",
+            "session_token": "token",
+        }
+
+    def get_signin_token(access_key_id, **kwargs):
+        calls.append(access_key_id)
+        return f"token-{access_key_id}"
+
+    monkeypatch.setattr(aws, "assume_sso_role", assume_sso_role)
+    monkeypatch.setattr(aws, "get_signin_token", get_signin_token)
+
+    results = []
+
+    for force_refresh in (False, False, True):
+        with Repository(database_engine) as repository:
+            credential = create_credential(
+                repository,
+                account_name="account-0",
+                realm_name="landing-zone",
+                region="eu-central-1",
+                role_name="ReadOnly",
+                force_refresh=force_refresh,
+            )
+            results.append(aws.create_signin_token(repository, credential))
+
+    assert results == [
+        ("token-ASIA0", False),
+        ("token-ASIA0", True),
+        ("token-ASIA1", False),
+    ]
+    assert credential.signin_token_expires_at <= credential.expires_at
+
+
+def test_create_credential_builds_role_arns_and_caches_other_paths(
+    database_engine, synced_accounts, monkeypatch
+):
+    synced_accounts(1)
+    assumed_arns = []
+    lookups = []
+
+    def assume_role(role_arn, **kwargs):
+        assumed_arns.append(role_arn)
+
+        if role_arn.endswith(":role/Team"):
+            raise ClientError({"Error": {"Code": "AccessDenied"}}, "AssumeRole")
+
+        return {
+            "access_key_id": "ASIA",
+            "expires_at": 4102444800.0,
+            "secret_access_key": "secret",
+            "session_token": "token",
+        }
+
+    def find_role_by_name(role_name, **kwargs):
+        lookups.append(role_name)
+
+        return {"role_arn": f"arn:aws:iam::000000000000:role/teams/{role_name}"}
+
+    monkeypatch.setattr(
+        aws,
+        "assume_sso_role",
+        lambda **kwargs: assume_role("sso", **kwargs),
+    )
+    monkeypatch.setattr(aws, "assume_role", assume_role)
+    monkeypatch.setattr(aws, "find_role_by_name", find_role_by_name)
+
+    for role_name in ("Deploy", "Team", "Team"):
+        with Repository(database_engine) as repository:
+            create_credential(
+                repository,
+                account_name="account-0",
+                realm_name="landing-zone",
+                region="eu-central-1",
+                role_name=role_name,
+                intermediary_role_name="ReadOnly",
+                force_refresh=True,
+            )
+
+    assert [arn for arn in assumed_arns if arn != "sso"] == [
+        "arn:aws:iam::000000000000:role/Deploy",
+        "arn:aws:iam::000000000000:role/Team",
+        "arn:aws:iam::000000000000:role/teams/Team",
+        "arn:aws:iam::000000000000:role/teams/Team",
+    ]
+    assert lookups == ["Team"]
+
+
+def test_create_credential_keeps_the_assume_role_denial_when_lookups_fail(
+    database_engine, synced_accounts, monkeypatch
+):
+    synced_accounts(1)
+    denied = ClientError({"Error": {"Code": "AccessDenied"}}, "AssumeRole")
+
+    def assume_role(role_arn, **kwargs):
+        if role_arn != "sso":
+            raise denied
+
+        return {
+            "access_key_id": "ASIA",
+            "expires_at": 4102444800.0,
+            "secret_access_key": "secret",
+            "session_token": "token",
+        }
+
+    def find_role_by_name(role_name, **kwargs):
+        if role_name == "Hidden":
+            raise ClientError({"Error": {"Code": "AccessDenied"}}, "GetRole")
+
+        return None
+
+    monkeypatch.setattr(
+        aws,
+        "assume_sso_role",
+        lambda **kwargs: assume_role("sso", **kwargs),
+    )
+    monkeypatch.setattr(aws, "assume_role", assume_role)
+    monkeypatch.setattr(aws, "find_role_by_name", find_role_by_name)
+
+    for role_name in ("Missing", "Hidden"):
+        with Repository(database_engine) as repository, pytest.raises(ClientError) as e:
+            create_credential(
+                repository,
+                account_name="account-0",
+                realm_name="landing-zone",
+                region="eu-central-1",
+                role_name=role_name,
+                intermediary_role_name="ReadOnly",
+                force_refresh=True,
+            )
+
+        assert e.value is denied
+
+
+def _expire_access_token(database_engine, refresh_token):
+    with Session(database_engine) as session:
+        session.execute(
+            update(Authorization).values(
+                client_access_token_expires_at=0,
+                device_expires_at=0,
+                refresh_token=refresh_token,
+            )
+        )
+        session.commit()
+
+
+def _create_authorization(database_engine):
+    with Repository(database_engine) as repository:
+        return aws.create_authorization(
+            repository,
+            realm_name="landing-zone",
+            region="eu-central-1",
+            start_url="https://example.awsapps.com/start/",
+            retry_after=1,
+        )
+
+
+def test_create_authorization_renews_silently_with_the_refresh_token(
+    database_engine, authorization, monkeypatch
+):
+    _expire_access_token(database_engine, "refresh-token")
+    calls = []
+
+    def refresh_access_token(refresh_token, **kwargs):
+        calls.append(refresh_token)
+
+        return {
+            "client_access_token": "renewed",
+            "client_access_token_expires_at": 4102444800.0,
+            "refresh_token": "rotated",
+        }
+
+    monkeypatch.setattr(aws, "refresh_access_token", refresh_access_token)
+    monkeypatch.setattr(aws, "authorize_device", None)
+
+    renewed = _create_authorization(database_engine)
+
+    assert calls == ["refresh-token"]
+    assert renewed.client_access_token == "renewed"
+    assert renewed.refresh_token == "rotated"
+
+
+def test_create_authorization_polls_at_the_server_interval(
+    database_engine, authorization, monkeypatch
+):
+    _expire_access_token(database_engine, None)
+    delays = []
+    responses = [
+        "AuthorizationPendingException",
+        "SlowDownException",
+        "AuthorizationPendingException",
+    ]
+
+    def create_access_token(**kwargs):
+        if responses:
+            raise ClientError({"Error": {"Code": responses.pop(0)}}, "CreateToken")
+
+        return {
+            "client_access_token": "approved",
+            "client_access_token_expires_at": 4102444800.0,
+            "refresh_token": "refresh-token",
+        }
+
+    monkeypatch.setattr(
+        aws,
+        "authorize_device",
+        lambda **kwargs: {
+            "device_code": "new-device-code",
+            "device_expires_at": 4102444800.0,
+            "interval": 2,
+            "verfication_url": "https://device.example.com/",
+        },
+    )
+    monkeypatch.setattr(aws, "create_access_token", create_access_token)
+    monkeypatch.setattr(aws, "sleep", delays.append)
+    monkeypatch.setattr(aws.webbrowser, "open_new_tab", lambda url: None)
+
+    approved = _create_authorization(database_engine)
+
+    assert delays == [2, 7, 7]
+    assert approved.refresh_token == "refresh-token"
+
+
+def test_create_credential_mints_again_inside_the_refresh_margin(
+    database_engine, synced_accounts, monkeypatch
+):
+    synced_accounts(3)
+    calls = []
+
+    def assume_sso_role(access_token, account_id, region, role_name):
+        calls.append(account_id)
+
+        return {
+            "access_key_id": f"ASIA{len(calls)}",
+            "expires_at": time() + 10 * 60 * len(calls),
+            "secret_access_key": "secret",
+            "session_token": "token",
+        }
+
+    monkeypatch.setattr(aws, "assume_sso_role", assume_sso_role)
+
+    for _ in range(3):
+        with Repository(database_engine) as repository:
+            credential = create_credential(
+                repository,
+                account_name="account-1",
+                realm_name="landing-zone",
+                region="eu-central-1",
+                role_name="Role1",
+            )
+
+    # Ten minutes left is not enough, twenty minutes is.
+    assert credential.access_key_id == "ASIA2"
+    assert len(calls) == 2
@@ -0,0 +1,132 @@
+import http.client
+import json
+import os
+import socket
+from concurrent.futures import ThreadPoolExecutor
+from threading import Thread
+from time import perf_counter
+
+from src.commands.grawsp.agent import (
+    CredentialCache,
+    CredentialHttpServer,
+    CredentialSocketServer,
+)
+
+# Minimum throughput served from cache, it can be relaxed on slow machines
+# through the environment.
+MIN_REQUESTS_PER_SECOND = float(os.environ.get("GRAWSP_AGENT_MIN_RPS", "1000"))
+CLIENTS = 8
+REQUESTS_PER_CLIENT = 500
+TOKEN = "secret-token"
+
+
+def _mint(realm_name, identifier, role_name):
+    return {
+        "access_key_id": f"ASIA{identifier}",
+        "expires_at": 4102444800.0,
+        "secret_access_key": "secret",
+        "session_token": "token",
+    }
+
+
+def test_cache_misses_for_the_same_key_mint_once():
+    calls = []
+    cache = CredentialCache(lambda *key: calls.append(key) or _mint(*key))
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda _: cache.get("realm", "account", "Role"), range(64)))
+
+    assert calls == [("realm", "account", "Role")]
+    assert cache.hits == 63
+
+
+def test_credentials_inside_the_refresh_margin_are_minted_again():
+    now = 1000.0
+    calls = []
+
+    def mint(realm_name, identifier, role_name):
+        calls.append(identifier)
+        return {**_mint(realm_name, identifier, role_name), "expires_at": now + 1800}
+
+    cache = CredentialCache(mint, clock=lambda: now, margin=900)
+
+    cache.get("realm", "account", "Role")
+    cache.get("realm", "account", "Role")
+
+    assert len(calls) == 1
+
+    now += 1000
+    cache.get("realm", "account", "Role")
+
+    assert len(calls) == 2
+    assert cache.misses == 2
+
+
+def test_http_endpoint_serves_thousands_of_requests_per_second():
+    cache = CredentialCache(_mint)
+    server = CredentialHttpServer(
+        ("127.0.0.1", 0),
+        cache=cache,
+        default_realm_name="realm",
+        authorization_token=TOKEN,
+    )
+    Thread(target=server.serve_forever, daemon=True).start()
+
+    def client(index: int) -> None:
+        connection = http.client.HTTPConnection("127.0.0.1", server.server_port)
+
+        for _ in range(REQUESTS_PER_CLIENT):
+            connection.request(
+                "GET", f"/account-{index}/ReadOnly", headers={"Authorization": TOKEN}
+            )
+            response = connection.getresponse()
+
+            assert response.status == 200
+            assert json.loads(response.read())["AccessKeyId"] == f"ASIAaccount-{index}"
+
+        connection.close()
+
+    try:
+        started_at = perf_counter()
+
+        with ThreadPoolExecutor(max_workers=CLIENTS) as executor:
+            list(executor.map(client, range(CLIENTS)))
+
+        requests_per_second = (
+            CLIENTS * REQUESTS_PER_CLIENT / (perf_counter() - started_at)
+        )
+
+        connection = http.client.HTTPConnection("127.0.0.1", server.server_port)
+        connection.request("GET", "/account-0/ReadOnly")
+
+        assert connection.getresponse().status == 401
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert cache.misses == CLIENTS
+    assert requests_per_second >= MIN_REQUESTS_PER_SECOND
+
+
+def test_unix_socket_serves_credential_process_documents(tmp_path):
+    path = (tmp_path / "agent.sock").as_posix()
+    server = CredentialSocketServer(
+        path, cache=CredentialCache(_mint), default_realm_name="realm"
+    )
+    Thread(target=server.serve_forever, daemon=True).start()
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(path)
+            stream = client.makefile("rwb")
+
+            for account in ("a", "b"):
+                stream.write(
+                    json.dumps({"account": account, "role": "R"}).encode() + b"\n"
+                )
+                stream.flush()
+
+                assert json.loads(stream.readline())["AccessKeyId"] == f"ASIA{account}"
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,91 @@
+import pytest
+
+from src.commands.grawsp import app
+from src.commands.grawsp.actions import aws
+from src.util.terminal.spinner import Spinner
+
+
+def _run_auth(database_engine, tmp_path, monkeypatch, config: str, *argv: str):
+    minted = []
+
+    def create_credential(account_name, **kwargs):
+        if account_name == "account-2":
+            raise RuntimeError('Could not connect to "https://sso/?a=1&b=<2>"')
+
+        minted.append(account_name)
+
+    messages = []
+
+    def record(self, message, submessage=""):
+        messages.append(f"{message} {submessage}".strip())
+
+    monkeypatch.setattr(aws, "create_credential", create_credential)
+    monkeypatch.setattr(Spinner, "error", record)
+    monkeypatch.setattr(Spinner, "info", record)
+
+    config_path = tmp_path / "grawsp.conf"
+    config_path.write_text(
+        f"[database]\npath = {database_engine.url.database}\n"
+        "[landing-zone]\nstart_url = https://example.awsapps.com/start/\n" + config
+    )
+
+    grawsp_app = app.GrawspApp
+    monkeypatch.setattr(
+        app,
+        "GrawspApp",
+        lambda: grawsp_app(
+            argv=["--realm", "landing-zone", "auth", *argv],
+            config_files=[config_path.as_posix()],
+        ),
+    )
+
+    with pytest.raises(SystemExit) as e:
+        app.run()
+
+    assert e.value.code == 1
+
+    return sorted(minted), "\n".join(messages)
+
+
+def test_auth_in_parallel_isolates_failing_accounts(
+    database_engine, synced_accounts, tmp_path, monkeypatch
+):
+    synced_accounts(5)
+
+    minted, output = _run_auth(
+        database_engine,
+        tmp_path,
+        monkeypatch,
+        "default_role = ReadOnly\n",
+        "--parallel",
+        "4",
+        "account-.*",
+    )
+
+    assert minted == ["account-0", "account-1", "account-3", "account-4"]
+    assert "Could not authorize to account-2 account as ReadOnly role" in output
+    assert "4 succeeded, 1 failed in landing-zone realm" in output
+
+
+def test_auth_isolates_accounts_without_a_resolvable_role(
+    database_engine, synced_accounts, tmp_path, monkeypatch
+):
+    synced_accounts(5)
+
+    # Only account-3 has Role3 and there is no intermediary role to fall back to.
+    minted, output = _run_auth(
+        database_engine,
+        tmp_path,
+        monkeypatch,
+        "",
+        "--parallel",
+        "4",
+        "--role",
+        "Role3",
+        "account-.*",
+    )
+
+    assert minted == ["account-3"]
+    assert "Could not authorize to account-0 account" in output
+    assert "Intermediary role could not be determined" in output
+    assert "1 succeeded, 4 failed in landing-zone realm" in output
@@ -0,0 +1,28 @@
+from src.services.aws.clients import clear_clients, configure_clients, get_client
+
+
+def test_clients_are_reused_per_service_region_and_identity():
+    clear_clients()
+
+    sso = get_client("sso", "eu-central-1")
+
+    assert get_client("sso", "eu-central-1") is sso
+    assert get_client("sso", "eu-west-1") is not sso
+
+    sts = get_client("sts", "eu-central-1", "AKIA1", "secret", "token")
+
+    assert get_client("sts", "eu-central-1", "AKIA1", "secret", "token") is sts
+    assert get_client("sts", "eu-central-1", "AKIA2", "secret", "token") is not sts
+
+
+def test_least_recently_used_clients_are_evicted():
+    configure_clients(max_cached_clients=2, max_pool_connections=4)
+
+    first = get_client("sts", "eu-central-1", "AKIA1", "secret", "token")
+    get_client("sts", "eu-central-1", "AKIA2", "secret", "token")
+    get_client("sts", "eu-central-1", "AKIA3", "secret", "token")
+
+    assert get_client("sts", "eu-central-1", "AKIA1", "secret", "token") is not first
+    assert first.meta.config.max_pool_connections == 4
+
+    configure_clients()
@@ -0,0 +1,126 @@
+import configparser
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from statistics import median
+from time import perf_counter, time
+
+from src.commands.grawsp.credential_process import find_cached_credential
+from src.commands.grawsp.database.models import Credential
+from src.commands.grawsp.database.repository import Repository
+
+# Budget for a cache hit on top of the bare interpreter start up, it can be
+# relaxed on slow machines through the environment.
+LATENCY_BUDGET_IN_SECONDS = float(
+    os.environ.get("GRAWSP_CREDENTIAL_PROCESS_BUDGET", "0.1")
+)
+ROOT_PATH = Path(__file__).parent.parent
+RUNS = 10
+
+SCRIPT = """
+import sys
+
+from src.commands.grawsp.cli import run
+
+run()
+
+for module in ("boto3", "cement", "sqlalchemy"):
+    assert module not in sys.modules, module
+"""
+
+
+def _time(arguments: list[str], env: dict[str, str]) -> tuple[float, str]:
+    started_at = perf_counter()
+    result = subprocess.run(
+        [sys.executable, *arguments],
+        capture_output=True,
+        check=True,
+        cwd=ROOT_PATH,
+        env=env,
+        text=True,
+    )
+
+    return perf_counter() - started_at, result.stdout
+
+
+def test_cache_hits_are_served_within_the_latency_budget(
+    database_engine, synced_accounts, tmp_path
+):
+    synced_accounts(1000)
+
+    with Repository(database_engine) as repository:
+        account = repository.find_account_by_name("landing-zone", "account-500")
+        repository.session.add(
+            Credential(
+                access_key_id="ASIA500",
+                account_id=account.id,
+                expires_at=4102444800.0,
+                role_name="ReadOnly",
+                secret_access_key="secret",
+                session_token="token",
+            )
+        )
+        repository.session.commit()
+
+    config_path = tmp_path / ".config" / "grawsp" / "grawsp.conf"
+    config_path.parent.mkdir(parents=True)
+    config_path.write_text(
+        "[aws]\ndefault_realm = landing-zone\n\n"
+        f"[database]\npath = {database_engine.url.database}\n\n"
+        "[landing-zone]\ndefault_role = ReadOnly\n"
+    )
+
+    env = {**os.environ, "HOME": tmp_path.as_posix()}
+    arguments = ["-c", SCRIPT, "credential-process", "000000000500"]
+
+    _, output = _time(arguments, env)
+
+    assert json.loads(output) == {
+        "Version": 1,
+        "AccessKeyId": "ASIA500",
+        "SecretAccessKey": "secret",
+        "SessionToken": "token",
+        "Expiration": "2100-01-01T00:00:00Z",
+    }
+
+    baseline = median(_time(["-c", "pass"], env)[0] for _ in range(RUNS))
+    latency = median(_time(arguments, env)[0] for _ in range(RUNS))
+
+    assert latency - baseline < LATENCY_BUDGET_IN_SECONDS
+
+
+def test_credentials_inside_the_refresh_margin_are_not_served(
+    database_engine, synced_accounts
+):
+    synced_accounts(3)
+
+    with Repository(database_engine) as repository:
+        for number, minutes in ((1, 10), (2, 20)):
+            account = repository.find_account_by_name(
+                "landing-zone", f"account-{number}"
+            )
+            repository.session.add(
+                Credential(
+                    access_key_id=f"ASIA{number}",
+                    account_id=account.id,
+                    expires_at=time() + minutes * 60,
+                    role_name="ReadOnly",
+                    secret_access_key="secret",
+                    session_token="token",
+                )
+            )
+
+        repository.session.commit()
+
+    config = configparser.ConfigParser()
+    config.read_dict({"database": {"path": database_engine.url.database}})
+
+    assert not find_cached_credential(config, "account-1", "landing-zone", "ReadOnly")
+    assert (
+        json.loads(
+            find_cached_credential(config, "account-2", "landing-zone", "ReadOnly")
+        )["AccessKeyId"]
+        == "ASIA2"
+    )
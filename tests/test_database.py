@@ -0,0 +1,100 @@
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from threading import Barrier
+
+from src.commands.grawsp.actions import aws
+from src.commands.grawsp.actions.aws import create_credential
+from src.commands.grawsp.app import GrawspApp
+from src.commands.grawsp.database.engine import create_database_engine
+from src.commands.grawsp.database.repository import Repository
+
+PROCESSES = 24
+ROUNDS = 4
+
+
+def _fake_assume_sso_role(access_token, account_id, region, role_name):
+    # Already expired, so every call mints and writes a credential again.
+    return {
+        "access_key_id": f"ASIA{account_id}",
+        "expires_at": 0.0,
+        "secret_access_key": "secret",
+        "session_token": "token",
+    }
+
+
+def _auth(database_path: str, worker: int) -> None:
+    aws.assume_sso_role = _fake_assume_sso_role
+    engine = create_database_engine(Path(database_path))
+
+    for _ in range(ROUNDS):
+        for account in range(worker // 2 % 4, 20, 4):
+            with Repository(engine) as repository:
+                create_credential(
+                    repository,
+                    account_name=f"account-{account}",
+                    realm_name="landing-zone",
+                    region="eu-central-1",
+                    role_name="ReadOnly",
+                )
+
+
+def _list(config_path: str, worker: int) -> None:
+    for _ in range(ROUNDS):
+        for command in (["list", "creds", "--expired"], ["list", "accounts"]):
+            with GrawspApp(argv=command, config_files=[config_path]) as app:
+                app.run()
+
+
+def test_concurrent_commands_do_not_lock_each_other_out(
+    database_engine, synced_accounts, tmp_path
+):
+    synced_accounts(20)
+
+    database_path = database_engine.url.database
+    config_path = tmp_path / "grawsp.conf"
+    config_path.write_text(f"[database]\npath = {database_path}\n")
+
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(
+            target=_auth if worker % 2 else _list,
+            args=(
+                database_path if worker % 2 else config_path.as_posix(),
+                worker,
+            ),
+        )
+        for worker in range(PROCESSES)
+    ]
+
+    for process in processes:
+        process.start()
+
+    for process in processes:
+        process.join(timeout=120)
+
+    assert [process.exitcode for process in processes] == [0] * PROCESSES
+
+    with database_engine.connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert (
+            connection.exec_driver_sql("SELECT COUNT(*) FROM credential").scalar() == 20
+        )
+
+
+def test_threads_beyond_the_pool_size_get_their_own_connection(tmp_path):
+    engine = create_database_engine(tmp_path / "grawsp.db", pool_size=2)
+    threads = 20
+    barrier = Barrier(threads, timeout=10)
+
+    def hold_connection(_: int) -> int:
+        # Every thread keeps its connection until all of them have one.
+        with engine.connect() as connection:
+            barrier.wait()
+            return connection.exec_driver_sql("SELECT 1").scalar()
+
+    try:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            assert list(executor.map(hold_connection, range(threads))) == [1] * threads
+    finally:
+        engine.dispose()
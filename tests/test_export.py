@@ -0,0 +1,157 @@
+import configparser
+
+from src.commands.grawsp.app import GrawspApp
+from src.commands.grawsp.database.models import Credential
+from src.commands.grawsp.database.repository import Repository
+
+
+def _export(config_path, credentials_path) -> None:
+    with GrawspApp(
+        argv=["export", "--path", credentials_path.as_posix()],
+        config_files=[config_path.as_posix()],
+    ) as app:
+        app.run()
+
+
+def test_export_merges_changed_profiles_only(
+    database_engine, synced_accounts, tmp_path
+):
+    synced_accounts(3)
+
+    with Repository(database_engine) as repository:
+        for number in range(3):
+            account = repository.find_account_by_name(
+                "landing-zone", f"account-{number}"
+            )
+            repository.session.add(
+                Credential(
+                    access_key_id=f"ASIA{number}",
+                    account_id=account.id,
+                    expires_at=4102444800.0,
+                    role_name="ReadOnly",
+                    secret_access_key="secret",
+                    session_token="token%",
+                )
+            )
+
+        repository.session.commit()
+
+    config_path = tmp_path / "grawsp.conf"
+    config_path.write_text(f"[database]\npath = {database_engine.url.database}\n")
+
+    credentials_path = tmp_path / "credentials"
+    credentials_path.write_text("[personal]\naws_access_key_id = AKIA\n")
+
+    _export(config_path, credentials_path)
+
+    parser = configparser.ConfigParser(interpolation=None)
+    parser.read(credentials_path)
+
+    assert parser.sections() == [
+        "personal",
+        "account-0-readonly",
+        "account-1-readonly",
+        "account-2-readonly",
+    ]
+    assert parser["account-1-readonly"]["aws_session_token"] == "token%"
+
+    modified_at = credentials_path.stat().st_mtime_ns
+    _export(config_path, credentials_path)
+
+    assert credentials_path.stat().st_mtime_ns == modified_at
+
+
+def test_export_credential_process_profiles(database_engine, synced_accounts, tmp_path):
+    synced_accounts(2)
+
+    config_path = tmp_path / "grawsp.conf"
+    config_path.write_text(f"[database]\npath = {database_engine.url.database}\n")
+
+    aws_config_path = tmp_path / "config"
+    aws_config_path.write_text("[profile personal]\nregion = us-east-1\n")
+
+    with GrawspApp(
+        argv=[
+            "export",
+            "--credential-process",
+            "--config-path",
+            aws_config_path.as_posix(),
+            "--default-account",
+            "account-1",
+            "--default-role",
+            "Role1",
+        ],
+        config_files=[config_path.as_posix()],
+    ) as app:
+        app.run()
+
+    parser = configparser.ConfigParser(interpolation=None)
+    parser.read(aws_config_path)
+
+    assert parser.sections() == [
+        "profile personal",
+        "profile account-0-readonly",
+        "profile account-0-role0",
+        "profile account-1-readonly",
+        "profile account-1-role1",
+        "default",
+    ]
+    assert parser["profile account-0-role0"]["credential_process"].endswith(
+        "--realm landing-zone credential-process --role Role0 000000000000"
+    )
+    assert parser["default"] == parser["profile account-1-role1"]
+
+
+def test_export_credential_process_keeps_comments_in_the_aws_config(
+    database_engine, synced_accounts, tmp_path
+):
+    synced_accounts(1)
+
+    config_path = tmp_path / "grawsp.conf"
+    config_path.write_text(f"[database]\npath = {database_engine.url.database}\n")
+
+    aws_config_path = tmp_path / "config"
+    aws_config_path.write_text(
+        "# Personal profiles, keep these\n"
+        "[profile personal]\n"
+        "; switched to us-east-1 for billing\n"
+        "region = us-east-1\n"
+        "\n"
+        "[profile account-0-readonly]\n"
+        "# generated by grawsp\n"
+        "region = eu-west-1\n"
+    )
+
+    with GrawspApp(
+        argv=[
+            "export",
+            "--credential-process",
+            "--config-path",
+            aws_config_path.as_posix(),
+        ],
+        config_files=[config_path.as_posix()],
+    ) as app:
+        app.run()
+
+    content = aws_config_path.read_text()
+
+    assert content.startswith(
+        "# Personal profiles, keep these\n"
+        "[profile personal]\n"
+        "; switched to us-east-1 for billing\n"
+        "region = us-east-1\n"
+        "\n"
+        "[profile account-0-readonly]\n"
+        "credential_process = "
+    )
+    assert "# generated by grawsp\n" in content
+    assert "region = eu-west-1" not in content
+
+    parser = configparser.ConfigParser(interpolation=None)
+    parser.read(aws_config_path)
+
+    assert parser.sections() == [
+        "profile personal",
+        "profile account-0-readonly",
+        "profile account-0-role0",
+    ]
@@ -0,0 +1,101 @@
+from threading import Thread
+
+import pytest
+from botocore.exceptions import ClientError
+
+from benchmarks.fakes import make_catalog
+from benchmarks.server import FakeAwsServer
+from src.services.aws import iam, sso, sts
+from src.services.aws.clients import configure_clients
+from src.services.aws.scheduler import configure_scheduler
+
+
+@pytest.fixture
+def fake_server():
+    server = FakeAwsServer(("127.0.0.1", 0), make_catalog(45), page_size=20, seed=1)
+    thread = Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    configure_clients(endpoint_url=server.url)
+    configure_scheduler(rate=1000, burst=1000)
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+    configure_clients()
+    configure_scheduler()
+
+
+def test_grawsp_runs_against_the_fake_server(fake_server):
+    client = sso.register_client("grawsp", "eu-central-1")
+    device = sso.authorize_device(
+        client["client_id"],
+        client["client_secret"],
+        "eu-central-1",
+        "https://example.awsapps.com/start/",
+    )
+    token = sso.create_access_token(
+        client["client_id"],
+        client["client_secret"],
+        device["device_code"],
+        "eu-central-1",
+    )
+
+    accounts = sso.list_sso_accounts(token["client_access_token"], "eu-central-1")
+
+    assert len(accounts) == 45
+    assert fake_server.calls["ListAccounts"] == 3
+
+    creds = sso.assume_sso_role(
+        token["client_access_token"], "000000000007", "eu-central-1", "Role7"
+    )
+    role = iam.find_role_by_name(
+        access_key_id=creds["access_key_id"],
+        region="eu-central-1",
+        role_name="Admin",
+        secret_access_key=creds["secret_access_key"],
+        session_token=creds["session_token"],
+    )
+    role_creds = sts.assume_role(
+        access_key_id=creds["access_key_id"],
+        duration=3600,
+        region="eu-central-1",
+        role_arn=role["role_arn"],
+        role_name="Admin",
+        secret_access_key=creds["secret_access_key"],
+        session_name="grawsp",
+        session_token=creds["session_token"],
+    )
+
+    assert role["role_arn"] == sts.build_role_arn("000000000007", "Admin")
+    assert role_creds["expires_at"] > creds["expires_at"] - 60
+
+    signin_token = sts.get_signin_token(
+        role_creds["access_key_id"],
+        role_creds["secret_access_key"],
+        role_creds["session_token"],
+    )
+
+    assert signin_token
+    assert sts.build_console_url(signin_token).startswith(
+        f"{fake_server.url}/federation?"
+    )
+
+
+def test_throttled_calls_are_retried_by_the_scheduler(fake_server):
+    fake_server.throttle_rate = 0.5
+    configure_scheduler(rate=1000, burst=1000, max_attempts=20)
+
+    roles = sso.list_sso_roles("token", "000000000003", "eu-central-1")
+
+    assert roles == ["ReadOnly", "Role3"]
+    assert fake_server.calls["ListAccountRoles"] >= 1
+
+    fake_server.throttle_rate = 1.0
+    configure_scheduler(max_attempts=1)
+
+    with pytest.raises(ClientError) as e:
+        sso.list_sso_roles("token", "000000000003", "eu-central-1")
+
+    assert e.value.response["Error"]["Code"] == "TooManyRequestsException"
@@ -0,0 +1,81 @@
+from src.util.files import merge_ini_sections
+
+
+def test_merge_ini_sections_keeps_comments_and_other_sections(tmp_path):
+    path = tmp_path / "credentials"
+    path.write_text(
+        "# Managed by hand\n"
+        "[personal]\n"
+        "; my own keys\n"
+        "aws_access_key_id = AKIA\n"
+        "\n"
+        "[account-0-readonly]\n"
+        "# rotated by grawsp\n"
+        "aws_access_key_id = ASIA0\n"
+        "aws_session_token = old\n"
+        "\n"
+        "[work]\n"
+        "region = eu-west-1"
+    )
+
+    changed = merge_ini_sections(
+        path,
+        {
+            "account-0-readonly": {"aws_access_key_id": "ASIA1"},
+            "account-1-readonly": {"aws_access_key_id": "ASIA2"},
+        },
+    )
+
+    assert changed == ["account-0-readonly", "account-1-readonly"]
+    assert path.read_text() == (
+        "# Managed by hand\n"
+        "[personal]\n"
+        "; my own keys\n"
+        "aws_access_key_id = AKIA\n"
+        "\n"
+        "[account-0-readonly]\n"
+        "aws_access_key_id = ASIA1\n"
+        "# rotated by grawsp\n"
+        "\n"
+        "[work]\n"
+        "region = eu-west-1\n"
+        "\n"
+        "[account-1-readonly]\n"
+        "aws_access_key_id = ASIA2\n"
+    )
+
+    modified_at = path.stat().st_mtime_ns
+
+    assert (
+        merge_ini_sections(path, {"account-1-readonly": {"aws_access_key_id": "ASIA2"}})
+        == []
+    )
+    assert path.stat().st_mtime_ns == modified_at
+
+
+def test_merge_ini_sections_tolerates_duplicates_and_defaults(tmp_path):
+    path = tmp_path / "config"
+    content = (
+        "[DEFAULT]\n"
+        "region = eu-west-1\n"
+        "\n"
+        "[profile dev]\n"
+        "output = json\n"
+        "output = text\n"
+        "\n"
+        "[profile prod]\n"
+        "output = json\n"
+        "\n"
+        "[profile prod]\n"
+        "output = yaml\n"
+    )
+    path.write_text(content)
+
+    assert merge_ini_sections(path, {"profile dev": {"output": "text"}}) == []
+    assert path.read_text() == content
+
+    assert merge_ini_sections(
+        path,
+        {"profile dev": {"output": "text"}, "profile prod": {"output": "json"}},
+    ) == ["profile prod"]
+    assert "[DEFAULT]\nregion = eu-west-1\n" in path.read_text()
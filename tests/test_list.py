@@ -0,0 +1,87 @@
+from time import time
+
+from sqlalchemy import Engine, event
+
+from src.commands.grawsp.app import GrawspApp
+from src.commands.grawsp.database.models import Credential
+from src.commands.grawsp.database.repository import Repository
+
+
+def _list(config_path, *arguments) -> tuple[str, int]:
+    statements = []
+
+    def count(connection, cursor, statement, *args) -> None:
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    with GrawspApp(
+        argv=["list", *arguments],
+        config_files=[config_path.as_posix()],
+    ) as app:
+        # Opening the database runs the migrations, which are not counted.
+        assert app.database_engine is not None
+        event.listen(Engine, "before_cursor_execute", count)
+
+        try:
+            app.run()
+        finally:
+            event.remove(Engine, "before_cursor_execute", count)
+
+        _, output = app.last_rendered
+
+    return output, len(statements)
+
+
+def test_list_accounts_runs_a_single_query(database_engine, synced_accounts, tmp_path):
+    synced_accounts(50)
+
+    config_path = tmp_path / "grawsp.conf"
+    config_path.write_text(f"[database]\npath = {database_engine.url.database}\n")
+
+    output, queries = _list(
+        config_path, "accounts", "--pattern", "^account-1", "--limit", "5"
+    )
+    lines = [line for line in output.splitlines() if line.startswith("| 0")]
+
+    assert queries == 1
+    assert [line.split("|")[2].strip() for line in lines] == [
+        "account-1",
+        "account-10",
+        "account-11",
+        "account-12",
+        "account-13",
+    ]
+    assert "ReadOnly, Role10" in lines[1]
+
+
+def test_list_creds_filters_and_sorts_by_expiry(
+    database_engine, synced_accounts, tmp_path
+):
+    synced_accounts(4)
+
+    with Repository(database_engine) as repository:
+        for number, expires_in in enumerate([-60, 3600, 600, 1800]):
+            account = repository.find_account_by_name(
+                "landing-zone", f"account-{number}"
+            )
+            repository.session.add(
+                Credential(
+                    access_key_id=f"ASIA{number}",
+                    account_id=account.id,
+                    expires_at=time() + expires_in,
+                    role_name="ReadOnly",
+                    secret_access_key="secret",
+                    session_token="token",
+                )
+            )
+
+        repository.session.commit()
+
+    config_path = tmp_path / "grawsp.conf"
+    config_path.write_text(f"[database]\npath = {database_engine.url.database}\n")
+
+    output, queries = _list(config_path, "creds", "--sort", "expiry", "--limit", "2")
+    lines = [line for line in output.splitlines() if "ASIA" in line]
+
+    assert queries == 1
+    assert [line.split("|")[1].strip() for line in lines] == ["account-2", "account-3"]
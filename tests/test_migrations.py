@@ -0,0 +1,152 @@
+from sqlalchemy import create_engine, inspect, select
+from sqlalchemy.orm import Session
+
+from src.commands.grawsp.database.migrations import (
+    MIGRATIONS,
+    get_schema_version,
+    migrate,
+)
+from src.commands.grawsp.database.models import Authorization, Credential
+
+# The schema as the releases before any migration created it, at user_version 0.
+INITIAL_SCHEMA = (
+    """
+    CREATE TABLE realm (
+        id INTEGER NOT NULL,
+        name VARCHAR(256) NOT NULL,
+        url VARCHAR(2048) NOT NULL,
+        PRIMARY KEY (id)
+    )
+    """,
+    "CREATE UNIQUE INDEX ix_realm_name ON realm (name)",
+    """
+    CREATE TABLE "authorization" (
+        client_access_token_expires_at FLOAT NOT NULL,
+        client_access_token VARCHAR(256) NOT NULL,
+        client_id VARCHAR(32) NOT NULL,
+        client_name VARCHAR(32) NOT NULL,
+        client_secret_expires_at FLOAT NOT NULL,
+        client_secret VARCHAR(2048) NOT NULL,
+        device_code VARCHAR(128) NOT NULL,
+        device_expires_at FLOAT NOT NULL,
+        id INTEGER NOT NULL,
+        realm_id INTEGER NOT NULL,
+        region VARCHAR(32) NOT NULL,
+        PRIMARY KEY (id),
+        UNIQUE (client_id),
+        UNIQUE (client_secret),
+        UNIQUE (device_code),
+        FOREIGN KEY(realm_id) REFERENCES realm (id)
+    )
+    """,
+    """
+    CREATE TABLE account (
+        authorization_id INTEGER,
+        email VARCHAR(320) NOT NULL,
+        id INTEGER NOT NULL,
+        name VARCHAR(64) NOT NULL,
+        number VARCHAR(12) NOT NULL,
+        realm_id INTEGER NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(authorization_id) REFERENCES "authorization" (id),
+        FOREIGN KEY(realm_id) REFERENCES realm (id)
+    )
+    """,
+    """
+    CREATE TABLE credential (
+        access_key_id VARCHAR(32) NOT NULL,
+        account_id INTEGER NOT NULL,
+        expires_at FLOAT NOT NULL,
+        id INTEGER NOT NULL,
+        role_name VARCHAR(256) NOT NULL,
+        secret_access_key VARCHAR(64) NOT NULL,
+        session_token VARCHAR(1024) NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(account_id) REFERENCES account (id)
+    )
+    """,
+    """
+    CREATE TABLE sso_role (
+        account_id INTEGER NOT NULL,
+        id INTEGER NOT NULL,
+        name VARCHAR(256) NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(account_id) REFERENCES account (id)
+    )
+    """,
+)
+
+
+def _column_names(connection, table_name: str) -> set[str]:
+    return {column["name"] for column in inspect(connection).get_columns(table_name)}
+
+
+def test_new_databases_are_created_at_the_latest_version(database_engine):
+    with database_engine.connect() as connection:
+        assert get_schema_version(connection) == len(MIGRATIONS)
+
+
+def test_existing_databases_are_upgraded_in_place(tmp_path):
+    engine = create_engine(f"sqlite:///{(tmp_path / 'grawsp.db').as_posix()}")
+
+    with engine.begin() as connection:
+        for statement in INITIAL_SCHEMA:
+            connection.exec_driver_sql(statement)
+
+        connection.exec_driver_sql("INSERT INTO realm VALUES (1, 'realm', 'url')")
+        connection.exec_driver_sql(
+            'INSERT INTO "authorization" VALUES '
+            "(4102444800.0, 'token', 'client-id', 'grawsp', 4102444800.0, 'secret',"
+            " 'device-code', 4102444800.0, 1, 1, 'eu-central-1')"
+        )
+
+        for account_id in (1, 2):
+            connection.exec_driver_sql(
+                "INSERT INTO account VALUES "
+                f"(1, 'a@example.com', {account_id}, 'account', '000000000001', 1)"
+            )
+            connection.exec_driver_sql(
+                f"INSERT INTO sso_role VALUES ({account_id}, {account_id}, 'ReadOnly')"
+            )
+            connection.exec_driver_sql(
+                "INSERT INTO credential VALUES "
+                f"('ASIA{account_id}', {account_id}, 4102444800.0, {account_id},"
+                " 'ReadOnly', 'secret', 'token')"
+            )
+
+        connection.exec_driver_sql("INSERT INTO sso_role VALUES (2, 3, 'ReadOnly')")
+
+    with engine.connect() as connection:
+        assert get_schema_version(connection) == 0
+
+    assert migrate(engine) == len(MIGRATIONS)
+
+    with engine.connect() as connection:
+        index_names = {
+            index["name"] for index in inspect(connection).get_indexes("credential")
+        }
+
+        assert "ix_credential_account_id_role_name" in index_names
+        assert connection.exec_driver_sql("SELECT id FROM account").all() == [(2,)]
+        assert connection.exec_driver_sql("SELECT id FROM sso_role").all() == [(2,)]
+        assert {
+            "issued_at",
+            "signin_token",
+            "signin_token_expires_at",
+        } <= _column_names(connection, "credential")
+        assert "refresh_token" in _column_names(connection, "authorization")
+        assert inspect(connection).has_table("role_arn")
+
+    with Session(engine) as session:
+        credential = session.scalars(select(Credential)).one()
+        authorization = session.scalars(select(Authorization)).one()
+
+        assert credential.access_key_id == "ASIA2"
+        assert credential.issued_at is None
+        assert credential.signin_token is None
+        assert authorization.refresh_token is None
+        # Clients registered without the refresh token grant are replaced.
+        assert authorization.client_secret_expires_at == 0
+        assert authorization.is_client_secret_expired()
+
+    assert migrate(engine) == len(MIGRATIONS)
@@ -0,0 +1,112 @@
+from types import SimpleNamespace
+
+import pytest
+
+from src.commands.grawsp.actions import aws
+from src.commands.grawsp.app import GrawspApp
+from src.commands.grawsp.controllers import open_console
+from src.commands.grawsp.exceptions import RuntimeAppError
+
+
+def test_open_console_isolates_failures_and_launches_one_browser(
+    database_engine, synced_accounts, tmp_path, monkeypatch
+):
+    synced_accounts(5)
+
+    def create_credential(account_name, **kwargs):
+        if account_name == "account-2":
+            raise RuntimeError("Access denied")
+
+        return SimpleNamespace(
+            access_key_id=account_name, secret_access_key="", session_token=""
+        )
+
+    launches = []
+
+    monkeypatch.setattr(aws, "create_credential", create_credential)
+    monkeypatch.setattr(
+        aws,
+        "create_signin_token",
+        lambda credential, **kwargs: (credential.access_key_id, False),
+    )
+    monkeypatch.setattr(
+        open_console.subprocess, "Popen", lambda args, **kwargs: launches.append(args)
+    )
+
+    config_path = tmp_path / "grawsp.conf"
+    config_path.write_text(
+        f"[database]\npath = {database_engine.url.database}\n"
+        "[general]\nfirefox_path = /usr/bin/firefox\n"
+    )
+
+    with (
+        GrawspApp(
+            argv=[
+                "--realm",
+                "landing-zone",
+                "open-console",
+                "--role",
+                "ReadOnly",
+                "account-.*",
+            ],
+            config_files=[config_path.as_posix()],
+        ) as app,
+        pytest.raises(RuntimeAppError, match="1 consoles"),
+    ):
+        app.run()
+
+    assert len(launches) == 1
+    assert launches[0][0] == "/usr/bin/firefox"
+    assert [url.split("&")[0] for url in launches[0][1:]] == [
+        "ext+container:name=account-0",
+        "ext+container:name=account-1",
+        "ext+container:name=account-3",
+        "ext+container:name=account-4",
+    ]
+
+
+def test_open_console_mints_in_the_realm_region(
+    database_engine, synced_accounts, tmp_path, monkeypatch
+):
+    synced_accounts(1)
+
+    regions = []
+    launches = []
+
+    def create_credential(region, **kwargs):
+        regions.append(region)
+        return SimpleNamespace(access_key_id="", secret_access_key="", session_token="")
+
+    monkeypatch.setattr(aws, "create_credential", create_credential)
+    monkeypatch.setattr(
+        aws, "create_signin_token", lambda credential, **kwargs: ("token", False)
+    )
+    monkeypatch.setattr(
+        open_console.subprocess, "Popen", lambda args, **kwargs: launches.append(args)
+    )
+
+    config_path = tmp_path / "grawsp.conf"
+    config_path.write_text(
+        "[aws]\ndefault_region = eu-west-1\n"
+        f"[database]\npath = {database_engine.url.database}\n"
+        "[general]\nfirefox_path = /usr/bin/firefox\n"
+        "[landing-zone]\nregions = eu-central-1, us-east-1\n"
+    )
+
+    with GrawspApp(
+        argv=[
+            "--realm",
+            "landing-zone",
+            "open-console",
+            "--region",
+            "ap-southeast-2",
+            "--role",
+            "ReadOnly",
+            "account-0",
+        ],
+        config_files=[config_path.as_posix()],
+    ) as app:
+        app.run()
+
+    assert regions == ["eu-central-1"]
+    assert "region%253Dap-southeast-2" in launches[0][1]
@@ -0,0 +1,131 @@
+import random
+
+from src.commands.grawsp.defaults import DEFAULT_CREDENTIAL_REFRESH_MARGIN_IN_SECONDS
+from src.commands.grawsp.refresh import RefreshScheduler
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _credential(clock: FakeClock, lifetime: float = 3600) -> dict:
+    return {"issued_at": clock.now, "expires_at": clock.now + lifetime}
+
+
+def test_pairs_are_refreshed_once_the_lifetime_fraction_elapsed():
+    clock = FakeClock()
+    refreshed = []
+
+    def refresh(key):
+        refreshed.append((key, clock.now))
+        return _credential(clock)
+
+    scheduler = RefreshScheduler(
+        refresh, clock=clock, refresh_fraction=0.8, jitter=0, margin=0
+    )
+    scheduler.watch("pair", _credential(clock))
+
+    clock.now += 2879
+    assert scheduler.run_pending() == 0
+
+    clock.now += 1
+    assert scheduler.run_pending() == 1
+    assert refreshed == [("pair", 3880.0)]
+    assert scheduler.watched == {"pair": 3880.0 + 2880}
+
+
+def test_jitter_spreads_refreshes_before_the_fraction():
+    clock = FakeClock()
+    scheduler = RefreshScheduler(
+        lambda key: None,
+        clock=clock,
+        refresh_fraction=0.8,
+        jitter=0.1,
+        margin=0,
+        rng=random.Random(42),
+    )
+
+    for key in range(100):
+        scheduler.watch(key, _credential(clock))
+
+    refresh_times = set(scheduler.watched.values())
+
+    assert len(refresh_times) == 100
+    assert min(refresh_times) >= clock.now + 3600 * 0.7
+    assert max(refresh_times) <= clock.now + 3600 * 0.8
+
+
+def test_refreshes_land_before_callers_consider_credentials_expired():
+    clock = FakeClock()
+    credential = _credential(clock)
+    scheduler = RefreshScheduler(
+        lambda key: None,
+        clock=clock,
+        margin=DEFAULT_CREDENTIAL_REFRESH_MARGIN_IN_SECONDS,
+        rng=random.Random(7),
+    )
+
+    for key in range(100):
+        scheduler.watch(key, credential)
+
+    usable_until = (
+        credential["expires_at"] - DEFAULT_CREDENTIAL_REFRESH_MARGIN_IN_SECONDS
+    )
+
+    assert max(scheduler.watched.values()) < usable_until
+    assert (
+        min(scheduler.watched.values()) >= clock.now + (usable_until - clock.now) * 0.7
+    )
+
+    clock.now = usable_until - 1
+    assert scheduler.is_stale(credential)
+
+
+def test_failed_refreshes_are_retried_later():
+    clock = FakeClock()
+    attempts = []
+
+    def refresh(key):
+        attempts.append(clock.now)
+
+        if len(attempts) == 1:
+            raise RuntimeError("throttled")
+
+        return _credential(clock)
+
+    scheduler = RefreshScheduler(refresh, clock=clock, jitter=0, retry_after=30)
+    scheduler.watch("pair")
+
+    assert scheduler.run_pending() == 1
+    assert scheduler.failures == 1
+
+    clock.now += 30
+    assert scheduler.run_pending() == 1
+    assert scheduler.refreshes == 1
+    assert attempts == [1000.0, 1030.0]
+
+
+def test_run_loop_sleeps_until_the_next_refresh():
+    clock = FakeClock()
+    sleeps = []
+
+    scheduler = RefreshScheduler(
+        lambda key: _credential(clock), clock=clock, jitter=0, margin=0
+    )
+    scheduler.watch("pair", _credential(clock))
+
+    def sleep(delay):
+        sleeps.append(delay)
+        clock.now += delay
+
+        if len(sleeps) == 3:
+            scheduler.stop()
+
+    scheduler.run(sleep=sleep)
+
+    assert sleeps == [2880.0, 2880.0, 2880.0]
+    assert scheduler.refreshes == 2
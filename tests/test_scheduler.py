@@ -0,0 +1,159 @@
+import pytest
+from botocore.exceptions import ClientError, EndpointConnectionError, ReadTimeoutError
+
+from src.services.aws.scheduler import BULK, INTERACTIVE, RequestScheduler, TokenBucket
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def test_throttled_calls_are_retried_at_a_lower_rate():
+    clock = FakeClock()
+    scheduler = RequestScheduler(rate=10, burst=1, clock=clock, sleep=clock.sleep)
+    calls = []
+
+    def list_account_roles(**kwargs):
+        calls.append(kwargs)
+
+        if len(calls) < 3:
+            raise ClientError(
+                {"Error": {"Code": "TooManyRequestsException"}}, "ListAccountRoles"
+            )
+
+        return {"roleList": []}
+
+    assert scheduler.call("sso", list_account_roles, BULK, accountId="1") == {
+        "roleList": []
+    }
+    assert len(calls) == 3
+
+    stats = scheduler.stats()["sso:list_account_roles"]
+
+    assert stats["calls"] == 3
+    assert stats["throttles"] == 2
+    assert stats["waited"] > 0
+    assert scheduler._buckets["sso"].rate < 10
+
+
+def test_other_errors_are_not_retried():
+    clock = FakeClock()
+    scheduler = RequestScheduler(clock=clock, sleep=clock.sleep)
+    calls = []
+
+    def get_role_credentials(**kwargs):
+        calls.append(kwargs)
+        raise ClientError(
+            {"Error": {"Code": "ForbiddenException"}}, "GetRoleCredentials"
+        )
+
+    with pytest.raises(ClientError) as e:
+        scheduler.call("sso", get_role_credentials)
+
+    assert e.value.response["Error"]["Code"] == "ForbiddenException"
+
+    assert len(calls) == 1
+    assert scheduler.summary()["throttles"] == 0
+
+
+def test_connection_errors_and_server_errors_are_retried():
+    clock = FakeClock()
+    scheduler = RequestScheduler(clock=clock, sleep=clock.sleep)
+    errors = [
+        EndpointConnectionError(endpoint_url="https://portal.sso.amazonaws.com"),
+        ReadTimeoutError(endpoint_url="https://portal.sso.amazonaws.com"),
+        ClientError(
+            {
+                "Error": {"Code": "BadGateway"},
+                "ResponseMetadata": {"HTTPStatusCode": 502},
+            },
+            "ListAccountRoles",
+        ),
+    ]
+
+    def list_account_roles(**kwargs):
+        if errors:
+            raise errors.pop(0)
+
+        return {"roleList": []}
+
+    assert scheduler.call("sso", list_account_roles, BULK) == {"roleList": []}
+    assert scheduler.stats()["sso:list_account_roles"]["calls"] == 4
+    assert scheduler.summary()["throttles"] == 0
+
+
+def test_connection_errors_are_raised_after_the_last_attempt():
+    clock = FakeClock()
+    scheduler = RequestScheduler(max_attempts=3, clock=clock, sleep=clock.sleep)
+
+    def list_accounts(**kwargs):
+        raise EndpointConnectionError(endpoint_url="https://portal.sso.amazonaws.com")
+
+    with pytest.raises(EndpointConnectionError):
+        scheduler.call("sso", list_accounts, BULK)
+
+    assert scheduler.stats()["sso:list_accounts"]["calls"] == 3
+
+
+def test_calls_are_spread_over_the_rate_of_each_api():
+    clock = FakeClock()
+    scheduler = RequestScheduler(rate=10, burst=1, clock=clock, sleep=clock.sleep)
+
+    for _ in range(5):
+        scheduler.call("sso", lambda: {})
+        scheduler.call("sts", lambda: {})
+
+    # Each service has its own bucket, so both are served at ten calls a second.
+    assert 0.4 <= clock.now < 0.5
+    assert 0.4 <= scheduler.summary()["waited"] < 0.5
+
+
+def test_interactive_requests_go_before_bulk_ones():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=10, burst=1, clock=clock)
+    bulk_delays = []
+
+    assert bucket.try_acquire(BULK) == 0
+
+    def sleep(seconds: float) -> None:
+        clock.sleep(seconds)
+        bulk_delays.append(bucket.try_acquire(BULK))
+
+    bucket.wait(INTERACTIVE, sleep)
+
+    assert bulk_delays and all(delay > 0 for delay in bulk_delays)
+    assert bucket.try_acquire(BULK) > 0
+
+
+def test_interactive_calls_go_before_bulk_ones_of_the_same_service():
+    clock = FakeClock()
+    order = []
+
+    def sleep(seconds: float) -> None:
+        clock.sleep(seconds)
+
+        # An interactive call arrives while the bulk one is waiting.
+        if "get_role_credentials" not in order:
+            scheduler.call("sso", get_role_credentials)
+
+    scheduler = RequestScheduler(rate=10, burst=1, clock=clock, sleep=sleep)
+
+    def get_role_credentials(**kwargs):
+        order.append("get_role_credentials")
+        return {}
+
+    def list_account_roles(**kwargs):
+        order.append("list_account_roles")
+        return {}
+
+    scheduler.call("sso", lambda: {})
+    scheduler.call("sso", list_account_roles, BULK)
+
+    assert order == ["get_role_credentials", "list_account_roles"]
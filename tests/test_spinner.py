@@ -0,0 +1,25 @@
+import sys
+
+from prompt_toolkit.application import create_app_session
+from prompt_toolkit.output import create_output
+
+from src.util.terminal.spinner import Spinner
+
+
+def test_messages_with_markup_characters_are_printed_as_they_are(capsys):
+    # A session of its own binds prompt_toolkit to the captured output.
+    with (
+        create_app_session(output=create_output(sys.stdout)),
+        Spinner("Authorizing") as spinner,
+    ):
+        spinner.info("Using <realm> & region")
+        spinner.warning("Throttled", submessage="a < b")
+        spinner.error(
+            "Could not authorize to account-1 account",
+            submessage='Could not connect to "http://localhost/?role=A&account=1"',
+        )
+
+    output = capsys.readouterr().out
+
+    assert "Using <realm> & region" in output
+    assert "?role=A&account=1" in output
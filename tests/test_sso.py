@@ -0,0 +1,40 @@
+from src.services.aws import sso
+
+
+def _fake_catalog(monkeypatch, size: int = 50) -> None:
+    accounts = [
+        {
+            "email": f"account-{i}@example.com",
+            "account_id": f"{i:012d}",
+            "account_name": f"account-{i}",
+        }
+        for i in range(size)
+    ]
+
+    monkeypatch.setattr(
+        sso,
+        "list_sso_accounts",
+        lambda access_token, region: [dict(account) for account in accounts],
+    )
+    monkeypatch.setattr(
+        sso,
+        "list_sso_roles",
+        lambda access_token, account_id, region: [f"Role{account_id[-2:]}", "ReadOnly"],
+    )
+
+
+def test_concurrent_discovery_matches_serial_discovery(monkeypatch):
+    _fake_catalog(monkeypatch)
+    progress = []
+
+    serial = sso.list_sso_accounts_with_roles("token", "eu-central-1")
+    concurrent = sso.list_sso_accounts_with_roles(
+        "token",
+        "eu-central-1",
+        concurrency=8,
+        on_progress=lambda completed, total: progress.append((completed, total)),
+    )
+
+    assert concurrent == serial
+    assert progress[-1] == (50, 50)
+    assert len(progress) == 50
@@ -0,0 +1,56 @@
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+# Cumulative import budgets in seconds, they can be relaxed on slow machines
+# through the environment.
+APP_IMPORT_BUDGET_IN_SECONDS = float(os.environ.get("GRAWSP_APP_IMPORT_BUDGET", "0.25"))
+READ_ONLY_COMMAND_IMPORT_BUDGET_IN_SECONDS = float(
+    os.environ.get("GRAWSP_READ_ONLY_COMMAND_IMPORT_BUDGET", "1.0")
+)
+ROOT_PATH = Path(__file__).parent.parent
+
+
+def _import_times(arguments: list[str], tmp_path: Path) -> dict[str, float]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *arguments],
+        capture_output=True,
+        check=True,
+        cwd=ROOT_PATH,
+        env={**os.environ, "HOME": tmp_path.as_posix()},
+        text=True,
+    )
+
+    times = {}
+
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)$", line)
+
+        # Only top level imports, their cumulative time includes everything below.
+        if match and len(match.group(3)) == 1:
+            times[match.group(4)] = int(match.group(2)) / 1_000_000
+
+    return times
+
+
+def test_importing_the_app_does_not_load_heavy_dependencies(tmp_path):
+    times = _import_times(["-c", "import src.commands.grawsp.app"], tmp_path)
+
+    for module in ("boto3", "botocore", "prompt_toolkit", "requests", "sqlalchemy"):
+        assert module not in times
+
+    assert times["src.commands.grawsp.app"] < APP_IMPORT_BUDGET_IN_SECONDS
+
+
+def test_read_only_commands_start_within_the_budget(tmp_path):
+    for command in (["about"], ["list", "creds"], ["list", "accounts"]):
+        times = _import_times(["-m", "src.commands.grawsp.cli", *command], tmp_path)
+
+        assert "src.commands.grawsp.app" in times
+
+        for module in ("boto3", "botocore", "requests", "yaspin"):
+            assert module not in times
+
+        assert sum(times.values()) < READ_ONLY_COMMAND_IMPORT_BUDGET_IN_SECONDS
@@ -0,0 +1,73 @@
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from src.commands.grawsp.app import GrawspApp
+from src.commands.grawsp.database.models import Account, Authorization, Realm
+from src.commands.grawsp.exceptions import RuntimeAppError
+from src.services.aws import sso
+
+from .conftest import make_accounts_data
+
+
+def test_sync_all_realms_merges_regions_and_reports_per_realm(
+    database_engine, authorization, tmp_path, monkeypatch
+):
+    with Session(database_engine) as session:
+        session.add(
+            Authorization(
+                client_access_token="west-token",
+                client_access_token_expires_at=4102444800.0,
+                client_id="west-client-id",
+                client_name="grawsp",
+                client_secret="west-client-secret",
+                client_secret_expires_at=4102444800.0,
+                device_code="west-device-code",
+                device_expires_at=4102444800.0,
+                realm_id=authorization.realm_id,
+                region="eu-west-1",
+            )
+        )
+        session.add(Realm(name="other-zone", url="https://other.awsapps.com/start/"))
+        session.commit()
+
+    def list_sso_accounts_with_roles(access_token, region, **kwargs):
+        accounts = make_accounts_data(3)
+
+        if region == "eu-west-1":
+            for account in accounts:
+                account["sso_roles"] = ["Admin"]
+
+        return accounts
+
+    monkeypatch.setattr(
+        sso, "list_sso_accounts_with_roles", list_sso_accounts_with_roles
+    )
+
+    config_path = tmp_path / "grawsp.conf"
+    config_path.write_text(
+        f"[database]\npath = {database_engine.url.database}\n"
+        "[landing-zone]\nregions = eu-central-1, eu-west-1\n"
+        "start_url = https://example.awsapps.com/start/\n"
+        "[other-zone]\nstart_url = https://other.awsapps.com/start/\n"
+    )
+
+    with (
+        GrawspApp(
+            argv=["sync", "--all-realms"],
+            config_files=[config_path.as_posix()],
+        ) as app,
+        pytest.raises(RuntimeAppError, match="1 realms"),
+    ):
+        app.run()
+
+    with Session(database_engine) as session:
+        account = session.scalars(
+            select(Account).where(Account.name == "account-1")
+        ).one()
+
+        assert sorted(sso_role.name for sso_role in account.sso_roles) == [
+            "Admin",
+            "ReadOnly",
+            "Role1",
+        ]